@@ -1,21 +1,32 @@
-from datetime import timedelta
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional
+from typing import NamedTuple, Optional
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel, EmailStr, Field, model_validator
-from sqlalchemy.orm import Session
-
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, make_transient_to_detached
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import TTLCache
+from app.core.context_builder import invalidate_coaching_context
+from app.core.responses import model_json_response
 from app.core.security import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     create_access_token,
     decrypt_api_key,
-    decode_access_token,
+    decode_access_token_claims,
     encrypt_api_key,
     get_password_hash,
     mask_api_key,
+    verify_and_update_password,
     verify_password,
 )
 from app.db.models import (
@@ -38,6 +49,17 @@ from app.db.session import get_db
 router = APIRouter(prefix="/auth", tags=["auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+# user_id -> (id, email, password_hash, created_at) snapshot for get_current_user.
+_USER_CACHE = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL_SECONDS)
+# blake2b(token) -> (user_id, exp); hits skip the JWT signature check until exp.
+_TOKEN_CACHE = TTLCache(maxsize=10_000, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+# (user_id, provider) -> decrypted API key, so model listing skips the DB read and decrypt.
+_KEY_CACHE = TTLCache(maxsize=5000, ttl=300)
+MODEL_LIST_CACHE_TTL_SECONDS = int(os.getenv("MODEL_LIST_CACHE_TTL_SECONDS", "900"))
+# (provider, blake2b(api_key)) -> model ids; the raw key is never stored.
+_MODELS_CACHE = TTLCache(maxsize=1024, ttl=MODEL_LIST_CACHE_TTL_SECONDS)
+
 
 class AIProvider(str, Enum):
     openai = "openai"
@@ -45,6 +67,8 @@ class AIProvider(str, Enum):
 
 
 class AIConfigInput(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, extra="ignore")
+
     ai_provider: AIProvider
     ai_model: Optional[str] = Field(default=None, min_length=1, max_length=128)
     ai_reasoning_model: Optional[str] = Field(default=None, min_length=1, max_length=128)
@@ -129,7 +153,7 @@ class ReminderSettingsResponse(BaseModel):
 
 
 def _estimate_usage_cost_usd(provider: str, model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
-    price = MODEL_PRICING_USD_PER_1M.get(provider, {}).get(model)
+    price = _FLAT_PRICING.get((provider, model))
     if not price:
         return None
     input_cost_per_1m, output_cost_per_1m = price
@@ -140,6 +164,8 @@ def _estimate_usage_cost_usd(provider: str, model: str, prompt_tokens: int, comp
 
 
 class ModelOptionsRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, extra="ignore")
+
     ai_provider: AIProvider
     ai_api_key: Optional[str] = Field(default=None, min_length=8, max_length=512)
 
@@ -191,72 +217,91 @@ MODEL_PRICING_USD_PER_1M: dict[str, dict[str, tuple[float, float]]] = {
 }
 
 
-def _upsert_ai_config(db: Session, user_id: int, ai: AIConfigInput) -> UserAIConfig:
-    existing = db.query(UserAIConfig).filter(UserAIConfig.user_id == user_id).first()
-    raw_key = (ai.ai_api_key or "").strip()
+class ProviderMeta(NamedTuple):
+    preferred: tuple[str, ...]
+    utility: tuple[str, ...]
+    deep: tuple[str, ...]
+    pricing: dict[str, tuple[float, float]]
+
+
+_NO_PROVIDER_META = ProviderMeta(preferred=(), utility=(), deep=(), pricing={})
+
+PROVIDER_META: dict[str, ProviderMeta] = {
+    "openai": ProviderMeta(
+        preferred=("gpt-5-mini", "gpt-5.2", "gpt-5-nano", "gpt-4.1-mini"),
+        utility=("gpt-5-nano", "gpt-5-mini", "gpt-5.2", "gpt-4.1-mini"),
+        deep=("gpt-5.2", "gpt-5-mini", "gpt-4.1-mini", "gpt-5-nano"),
+        pricing=MODEL_PRICING_USD_PER_1M["openai"],
+    ),
+    "gemini": ProviderMeta(
+        preferred=tuple(MODEL_DEFAULTS["gemini"]),
+        utility=("gemini-2.5-flash-preview-09-2025", "gemini-2.0-flash", "gemini-2.5-pro"),
+        deep=("gemini-2.5-pro", "gemini-2.5-flash-preview-09-2025", "gemini-2.0-flash"),
+        pricing=MODEL_PRICING_USD_PER_1M["gemini"],
+    ),
+}
+
+_FLAT_PRICING: dict[tuple[str, str], tuple[float, float]] = {
+    (provider, model): price for provider, meta in PROVIDER_META.items() for model, price in meta.pricing.items()
+}
+
+
+def _encrypt_input_key(ai: AIConfigInput) -> Optional[str]:
+    raw_key = ai.ai_api_key or ""
     key_is_masked = "*" in raw_key
-    encrypted = encrypt_api_key(raw_key) if raw_key and not key_is_masked else None
-    if existing:
-        existing.ai_provider = ai.ai_provider.value
-        existing.ai_model = (ai.ai_reasoning_model or ai.ai_model or "").strip()
-        existing.ai_reasoning_model = (ai.ai_reasoning_model or ai.ai_model or "").strip()
-        existing.ai_deep_thinker_model = (ai.ai_deep_thinker_model or ai.ai_model or "").strip()
-        existing.ai_utility_model = (ai.ai_utility_model or ai.ai_model or "").strip()
-        if encrypted:
-            existing.encrypted_api_key = encrypted
-        return existing
-
-    if not encrypted:
+    return encrypt_api_key(raw_key) if raw_key and not key_is_masked else None
+
+
+def _upsert_ai_config(db: Session, user_id: int, ai: AIConfigInput, encrypted: Optional[str]) -> UserAIConfig:
+    reasoning_model = ai.ai_reasoning_model or ai.ai_model or ""
+    values = {
+        "ai_provider": ai.ai_provider.value,
+        "ai_model": reasoning_model,
+        "ai_reasoning_model": reasoning_model,
+        "ai_deep_thinker_model": ai.ai_deep_thinker_model or ai.ai_model or "",
+        "ai_utility_model": ai.ai_utility_model or ai.ai_model or "",
+        "updated_at": datetime.utcnow(),
+    }
+    if encrypted:
+        values["encrypted_api_key"] = encrypted
+        stmt = (
+            sqlite_insert(UserAIConfig)
+            .values(user_id=user_id, **values)
+            .on_conflict_do_update(index_elements=[UserAIConfig.user_id], set_=values)
+        )
+    else:
+        # Without a new key only an existing config can be updated in place.
+        stmt = update(UserAIConfig).where(UserAIConfig.user_id == user_id).values(**values)
+    cfg = db.scalars(
+        stmt.returning(UserAIConfig), execution_options={"populate_existing": True}
+    ).first()
+    if cfg is None:
         raise HTTPException(status_code=400, detail="API key is required for first-time AI configuration")
+    return cfg
 
-    created = UserAIConfig(
-        user_id=user_id,
-        ai_provider=ai.ai_provider.value,
-        ai_model=(ai.ai_reasoning_model or ai.ai_model or "").strip(),
-        ai_reasoning_model=(ai.ai_reasoning_model or ai.ai_model or "").strip(),
-        ai_deep_thinker_model=(ai.ai_deep_thinker_model or ai.ai_model or "").strip(),
-        ai_utility_model=(ai.ai_utility_model or ai.ai_model or "").strip(),
-        encrypted_api_key=encrypted,
-    )
-    db.add(created)
-    return created
 
-
-def _best_model(provider: str, models: list[str]) -> str:
-    preferred = {
-        "openai": ["gpt-5-mini", "gpt-5.2", "gpt-5-nano", "gpt-4.1-mini"],
-        "gemini": MODEL_DEFAULTS.get("gemini", []),
-    }.get(provider, MODEL_DEFAULTS.get(provider, []))
+def _first_available(preferred: tuple[str, ...], available: frozenset[str]) -> Optional[str]:
     for candidate in preferred:
-        if candidate in models:
+        if candidate in available:
             return candidate
+    return None
+
+
+def _best_model(meta: ProviderMeta, models: list[str], available: frozenset[str]) -> str:
+    best = _first_available(meta.preferred, available)
+    if best:
+        return best
     if models:
         return models[0]
-    return preferred[0] if preferred else ""
+    return meta.preferred[0] if meta.preferred else ""
 
 
-def _best_utility_model(provider: str, models: list[str]) -> str:
-    utility_candidates = {
-        "openai": ["gpt-5-nano", "gpt-5-mini", "gpt-5.2", "gpt-4.1-mini"],
-        "gemini": ["gemini-2.5-flash-preview-09-2025", "gemini-2.0-flash", "gemini-2.5-pro"],
-    }
-    preferred = utility_candidates.get(provider, [])
-    for candidate in preferred:
-        if candidate in models:
-            return candidate
-    return _best_model(provider, models)
+def _best_utility_model(meta: ProviderMeta, available: frozenset[str], default_model: str) -> str:
+    return _first_available(meta.utility, available) or default_model
 
 
-def _best_deep_thinker_model(provider: str, models: list[str]) -> str:
-    deep_candidates = {
-        "openai": ["gpt-5.2", "gpt-5-mini", "gpt-4.1-mini", "gpt-5-nano"],
-        "gemini": ["gemini-2.5-pro", "gemini-2.5-flash-preview-09-2025", "gemini-2.0-flash"],
-    }
-    preferred = deep_candidates.get(provider, [])
-    for candidate in preferred:
-        if candidate in models:
-            return candidate
-    return _best_model(provider, models)
+def _best_deep_thinker_model(meta: ProviderMeta, available: frozenset[str], default_model: str) -> str:
+    return _first_available(meta.deep, available) or default_model
 
 
 def _fallback_models(provider: str) -> list[str]:
@@ -267,54 +312,108 @@ def _resolve_lookup_key(
     db: Session, user_id: int, provider: str, override_key: Optional[str]
 ) -> Optional[str]:
     if override_key:
-        return override_key.strip()
-    cfg = db.query(UserAIConfig).filter(UserAIConfig.user_id == user_id).first()
+        return override_key
+    cached = _KEY_CACHE.get((user_id, provider))
+    if cached is not None:
+        return cached
+    cfg = db.execute(
+        select(UserAIConfig.ai_provider, UserAIConfig.encrypted_api_key).where(UserAIConfig.user_id == user_id)
+    ).first()
     if cfg and cfg.ai_provider == provider and cfg.encrypted_api_key:
         try:
-            return decrypt_api_key(cfg.encrypted_api_key)
+            key = decrypt_api_key(cfg.encrypted_api_key)
         except Exception:
             return None
+        _KEY_CACHE.set((user_id, provider), key)
+        return key
     return None
 
 
-def _fetch_openai_models(api_key: str) -> list[str]:
-    response = httpx.get(
+def _invalidate_key_cache(user_id: int) -> None:
+    for provider in AIProvider:
+        _KEY_CACHE.pop((user_id, provider.value))
+
+
+_MODEL_LIST_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _model_list_client() -> httpx.AsyncClient:
+    # Shared pool keeps provider TLS connections warm between model-list calls.
+    global _MODEL_LIST_CLIENT
+    if _MODEL_LIST_CLIENT is None or _MODEL_LIST_CLIENT.is_closed:
+        _MODEL_LIST_CLIENT = httpx.AsyncClient(
+            timeout=8.0, limits=httpx.Limits(max_keepalive_connections=32)
+        )
+    return _MODEL_LIST_CLIENT
+
+
+async def close_model_list_client() -> None:
+    global _MODEL_LIST_CLIENT
+    if _MODEL_LIST_CLIENT is not None:
+        await _MODEL_LIST_CLIENT.aclose()
+        _MODEL_LIST_CLIENT = None
+
+
+async def _fetch_openai_models(api_key: str) -> list[str]:
+    response = await _model_list_client().get(
         "https://api.openai.com/v1/models",
         headers={"Authorization": f"Bearer {api_key}"},
-        timeout=8.0,
     )
     response.raise_for_status()
     data = response.json()
     names: list[str] = []
-    for item in data.get("data", []):
-        model_id = str(item.get("id", "")).strip()
+    append = names.append
+    for item in data.get("data", ()):
+        model_id = item.get("id")
+        if not isinstance(model_id, str) or not model_id:
+            continue
+        model_id = model_id.strip()
         # Exclude codex-specialized models from health runtime configuration.
         if model_id.startswith("gpt-") and "codex" not in model_id:
-            names.append(model_id)
-    return sorted(set(names))
+            append(model_id)
+    return sorted(dict.fromkeys(names))
 
 
-def _fetch_gemini_models(api_key: str) -> list[str]:
-    response = httpx.get(
+async def _fetch_gemini_models(api_key: str) -> list[str]:
+    response = await _model_list_client().get(
         f"https://generativelanguage.googleapis.com/v1beta/models?key={api_key}",
-        timeout=8.0,
     )
     response.raise_for_status()
     data = response.json()
     names: list[str] = []
-    for item in data.get("models", []):
-        raw = str(item.get("name", "")).strip()
-        model_id = raw.split("/")[-1]
+    append = names.append
+    for item in data.get("models", ()):
+        raw = item.get("name")
+        if not isinstance(raw, str) or not raw:
+            continue
+        model_id = raw.strip().rpartition("/")[2]
         if "gemini" in model_id:
-            names.append(model_id)
-    return sorted(set(names))
+            append(model_id)
+    return sorted(dict.fromkeys(names))
+
+
+async def _list_provider_models(provider: str, api_key: str) -> list[str]:
+    cache_key = (provider, hashlib.blake2b(api_key.encode("utf-8"), digest_size=16).hexdigest())
+    cached = _MODELS_CACHE.get(cache_key)
+    if cached is not None:
+        return list(cached)
+    if provider == "openai":
+        models = await _fetch_openai_models(api_key)
+    else:
+        models = await _fetch_gemini_models(api_key)
+    if models:
+        _MODELS_CACHE.set(cache_key, tuple(models))
+    return models
 
 
 def _model_option(provider: str, model: str) -> ModelOptionsResponse.ModelOption:
-    price = MODEL_PRICING_USD_PER_1M.get(provider, {}).get(model)
+    # Values come from our own pricing table, so skip per-row validation.
+    price = _FLAT_PRICING.get((provider, model))
     if not price:
-        return ModelOptionsResponse.ModelOption(model=model)
-    return ModelOptionsResponse.ModelOption(
+        return ModelOptionsResponse.ModelOption.model_construct(
+            model=model, input_cost_per_1m_usd=None, output_cost_per_1m_usd=None, cost_known=False
+        )
+    return ModelOptionsResponse.ModelOption.model_construct(
         model=model,
         input_cost_per_1m_usd=price[0],
         output_cost_per_1m_usd=price[1],
@@ -322,52 +421,126 @@ def _model_option(provider: str, model: str) -> ModelOptionsResponse.ModelOption
     )
 
 
+def invalidate_user_cache(user_id: int) -> None:
+    _USER_CACHE.pop(user_id)
+
+
+def _load_user(db: Session, user_id: int) -> Optional[User]:
+    snapshot = _USER_CACHE.get(user_id)
+    if snapshot is None:
+        snapshot = db.execute(
+            select(User.id, User.email, User.password_hash, User.created_at).where(User.id == user_id)
+        ).first()
+        if not snapshot:
+            return None
+        snapshot = tuple(snapshot)
+        _USER_CACHE.set(user_id, snapshot)
+    cached_id, email, password_hash, created_at = snapshot
+    user = User(id=cached_id, email=email, password_hash=password_hash, created_at=created_at)
+    # Attach the snapshot as a persistent instance without issuing a SELECT.
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def _build_model_options_response(
+    ai_provider: AIProvider, models: list[str], source: str
+) -> ModelOptionsResponse:
+    provider = ai_provider.value
+    meta = PROVIDER_META.get(provider, _NO_PROVIDER_META)
+    available = frozenset(models)
+    default_model = _best_model(meta, models, available)
+    return ModelOptionsResponse(
+        ai_provider=ai_provider,
+        models=models,
+        model_options=[_model_option(provider, name) for name in models],
+        default_model=default_model,
+        default_reasoning_model=default_model,
+        default_deep_thinker_model=_best_deep_thinker_model(meta, available, default_model),
+        default_utility_model=_best_utility_model(meta, available, default_model),
+        source=source,
+    )
+
+
+def _user_id_from_token(token: str) -> int:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    now = time.time()
+    cached = _TOKEN_CACHE.get(digest)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+    subject, expires_at = decode_access_token_claims(token)
+    user_id = int(subject)
+    _TOKEN_CACHE.set(digest, (user_id, expires_at), ttl=max(0.0, expires_at - now))
+    return user_id
+
+
+def _model_options_json(ai_provider: AIProvider, models: list[str], source: str) -> Response:
+    return model_json_response(_build_model_options_response(ai_provider, models, source))
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
 ) -> User:
     try:
-        subject = decode_access_token(token)
-        user_id = int(subject)
+        user_id = _user_id_from_token(token)
     except Exception:
         raise _bad_credentials()
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _load_user(db, user_id)
     if not user:
         raise _bad_credentials()
     return user
 
 
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def signup(payload: SignupRequest, db: Session = Depends(get_db)) -> TokenResponse:
-    existing = db.query(User).filter(User.email == payload.email.lower()).first()
+async def signup(payload: SignupRequest, db: Session = Depends(get_db)) -> TokenResponse:
+    email = payload.email.lower()
+    # Emails are stored lowercased, so the unique ix_users_email index serves these lookups.
+    existing = db.execute(select(User.id).where(User.email == email)).first()
     if existing:
         raise HTTPException(status_code=409, detail="Email already registered")
 
-    user = User(email=payload.email.lower(), password_hash=get_password_hash(payload.password))
+    if payload.ai_config and not payload.ai_config.ai_api_key:
+        raise HTTPException(status_code=400, detail="API key is required when configuring AI during signup")
+
+    # Key derivation and encryption are CPU-bound; keep them off the event loop. Both finish before the
+    # first flush so no await happens while this session holds the SQLite write lock.
+    password_hash = await run_in_threadpool(get_password_hash, payload.password)
+    encrypted = await run_in_threadpool(_encrypt_input_key, payload.ai_config) if payload.ai_config else None
+    user = User(email=email, password_hash=password_hash)
     db.add(user)
     db.flush()
 
     if payload.ai_config:
-        if not (payload.ai_config.ai_api_key or "").strip():
-            raise HTTPException(status_code=400, detail="API key is required when configuring AI during signup")
-        _upsert_ai_config(db, user.id, payload.ai_config)
+        _upsert_ai_config(db, user.id, payload.ai_config, encrypted)
 
+    user_id = user.id
     db.commit()
 
     token = create_access_token(
-        subject=str(user.id), expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        subject=str(user_id), expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     return TokenResponse(access_token=token)
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)) -> TokenResponse:
-    user = db.query(User).filter(User.email == form_data.username.lower()).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)) -> TokenResponse:
+    row = db.execute(
+        select(User.id, User.password_hash).where(User.email == form_data.username.lower())
+    ).first()
+    if not row:
         raise _bad_credentials()
+    verified, new_hash = await run_in_threadpool(
+        verify_and_update_password, form_data.password, row.password_hash
+    )
+    if not verified:
+        raise _bad_credentials()
+    if new_hash:
+        db.execute(update(User).where(User.id == row.id).values(password_hash=new_hash))
+        db.commit()
+        invalidate_user_cache(row.id)
 
     token = create_access_token(
-        subject=str(user.id), expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        subject=str(row.id), expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     return TokenResponse(access_token=token)
 
@@ -383,8 +556,10 @@ def set_ai_config(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> AIConfigResponse:
-    cfg = _upsert_ai_config(db, user.id, payload)
+    cfg = _upsert_ai_config(db, user.id, payload, _encrypt_input_key(payload))
     db.commit()
+    invalidate_user_cache(user.id)
+    _invalidate_key_cache(user.id)
     try:
         masked = mask_api_key(decrypt_api_key(cfg.encrypted_api_key))
     except Exception:
@@ -400,66 +575,44 @@ def set_ai_config(
 
 
 @router.post("/model-options", response_model=ModelOptionsResponse)
-def get_model_options(
+async def get_model_options(
     payload: ModelOptionsRequest,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> ModelOptionsResponse:
+) -> Response:
     provider = payload.ai_provider.value
     key = _resolve_lookup_key(db, user.id, provider, payload.ai_api_key)
     if not key:
-        models = _fallback_models(provider)
-        return ModelOptionsResponse(
-            ai_provider=payload.ai_provider,
-            models=models,
-            model_options=[_model_option(provider, name) for name in models],
-            default_model=_best_model(provider, models),
-            default_reasoning_model=_best_model(provider, models),
-            default_deep_thinker_model=_best_deep_thinker_model(provider, models),
-            default_utility_model=_best_utility_model(provider, models),
-            source="fallback_no_key",
-        )
+        return _model_options_json(payload.ai_provider, _fallback_models(provider), "fallback_no_key")
 
     try:
-        if provider == "openai":
-            models = _fetch_openai_models(key)
-        else:
-            models = _fetch_gemini_models(key)
+        models = await _list_provider_models(provider, key)
     except Exception:
-        models = _fallback_models(provider)
-        return ModelOptionsResponse(
-            ai_provider=payload.ai_provider,
-            models=models,
-            model_options=[_model_option(provider, name) for name in models],
-            default_model=_best_model(provider, models),
-            default_reasoning_model=_best_model(provider, models),
-            default_deep_thinker_model=_best_deep_thinker_model(provider, models),
-            default_utility_model=_best_utility_model(provider, models),
-            source="fallback_provider_error",
+        return _model_options_json(
+            payload.ai_provider, _fallback_models(provider), "fallback_provider_error"
         )
 
     if not models:
-        models = _fallback_models(provider)
-        source = "fallback_provider_empty"
-    else:
-        source = "provider_api"
-    return ModelOptionsResponse(
-        ai_provider=payload.ai_provider,
-        models=models,
-        model_options=[_model_option(provider, name) for name in models],
-        default_model=_best_model(provider, models),
-        default_reasoning_model=_best_model(provider, models),
-        default_deep_thinker_model=_best_deep_thinker_model(provider, models),
-        default_utility_model=_best_utility_model(provider, models),
-        source=source,
-    )
+        return _model_options_json(
+            payload.ai_provider, _fallback_models(provider), "fallback_provider_empty"
+        )
+    return _model_options_json(payload.ai_provider, models, "provider_api")
 
 
 @router.get("/ai-config", response_model=AIConfigResponse)
 def get_ai_config(
     user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ) -> AIConfigResponse:
-    cfg = db.query(UserAIConfig).filter(UserAIConfig.user_id == user.id).first()
+    cfg = db.execute(
+        select(
+            UserAIConfig.ai_provider,
+            UserAIConfig.ai_model,
+            UserAIConfig.ai_reasoning_model,
+            UserAIConfig.ai_deep_thinker_model,
+            UserAIConfig.ai_utility_model,
+            UserAIConfig.encrypted_api_key,
+        ).where(UserAIConfig.user_id == user.id)
+    ).first()
     if not cfg:
         raise HTTPException(status_code=404, detail="AI config not found")
 
@@ -483,11 +636,12 @@ def get_ai_config(
 
 @router.delete("/ai-config", status_code=status.HTTP_204_NO_CONTENT)
 def revoke_ai_config(user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> None:
-    cfg = db.query(UserAIConfig).filter(UserAIConfig.user_id == user.id).first()
-    if not cfg:
+    deleted = db.execute(delete(UserAIConfig).where(UserAIConfig.user_id == user.id)).rowcount
+    if not deleted:
         raise HTTPException(status_code=404, detail="AI config not found")
-    db.delete(cfg)
     db.commit()
+    invalidate_user_cache(user.id)
+    _invalidate_key_cache(user.id)
 
 
 @router.put("/change-password", status_code=status.HTTP_204_NO_CONTENT)
@@ -500,6 +654,7 @@ def change_password(
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     user.password_hash = get_password_hash(payload.new_password)
     db.commit()
+    invalidate_user_cache(user.id)
 
 
 @router.get("/model-usage", response_model=ModelUsageResponse)
@@ -573,6 +728,7 @@ def reset_user_data(
         )
         deleted_rows += int(count or 0)
     db.commit()
+    invalidate_coaching_context(user.id)
     return ResetResult(deleted_rows=deleted_rows)
 
 
@@ -596,6 +752,7 @@ def reset_daily_data(
         )
         deleted_rows += int(count or 0)
     db.commit()
+    invalidate_coaching_context(user.id)
     return ResetResult(deleted_rows=deleted_rows)
 
 
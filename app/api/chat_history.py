@@ -1,12 +1,14 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
-from sqlalchemy import func
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
+from app.core.responses import model_json_response
 from app.db.models import ChatMessage, ChatThread, User
 from app.db.session import get_db
 
@@ -40,6 +42,7 @@ class ThreadMessagesResponse(BaseModel):
     thread_id: int
     title: str
     messages: list[MessageItem]
+    next_after_id: Optional[int] = None
 
 
 def get_or_create_chat_thread(
@@ -63,12 +66,13 @@ def get_or_create_chat_thread(
     title = first_line[:90] if first_line else "New Chat"
     if len(first_line) > 90:
         title = f"{title.rstrip()}..."
+    now = datetime.now(timezone.utc)
     thread = ChatThread(
         user_id=user_id,
         title=title or "New Chat",
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
-        last_message_at=datetime.now(timezone.utc),
+        created_at=now,
+        updated_at=now,
+        last_message_at=now,
     )
     db.add(thread)
     db.flush()
@@ -85,26 +89,33 @@ def persist_chat_turn(
     mode: Optional[str],
 ) -> None:
     now = datetime.now(timezone.utc)
-    user_msg = ChatMessage(
-        thread_id=thread.id,
-        user_id=user_id,
-        role="user",
-        content=user_text[:8000],
-        mode=mode,
-        created_at=now,
+    # Core insert/update skip ORM instance construction for the two message rows.
+    db.execute(
+        insert(ChatMessage),
+        [
+            {
+                "thread_id": thread.id,
+                "user_id": user_id,
+                "role": "user",
+                "content": user_text[:8000],
+                "mode": mode,
+                "created_at": now,
+            },
+            {
+                "thread_id": thread.id,
+                "user_id": user_id,
+                "role": "assistant",
+                "content": assistant_text[:20000],
+                "mode": mode,
+                "created_at": now,
+            },
+        ],
     )
-    assistant_msg = ChatMessage(
-        thread_id=thread.id,
-        user_id=user_id,
-        role="assistant",
-        content=assistant_text[:20000],
-        mode=mode,
-        created_at=now,
+    db.execute(
+        update(ChatThread)
+        .where(ChatThread.id == thread.id)
+        .values(last_message_at=now, updated_at=now, message_count=ChatThread.message_count + 2)
     )
-    thread.last_message_at = now
-    thread.updated_at = now
-    db.add(user_msg)
-    db.add(assistant_msg)
     db.commit()
 
 
@@ -112,17 +123,15 @@ def persist_chat_turn(
 def list_threads(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> ThreadListResponse:
+) -> Response:
     rows = (
         db.query(
             ChatThread.id.label("thread_id"),
             ChatThread.title,
             ChatThread.updated_at,
-            func.count(ChatMessage.id).label("message_count"),
+            ChatThread.message_count,
         )
-        .outerjoin(ChatMessage, ChatMessage.thread_id == ChatThread.id)
         .filter(ChatThread.user_id == user.id)
-        .group_by(ChatThread.id)
         .order_by(ChatThread.last_message_at.desc(), ChatThread.id.desc())
         .all()
     )
@@ -135,7 +144,8 @@ def list_threads(
         )
         for row in rows
     ]
-    return ThreadListResponse(items=items)
+    # Items are built from typed columns; skip FastAPI's second validation pass.
+    return model_json_response(ThreadListResponse(items=items))
 
 
 @router.post("/threads", response_model=ThreadItem, status_code=status.HTTP_201_CREATED)
@@ -167,22 +177,28 @@ def create_thread(
 @router.get("/threads/{thread_id}/messages", response_model=ThreadMessagesResponse)
 def get_thread_messages(
     thread_id: int,
+    after_id: Optional[int] = Query(default=None, ge=0),
+    limit: int = Query(default=100, ge=1, le=500),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> ThreadMessagesResponse:
-    thread = (
-        db.query(ChatThread)
-        .filter(ChatThread.id == thread_id, ChatThread.user_id == user.id)
-        .first()
-    )
+) -> Response:
+    thread = db.execute(
+        select(ChatThread.id, ChatThread.title).where(ChatThread.id == thread_id, ChatThread.user_id == user.id)
+    ).first()
     if not thread:
         raise HTTPException(status_code=404, detail="Chat thread not found")
-    rows = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.thread_id == thread.id, ChatMessage.user_id == user.id)
-        .order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
-        .all()
+    # Keyset page on id; fetch one extra row to know whether another page exists.
+    stmt = (
+        select(ChatMessage.id, ChatMessage.role, ChatMessage.content, ChatMessage.mode, ChatMessage.created_at)
+        .where(ChatMessage.thread_id == thread.id, ChatMessage.user_id == user.id)
+        .order_by(ChatMessage.id.asc())
+        .limit(limit + 1)
     )
+    if after_id is not None:
+        stmt = stmt.where(ChatMessage.id > after_id)
+    rows = db.execute(stmt).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     messages = [
         MessageItem(
             id=row.id,
@@ -193,4 +209,10 @@ def get_thread_messages(
         )
         for row in rows
     ]
-    return ThreadMessagesResponse(thread_id=thread.id, title=thread.title, messages=messages)
+    response = ThreadMessagesResponse(
+        thread_id=thread.id,
+        title=thread.title,
+        messages=messages,
+        next_after_id=(rows[-1].id if has_more else None),
+    )
+    return model_json_response(response)
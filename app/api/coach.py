@@ -1,40 +1,63 @@
+import inspect
 import json
 import logging
 import os
 import re
-import time
 from datetime import date, datetime, timedelta, timezone
-from enum import Enum
-from typing import Any, Optional, Union
-
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-from pydantic import BaseModel, Field
+from enum import StrEnum
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Sequence, Union
+
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Request, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from app.api import summary as summary_api
 from app.api.auth import get_current_user
 from app.api.chat_history import get_or_create_chat_thread, persist_chat_turn
 from app.core.agent_contracts import render_agent_system_prompt
-from app.core.context_builder import build_coaching_context
+from app.core.cache import TTLCache
+from app.core.coach_cache import (
+    cache_response,
+    claim_in_flight,
+    coach_cache_key,
+    context_fingerprint,
+    find_similar_response,
+    get_cached_response,
+    release_in_flight,
+    remember_similar_response,
+    wait_for_in_flight,
+)
+from app.core.context_builder import get_coaching_context, invalidate_coaching_context
+from app.core.json_codec import dumps_compact, loads
 from app.core.persona import apply_longevity_alchemist_voice
+from app.core.responses import model_json_bytes, model_json_response
 from app.core.safety import (
-    detect_urgent_flags,
+    SafetyResult,
+    classify_safety,
     emergency_response,
     has_supplement_topic,
     supplement_caution_text,
 )
-from app.db.models import ConversationSummary, DailyLog, FeedbackEntry, Metric, User
-from app.db.session import get_db
+from app.db.models import ChatThread, DailyLog, FeedbackEntry, Metric, User
+from app.db.session import SessionLocal, get_db
+from app.db.summary_writer import enqueue_summary
 from app.services.llm import LLMClient, LLMRequestError, get_llm_client
 
 router = APIRouter(prefix="/coach", tags=["coach"])
 logger = logging.getLogger("uvicorn.error")
-CACHE_TTL_SECONDS = int(os.getenv("COACH_CACHE_TTL_SECONDS", "75"))
 COACH_IMAGE_MAX_BYTES = int(os.getenv("COACH_IMAGE_MAX_BYTES", str(8 * 1024 * 1024)))
-_COACH_RESPONSE_CACHE: dict[tuple[int, str, str, bool], tuple[float, Any]] = {}
+PROACTIVE_CARD_INPUTS_CACHE_TTL_SECONDS = int(os.getenv("PROACTIVE_CARD_INPUTS_CACHE_TTL_SECONDS", "60"))
+_PROACTIVE_CARD_INPUTS_CACHE = TTLCache(maxsize=1024, ttl=max(PROACTIVE_CARD_INPUTS_CACHE_TTL_SECONDS, 1))
 
 
-class CoachMode(str, Enum):
+class CoachMode(StrEnum):
     quick = "quick"
     deep = "deep"
 
@@ -48,6 +71,19 @@ class CoachQuestionRequest(BaseModel):
     web_search: bool = True
 
 
+_COACH_QUESTION_ADAPTER = TypeAdapter(CoachQuestionRequest)
+
+
+async def _coach_question_payload(request: Request) -> CoachQuestionRequest:
+    # Validate the raw JSON bytes in one pydantic-core pass instead of FastAPI's decode-then-validate path.
+    try:
+        return _COACH_QUESTION_ADAPTER.validate_json(await request.body())
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in exc.errors(include_url=False)]
+        ) from exc
+
+
 class CoachVoiceRequest(BaseModel):
     transcript: str = Field(min_length=2, max_length=2000)
     mode: CoachMode = CoachMode.quick
@@ -146,41 +182,56 @@ class ProactiveCardResponse(BaseModel):
     markdown: str
 
 
-def _disclaimer() -> str:
-    return "This is coaching guidance, not medical diagnosis."
+_DISCLAIMER = "This is coaching guidance, not medical diagnosis."
+_FALLBACK_RATIONALE = (
+    "Baseline and recent trends are the strongest inputs for tailored coaching.",
+    "Small, consistent changes beat aggressive short-term plans.",
+    "We can tighten recommendations once more data is available.",
+)
+# RecommendedAction instances are never mutated after construction, so they are shared across responses.
+_FALLBACK_ACTIONS = (
+    RecommendedAction.model_construct(
+        title="Take one low-friction next step",
+        steps=[
+            "Pick one behavior to execute daily for 7 days.",
+            "Log the result at the same time each day.",
+            "Review trend direction before changing plan.",
+        ],
+    ),
+)
+_FALLBACK_SUGGESTED = (
+    "What is the one outcome you want to improve first over the next 14 days?",
+    "What single daily metric can you reliably track at the same time each day?",
+    "What usually gets in the way of consistency for you during a typical week?",
+)
+_RAW_FALLBACK_RATIONALE = (
+    "Your baseline and 7-day trends were used to shape this answer.",
+    "Focus on consistency before increasing plan complexity.",
+    "A weekly review helps adjust the plan with better signal.",
+)
 
 
 def _fallback_response(answer: str, safety_flags: Optional[list[str]] = None) -> CoachQuestionResponse:
-    return CoachQuestionResponse(
+    # Lists are copied because the post-processing steps extend them per response.
+    return CoachQuestionResponse.model_construct(
         answer=answer,
-        rationale_bullets=[
-            "Baseline and recent trends are the strongest inputs for tailored coaching.",
-            "Small, consistent changes beat aggressive short-term plans.",
-            "We can tighten recommendations once more data is available.",
-        ],
-        recommended_actions=[
-            {
-                "title": "Take one low-friction next step",
-                "steps": [
-                    "Pick one behavior to execute daily for 7 days.",
-                    "Log the result at the same time each day.",
-                    "Review trend direction before changing plan.",
-                ],
-            }
-        ],
-        suggested_questions=[
-            "What is the one outcome you want to improve first over the next 14 days?",
-            "What single daily metric can you reliably track at the same time each day?",
-            "What usually gets in the way of consistency for you during a typical week?",
-        ],
+        rationale_bullets=list(_FALLBACK_RATIONALE),
+        recommended_actions=list(_FALLBACK_ACTIONS),
+        suggested_questions=list(_FALLBACK_SUGGESTED),
         safety_flags=safety_flags or [],
-        disclaimer=_disclaimer(),
+        disclaimer=_DISCLAIMER,
     )
 
 
-def _practical_non_llm_response(payload: CoachQuestionRequest, context: dict[str, Any], flag: str) -> CoachQuestionResponse:
-    question_lower = payload.question.lower()
-    is_supplement = "supplement" in question_lower or has_supplement_topic(payload.question)
+def _emergency_coach_response() -> CoachQuestionResponse:
+    emergency = emergency_response()
+    emergency["recommended_actions"] = [
+        RecommendedAction.model_construct(**action) for action in emergency["recommended_actions"]
+    ]
+    return CoachQuestionResponse.model_construct(**emergency)
+
+
+def _practical_non_llm_response(context: dict[str, Any], flag: str, is_supplement: bool) -> CoachQuestionResponse:
     if flag == "llm_rate_limited":
         issue_prefix = "I hit provider limits right now"
     elif flag in {"llm_auth_error", "llm_model_not_found"}:
@@ -188,7 +239,7 @@ def _practical_non_llm_response(payload: CoachQuestionRequest, context: dict[str
     else:
         issue_prefix = "I hit a temporary AI service/network issue right now"
     if is_supplement:
-        return CoachQuestionResponse(
+        return CoachQuestionResponse.model_construct(
             answer=(
                 f"{issue_prefix}, so here is a safe starter supplement framework you can use immediately. "
                 "First, list exact dosages and labels for omega-3, CoQ10, Centrum 50+, B12, and vitamin D. "
@@ -201,7 +252,7 @@ def _practical_non_llm_response(payload: CoachQuestionRequest, context: dict[str
                 "Use one change at a time for 7-14 days to attribute effects.",
             ],
             recommended_actions=[
-                RecommendedAction(
+                RecommendedAction.model_construct(
                     title="Build a clean baseline stack",
                     steps=[
                         "Create one table with supplement name, dose, timing, and reason.",
@@ -209,7 +260,7 @@ def _practical_non_llm_response(payload: CoachQuestionRequest, context: dict[str
                         "Pause non-essential extras until overlap is clarified.",
                     ],
                 ),
-                RecommendedAction(
+                RecommendedAction.model_construct(
                     title="Run a 2-week response check",
                     steps=[
                         "Keep timing consistent each day.",
@@ -224,11 +275,11 @@ def _practical_non_llm_response(payload: CoachQuestionRequest, context: dict[str
                 "What are your height, current weight, target weight, and typical daily eating pattern (including alcohol)?",
             ],
             safety_flags=[flag],
-            disclaimer=_disclaimer(),
+            disclaimer=_DISCLAIMER,
         )
 
     goal = ((context.get("baseline") or {}).get("primary_goal") or "your goal")
-    return CoachQuestionResponse(
+    return CoachQuestionResponse.model_construct(
         answer=(
             f"{issue_prefix}, but we can still run a practical plan for {goal}. "
             "Use one small daily action this week and track one outcome metric."
@@ -239,7 +290,7 @@ def _practical_non_llm_response(payload: CoachQuestionRequest, context: dict[str
             "Weekly review improves adaptation and consistency.",
         ],
         recommended_actions=[
-            RecommendedAction(
+            RecommendedAction.model_construct(
                 title="Run a 7-day micro-plan",
                 steps=[
                     "Pick one behavior linked to your goal.",
@@ -254,17 +305,18 @@ def _practical_non_llm_response(payload: CoachQuestionRequest, context: dict[str
             "What time each day will you complete the check-in so it is realistic and repeatable?",
         ],
         safety_flags=[flag],
-        disclaimer=_disclaimer(),
+        disclaimer=_DISCLAIMER,
     )
 
 
-def _safe_list(value: Any, min_items: int, max_items: int, fallback: list[str]) -> list[str]:
+def _safe_list(value: Any, min_items: int, max_items: int, fallback: Sequence[str]) -> list[str]:
     if not isinstance(value, list):
-        return fallback
-    cleaned = [str(v).strip() for v in value if str(v).strip()]
+        return list(fallback)
+    # max_items >= min_items, so the first max_items non-empty entries decide both checks.
+    cleaned = list(islice((text for v in value if (text := str(v).strip())), max_items))
     if len(cleaned) < min_items:
-        return fallback
-    return cleaned[:max_items]
+        return list(fallback)
+    return cleaned
 
 
 def _safe_actions(value: Any) -> list[RecommendedAction]:
@@ -275,42 +327,48 @@ def _safe_actions(value: Any) -> list[RecommendedAction]:
         if not isinstance(item, dict):
             continue
         title = str(item.get("title", "")).strip()
+        if not title:
+            continue
         steps_raw = item.get("steps", [])
-        if not title or not isinstance(steps_raw, list):
+        if not isinstance(steps_raw, list):
             continue
-        steps = [str(step).strip() for step in steps_raw if str(step).strip()]
+        # Only the first five non-empty steps are kept, so stop stripping once they are found.
+        steps = list(islice((text for step in steps_raw if (text := str(step).strip())), 5))
         if not steps:
             continue
-        actions.append(RecommendedAction(title=title, steps=steps[:5]))
-    return actions[:3]
+        actions.append(RecommendedAction.model_construct(title=title, steps=steps))
+        if len(actions) == 3:
+            break
+    return actions
 
 
-def _extract_answer_from_json_blob(text: str) -> str:
-    candidate = (text or "").strip()
-    if not candidate:
-        return ""
-    if '"answer"' not in candidate:
-        return ""
-    match = re.search(r'"answer"\s*:\s*"((?:\\.|[^"\\])*)"', candidate, flags=re.DOTALL)
+_ANSWER_FIELD_RE = re.compile(r'"answer"\s*:\s*"((?:\\.|[^"\\])*)"', re.DOTALL)
+
+
+def _extract_answer_from_json_blob(text: str, start: int = 0) -> str:
+    match = _ANSWER_FIELD_RE.search(text, start)
     if not match:
         return ""
     raw_value = match.group(1)
     try:
-        return str(json.loads(f"\"{raw_value}\"")).strip()
+        return str(loads(f"\"{raw_value}\"")).strip()
     except json.JSONDecodeError:
         return raw_value.replace("\\n", "\n").replace('\\"', '"').strip()
 
 
 def _normalize_answer_text(answer: str) -> str:
     text = (answer or "").strip()
-    if not text:
+    # Plain prose is the common case: one find() decides it without the regex or further scans.
+    key_at = text.find('"answer"')
+    if key_at < 0:
         return text
-    extracted = _extract_answer_from_json_blob(text)
+    extracted = _extract_answer_from_json_blob(text, key_at)
     if extracted:
         return extracted
     # If the model echoed a malformed JSON object, hide it and keep only any prefix text.
-    if "{" in text and '"answer"' in text:
-        return text.split("{", 1)[0].strip() or "I generated a partial response. Please retry."
+    brace = text.find("{")
+    if brace >= 0:
+        return text[:brace].strip() or "I generated a partial response. Please retry."
     return text
 
 
@@ -331,54 +389,76 @@ def _response_from_raw(raw: dict[str, Any], mode: str) -> CoachQuestionResponse:
         raw.get("rationale_bullets"),
         min_items=3,
         max_items=7,
-        fallback=[
-            "Your baseline and 7-day trends were used to shape this answer.",
-            "Focus on consistency before increasing plan complexity.",
-            "A weekly review helps adjust the plan with better signal.",
-        ],
+        fallback=_RAW_FALLBACK_RATIONALE,
     )
     recommended_actions = _safe_actions(raw.get("recommended_actions"))
     if not recommended_actions:
-        recommended_actions = _fallback_response("x").recommended_actions
+        recommended_actions = list(_FALLBACK_ACTIONS)
     suggested_questions = _safe_list(
         raw.get("suggested_questions"),
         min_items=3,
         max_items=8,
-        fallback=_fallback_response("x").suggested_questions,
+        fallback=_FALLBACK_SUGGESTED,
     )
-    safety_flags = _safe_list(raw.get("safety_flags"), min_items=0, max_items=8, fallback=[])
-    return CoachQuestionResponse(
+    safety_flags = _safe_list(raw.get("safety_flags"), min_items=0, max_items=8, fallback=())
+    return CoachQuestionResponse.model_construct(
         answer=apply_longevity_alchemist_voice(answer, mode),
         rationale_bullets=rationale_bullets,
         recommended_actions=recommended_actions[:3],
         suggested_questions=suggested_questions,
         safety_flags=safety_flags,
-        disclaimer=_disclaimer(),
+        disclaimer=_DISCLAIMER,
     )
 
 
-def _daily_log_focus(context: dict[str, Any], question: str) -> tuple[str, list[str]]:
+def _apply_supplement_caution(response: CoachQuestionResponse) -> None:
+    # Every response path builds fresh lists, so these can be extended in place.
+    if "supplement_caution" not in response.safety_flags:
+        response.safety_flags.append("supplement_caution")
+    if len(response.rationale_bullets) > 6:
+        del response.rationale_bullets[6:]
+    response.rationale_bullets.append(supplement_caution_text())
+
+
+# Always keep core structured fields, but reorder emphasis by goal/interest. First matching row wins.
+_DAILY_LOG_FOCUS_RULES: tuple[tuple[re.Pattern[str], tuple[str, ...], str], ...] = (
+    (
+        re.compile(r"energy|fatigue"),
+        ("sleep hours", "stress", "energy", "mood", "training", "nutrition", "short note"),
+        "energy and recovery",
+    ),
+    (
+        re.compile(r"weight|fat loss|body comp|metabolic"),
+        ("nutrition", "training", "sleep hours", "energy", "stress", "mood", "short note"),
+        "body composition and metabolic consistency",
+    ),
+    (
+        re.compile(r"heart|bp|blood pressure|cardio"),
+        ("stress", "sleep hours", "training", "nutrition", "energy", "mood", "short note"),
+        "cardiometabolic stability",
+    ),
+    (
+        re.compile(r"mental|clarity|focus|cognitive"),
+        ("sleep hours", "mood", "stress", "energy", "training", "nutrition", "short note"),
+        "mental clarity and resilience",
+    ),
+)
+_DEFAULT_DAILY_LOG_FIELDS = ("sleep hours", "energy", "mood", "stress", "training", "nutrition", "short note")
+
+
+def _daily_log_focus(context: dict[str, Any], question: str) -> tuple[str, tuple[str, ...]]:
     baseline = context.get("baseline") or {}
     primary_goal = str(baseline.get("primary_goal") or "").strip()
     top_goals = baseline.get("top_goals") if isinstance(baseline.get("top_goals"), list) else []
     goal_blob = " ".join([primary_goal] + [str(g) for g in top_goals]).lower()
     question_lower = (question or "").lower()
 
-    # Always keep core structured fields, but reorder emphasis by goal/interest.
-    fields = ["sleep hours", "energy", "mood", "stress", "training", "nutrition", "short note"]
+    fields = _DEFAULT_DAILY_LOG_FIELDS
     focus = "consistency and trend quality"
-    if any(k in goal_blob for k in ["energy", "fatigue"]):
-        fields = ["sleep hours", "stress", "energy", "mood", "training", "nutrition", "short note"]
-        focus = "energy and recovery"
-    elif any(k in goal_blob for k in ["weight", "fat loss", "body comp", "metabolic"]):
-        fields = ["nutrition", "training", "sleep hours", "energy", "stress", "mood", "short note"]
-        focus = "body composition and metabolic consistency"
-    elif any(k in goal_blob for k in ["heart", "bp", "blood pressure", "cardio"]):
-        fields = ["stress", "sleep hours", "training", "nutrition", "energy", "mood", "short note"]
-        focus = "cardiometabolic stability"
-    elif any(k in goal_blob for k in ["mental", "clarity", "focus", "cognitive"]):
-        fields = ["sleep hours", "mood", "stress", "energy", "training", "nutrition", "short note"]
-        focus = "mental clarity and resilience"
+    for pattern, rule_fields, rule_focus in _DAILY_LOG_FOCUS_RULES:
+        if pattern.search(goal_blob):
+            fields, focus = rule_fields, rule_focus
+            break
 
     if "supplement" in question_lower:
         focus = f"{focus} and supplement response tracking"
@@ -408,7 +488,7 @@ def _apply_daily_log_nudge(
         f"Can you log daily for the next 7 days for {focus_line.split('For ', 1)[-1].rstrip('.')} "
         f"using: {field_text}?"
     )
-    if all(follow_up != item for item in response.suggested_questions):
+    if follow_up not in response.suggested_questions:
         response.suggested_questions = (response.suggested_questions + [follow_up])[:8]
 
     if "Daily logs will make your coaching sharper." not in response.answer:
@@ -421,31 +501,39 @@ def _apply_daily_log_nudge(
     return response
 
 
+def _keyword_re(*keywords: str) -> re.Pattern[str]:
+    # Plain substring alternation: search() matches exactly when any(k in text for k in keywords) would.
+    return re.compile("|".join(re.escape(k) for k in keywords))
+
+
+_GOAL_BUCKET_RULES: tuple[tuple[re.Pattern[str], str], ...] = (
+    (re.compile(r"weight|fat|body comp|metabolic"), "weight"),
+    (re.compile(r"heart|bp|blood pressure|lipid|cholesterol|cardio"), "cardio"),
+    (re.compile(r"energy|fatigue|recovery"), "energy"),
+    (re.compile(r"mental|clarity|focus|mood|stress"), "clarity"),
+)
+
+
 def _goal_bucket(context: dict[str, Any]) -> str:
     baseline = context.get("baseline") or {}
-    primary_goal = str(baseline.get("primary_goal") or "").lower()
+    primary_goal = str(baseline.get("primary_goal") or "")
     top_goals = baseline.get("top_goals") if isinstance(baseline.get("top_goals"), list) else []
-    blob = " ".join([primary_goal] + [str(g).lower() for g in top_goals])
-    if any(k in blob for k in ["weight", "fat", "body comp", "metabolic"]):
-        return "weight"
-    if any(k in blob for k in ["heart", "bp", "blood pressure", "lipid", "cholesterol", "cardio"]):
-        return "cardio"
-    if any(k in blob for k in ["energy", "fatigue", "recovery"]):
-        return "energy"
-    if any(k in blob for k in ["mental", "clarity", "focus", "mood", "stress"]):
-        return "clarity"
+    blob = " ".join([primary_goal] + [str(g) for g in top_goals]).lower()
+    for pattern, bucket in _GOAL_BUCKET_RULES:
+        if pattern.search(blob):
+            return bucket
     return "general"
 
 
+_HOUR_BUCKETS: tuple[str, ...] = (
+    ("late_night",) * 5 + ("morning",) * 7 + ("afternoon",) * 5 + ("evening",) * 5 + ("late_night",) * 2
+)
+
+
 def _daily_checkin_time_bucket(local_hour: Optional[int]) -> tuple[str, int]:
     hour = int(local_hour) if local_hour is not None else datetime.now().hour
-    if 5 <= hour <= 11:
-        return "morning", hour
-    if 12 <= hour <= 16:
-        return "afternoon", hour
-    if 17 <= hour <= 21:
-        return "evening", hour
-    return "late_night", hour
+    # local_hour is validated to 0-23 on the request model.
+    return _HOUR_BUCKETS[hour], hour
 
 
 def _daily_checkin_local_date(timezone_offset_minutes: Optional[int]) -> date:
@@ -455,6 +543,22 @@ def _daily_checkin_local_date(timezone_offset_minutes: Optional[int]) -> date:
     return (now_utc - timedelta(minutes=int(timezone_offset_minutes))).date()
 
 
+_DAILY_CHECKIN_METRIC_TYPES = ("weight_kg", "bp_systolic", "bp_diastolic", "resting_hr_bpm")
+_WEEKLY_CHECKIN_AGGREGATES = (
+    func.count(DailyLog.id).label("entries"),
+    func.avg(DailyLog.sleep_hours).label("avg_sleep_hours"),
+    func.avg(DailyLog.energy).label("avg_energy"),
+    func.avg(DailyLog.mood).label("avg_mood"),
+    func.avg(DailyLog.stress).label("avg_stress"),
+    func.sum(case((DailyLog.training_done, 1), else_=0)).label("training_days"),
+    func.sum(case((DailyLog.nutrition_on_plan, 1), else_=0)).label("nutrition_logged_days"),
+)
+
+
+def _round_avg(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(float(value), 2)
+
+
 def _build_daily_weekly_checkin_context(
     *,
     db: Session,
@@ -467,26 +571,13 @@ def _build_daily_weekly_checkin_context(
         .filter(DailyLog.user_id == user_id, DailyLog.log_date == local_date)
         .first()
     )
-    weekly_rows = (
-        db.query(DailyLog)
-        .filter(
+    weekly = db.execute(
+        select(*_WEEKLY_CHECKIN_AGGREGATES).where(
             DailyLog.user_id == user_id,
             DailyLog.log_date >= (local_date - timedelta(days=6)),
             DailyLog.log_date <= local_date,
         )
-        .order_by(DailyLog.log_date.asc())
-        .all()
-    )
-    metric_types = [
-        "weight_kg",
-        "bp_systolic",
-        "bp_diastolic",
-        "resting_hr_bpm",
-        "sleep_hours",
-        "energy_1_10",
-        "stress_1_10",
-        "mood_1_10",
-    ]
+    ).one()
     offset_min = int(timezone_offset_minutes or 0)
     # Convert local-day boundaries to UTC for metric querying.
     start_dt = (
@@ -497,25 +588,34 @@ def _build_daily_weekly_checkin_context(
         datetime.combine(local_date, datetime.max.time()).replace(tzinfo=timezone.utc)
         + timedelta(minutes=offset_min)
     )
-    today_metrics = (
-        db.query(Metric)
-        .filter(
+    # Only the latest reading of each type today is used, so rank in SQL and fetch one row per type.
+    ranked = (
+        select(
+            Metric.metric_type,
+            Metric.value_num,
+            func.row_number()
+            .over(partition_by=Metric.metric_type, order_by=(Metric.taken_at.desc(), Metric.id.desc()))
+            .label("rank"),
+        )
+        .where(
             Metric.user_id == user_id,
-            Metric.metric_type.in_(metric_types),
+            Metric.metric_type.in_(_DAILY_CHECKIN_METRIC_TYPES),
             Metric.taken_at >= start_dt,
             Metric.taken_at <= end_dt,
         )
-        .order_by(Metric.taken_at.asc())
-        .all()
+        .subquery()
     )
-    by_metric: dict[str, list[float]] = {}
-    for m in today_metrics:
-        by_metric.setdefault(m.metric_type, []).append(float(m.value_num))
+    latest_metric: dict[str, float] = {
+        metric_type: float(value)
+        for metric_type, value in db.execute(
+            select(ranked.c.metric_type, ranked.c.value_num).where(ranked.c.rank == 1)
+        )
+    }
 
     parsed_checkin: dict[str, Any] = {}
     if today_row and today_row.checkin_payload_json:
         try:
-            loaded = json.loads(today_row.checkin_payload_json)
+            loaded = loads(today_row.checkin_payload_json)
             if isinstance(loaded, dict):
                 parsed_checkin = loaded
         except json.JSONDecodeError:
@@ -525,49 +625,36 @@ def _build_daily_weekly_checkin_context(
     if isinstance(parsed_checkin.get("answers"), dict):
         answered_keys = {str(k) for k in parsed_checkin["answers"].keys() if str(k).strip()}
 
-    captured_keys = set()
-    if today_row and today_row.sleep_hours is not None:
-        captured_keys.add("sleep_hours")
-    if today_row and today_row.energy is not None:
-        captured_keys.add("energy")
-    if today_row and today_row.mood is not None:
-        captured_keys.add("mood")
-    if today_row and today_row.stress is not None:
-        captured_keys.add("stress")
-    if today_row and today_row.training_done:
-        captured_keys.add("training_done")
-    if today_row and today_row.nutrition_on_plan:
-        captured_keys.add("nutrition_on_plan")
-    if by_metric.get("weight_kg"):
-        captured_keys.add("weight_kg")
-    if by_metric.get("bp_systolic") or by_metric.get("bp_diastolic"):
-        captured_keys.add("bp")
-    if by_metric.get("resting_hr_bpm"):
-        captured_keys.add("resting_hr_bpm")
-    if "meds_taken" in answered_keys:
-        captured_keys.add("meds_taken")
-    if "hydration_progress" in answered_keys:
-        captured_keys.add("hydration_progress")
-
-    def _avg(values: list[Optional[float]]) -> Optional[float]:
-        numbers = [float(v) for v in values if v is not None]
-        if not numbers:
-            return None
-        return round(sum(numbers) / len(numbers), 2)
+    has_row = today_row is not None
+    # Listed alphabetically, which is the order the summary has always reported them in.
+    capture_checks = (
+        ("bp", "bp_systolic" in latest_metric or "bp_diastolic" in latest_metric),
+        ("energy", has_row and today_row.energy is not None),
+        ("hydration_progress", "hydration_progress" in answered_keys),
+        ("meds_taken", "meds_taken" in answered_keys),
+        ("mood", has_row and today_row.mood is not None),
+        ("nutrition_on_plan", has_row and bool(today_row.nutrition_on_plan)),
+        ("resting_hr_bpm", "resting_hr_bpm" in latest_metric),
+        ("sleep_hours", has_row and today_row.sleep_hours is not None),
+        ("stress", has_row and today_row.stress is not None),
+        ("training_done", has_row and bool(today_row.training_done)),
+        ("weight_kg", "weight_kg" in latest_metric),
+    )
+    captured_keys = [key for key, captured in capture_checks if captured]
 
     weekly_summary = {
-        "entries": len(weekly_rows),
-        "avg_sleep_hours": _avg([row.sleep_hours for row in weekly_rows]),
-        "avg_energy": _avg([float(row.energy) for row in weekly_rows]),
-        "avg_mood": _avg([float(row.mood) for row in weekly_rows]),
-        "avg_stress": _avg([float(row.stress) for row in weekly_rows]),
-        "training_days": sum(1 for row in weekly_rows if row.training_done),
-        "nutrition_logged_days": sum(1 for row in weekly_rows if row.nutrition_on_plan),
+        "entries": weekly.entries,
+        "avg_sleep_hours": _round_avg(weekly.avg_sleep_hours),
+        "avg_energy": _round_avg(weekly.avg_energy),
+        "avg_mood": _round_avg(weekly.avg_mood),
+        "avg_stress": _round_avg(weekly.avg_stress),
+        "training_days": int(weekly.training_days or 0),
+        "nutrition_logged_days": int(weekly.nutrition_logged_days or 0),
     }
     daily_summary = {
         "log_date": local_date.isoformat(),
         "daily_log_exists": bool(today_row),
-        "captured_keys": sorted(captured_keys),
+        "captured_keys": captured_keys,
         "answered_keys": sorted(answered_keys),
         "today_log": {
             "sleep_hours": (today_row.sleep_hours if today_row else None),
@@ -578,275 +665,294 @@ def _build_daily_weekly_checkin_context(
             "nutrition_on_plan": (bool(today_row.nutrition_on_plan) if today_row else False),
         },
         "today_metrics": {
-            "weight_kg": (by_metric.get("weight_kg") or [None])[-1],
-            "bp_systolic": (by_metric.get("bp_systolic") or [None])[-1],
-            "bp_diastolic": (by_metric.get("bp_diastolic") or [None])[-1],
-            "resting_hr_bpm": (by_metric.get("resting_hr_bpm") or [None])[-1],
+            "weight_kg": latest_metric.get("weight_kg"),
+            "bp_systolic": latest_metric.get("bp_systolic"),
+            "bp_diastolic": latest_metric.get("bp_diastolic"),
+            "resting_hr_bpm": latest_metric.get("resting_hr_bpm"),
         },
         "checkin_payload": parsed_checkin,
     }
     return daily_summary, weekly_summary
 
 
-def _daily_checkin_specialist_plan(
-    *,
-    context: dict[str, Any],
-    local_hour: Optional[int],
-    daily_summary: dict[str, Any],
-    weekly_summary: dict[str, Any],
-) -> DailyCheckinPlanResponse:
-    bucket, hour = _daily_checkin_time_bucket(local_hour)
-    goal_focus = _goal_bucket(context)
-    baseline = context.get("baseline") or {}
-    primary_goal = str(baseline.get("primary_goal") or "").strip() or "your current goal"
-    captured_keys = {str(k) for k in (daily_summary.get("captured_keys") or [])}
-    answered_keys = {str(k) for k in (daily_summary.get("answered_keys") or [])}
-    has_meds = bool(str(baseline.get("medication_details") or "").strip()) and str(
-        baseline.get("medication_details")
-    ).lower() != "unknown"
-
-    def _needs(key: str) -> bool:
-        return key not in captured_keys and key not in answered_keys
+class _CheckinQuestionRow(NamedTuple):
+    key: str
+    label: str
+    specialist: str
+    question: str
+    type: str
+    min: Optional[float] = None
+    max: Optional[float] = None
+    buckets: Optional[frozenset[str]] = None
+    goal_focuses: Optional[frozenset[str]] = None
+    needs_meds: bool = False
+    always: bool = False
 
-    proposals: dict[str, DailyCheckinQuestion] = {}
 
-    if _needs("sleep_hours"):
-        proposals["sleep_hours"] = DailyCheckinQuestion(
-            key="sleep_hours",
-            label="Sleep Hours",
-            specialist="Sleep Expert",
-            question="How many total hours did you sleep in your most recent sleep period?",
-            type="float",
-            min=0,
-            max=16,
-        )
-    if _needs("energy"):
-        proposals["energy"] = DailyCheckinQuestion(
-            key="energy",
-            label="Energy",
-            specialist="Recovery & Stress Regulator",
-            question=f"What is your {bucket.replace('_', ' ')} energy right now (1-10)?",
-            type="int",
-            min=1,
-            max=10,
-        )
-    if _needs("mood"):
-        proposals["mood"] = DailyCheckinQuestion(
-            key="mood",
-            label="Mood",
-            specialist="Behavior Architect",
-            question=f"What is your {bucket.replace('_', ' ')} mood right now (1-10)?",
-            type="int",
-            min=1,
-            max=10,
-        )
-    if _needs("stress"):
-        proposals["stress"] = DailyCheckinQuestion(
-            key="stress",
-            label="Stress",
-            specialist="Recovery & Stress Regulator",
-            question=f"What is your {bucket.replace('_', ' ')} stress load right now (1-10)?",
-            type="int",
-            min=1,
-            max=10,
-        )
-    if _needs("training_done"):
-        proposals["training_done"] = DailyCheckinQuestion(
-            key="training_done",
-            label="Training Done",
-            specialist="Movement Coach",
-            question=(
-                "Did you complete training yet today? (yes/no). "
-                "If yes, include what you did and duration."
-            ),
-            type="bool",
-        )
-    if _needs("nutrition_on_plan"):
-        proposals["nutrition_on_plan"] = DailyCheckinQuestion(
-            key="nutrition_on_plan",
-            label="Food Logged",
-            specialist="Nutritionist",
-            question=(
-                "Did you log what you ate so far today? (yes/no). "
-                "If yes, include foods/portions. If no, include what you ate and whether you want to log details now or later."
-            ),
-            type="bool",
-        )
-    if _needs("hydration_progress"):
-        proposals["hydration_progress"] = DailyCheckinQuestion(
-            key="hydration_progress",
-            label="Hydration",
-            specialist="Recovery & Stress Regulator",
-            question=(
-                "How much water/fluids have you had so far today (cups or ml), and what is your target for today?"
-            ),
-            type="text",
-        )
-    if has_meds and _needs("meds_taken"):
-        time_hint = "morning meds" if bucket in {"morning", "afternoon"} else "evening meds"
-        proposals["meds_taken"] = DailyCheckinQuestion(
-            key="meds_taken",
-            label="Medication Check",
-            specialist="Safety Clinician",
-            question=(
-                f"Which prescribed {time_hint} have you taken today, and at what time? "
-                "If not yet, say when you plan to take them."
-            ),
-            type="text",
-        )
-    if _needs("weight_kg") and bucket in {"morning", "afternoon"}:
-        proposals["weight_kg"] = DailyCheckinQuestion(
-            key="weight_kg",
-            label="Weight",
-            specialist="Cardiometabolic Strategist",
-            question="What was your latest body weight today? (kg or lb)",
-            type="weight",
-        )
-    if _needs("bp") and goal_focus in {"cardio", "weight", "general"}:
-        proposals["bp"] = DailyCheckinQuestion(
-            key="bp",
-            label="Blood Pressure",
-            specialist="Cardiometabolic Strategist",
-            question="If available, share your latest blood-pressure reading today (for example 122/82).",
-            type="bp",
-        )
-    if _needs("resting_hr_bpm") and goal_focus in {"cardio", "energy", "general"}:
-        proposals["resting_hr_bpm"] = DailyCheckinQuestion(
-            key="resting_hr_bpm",
-            label="Resting HR",
-            specialist="Cardiometabolic Strategist",
-            question="If available, share your latest resting heart rate today (bpm).",
-            type="int",
-            min=35,
-            max=180,
-        )
-    if _needs("notes"):
-        proposals["notes"] = DailyCheckinQuestion(
-            key="notes",
-            label="Goal Strategist Note",
-            specialist="Goal Strategist",
-            question=(
-                "What is the biggest blocker or win from today that impacts your weekly goal progression?"
-            ),
-            type="text",
-        )
-    proposals["tracked_signals"] = DailyCheckinQuestion(
-        key="tracked_signals",
-        label="Signals Logged",
-        specialist="Orchestrator",
-        question=(
+# Fallback check-in questions in proposal order. {bucket} and {time_hint} are filled per request; a row
+# is proposed while its key is still uncaptured and its bucket/goal/meds gates pass.
+_CHECKIN_QUESTION_CATALOG: tuple[_CheckinQuestionRow, ...] = (
+    _CheckinQuestionRow(
+        "sleep_hours",
+        "Sleep Hours",
+        "Sleep Expert",
+        "How many total hours did you sleep in your most recent sleep period?",
+        "float",
+        min=0.0,
+        max=16.0,
+    ),
+    _CheckinQuestionRow(
+        "energy",
+        "Energy",
+        "Recovery & Stress Regulator",
+        "What is your {bucket} energy right now (1-10)?",
+        "int",
+        min=1.0,
+        max=10.0,
+    ),
+    _CheckinQuestionRow(
+        "mood",
+        "Mood",
+        "Behavior Architect",
+        "What is your {bucket} mood right now (1-10)?",
+        "int",
+        min=1.0,
+        max=10.0,
+    ),
+    _CheckinQuestionRow(
+        "stress",
+        "Stress",
+        "Recovery & Stress Regulator",
+        "What is your {bucket} stress load right now (1-10)?",
+        "int",
+        min=1.0,
+        max=10.0,
+    ),
+    _CheckinQuestionRow(
+        "training_done",
+        "Training Done",
+        "Movement Coach",
+        "Did you complete training yet today? (yes/no). If yes, include what you did and duration.",
+        "bool",
+    ),
+    _CheckinQuestionRow(
+        "nutrition_on_plan",
+        "Food Logged",
+        "Nutritionist",
+        (
+            "Did you log what you ate so far today? (yes/no). "
+            "If yes, include foods/portions. If no, include what you ate and whether you want to log details now or later."
+        ),
+        "bool",
+    ),
+    _CheckinQuestionRow(
+        "hydration_progress",
+        "Hydration",
+        "Recovery & Stress Regulator",
+        "How much water/fluids have you had so far today (cups or ml), and what is your target for today?",
+        "text",
+    ),
+    _CheckinQuestionRow(
+        "meds_taken",
+        "Medication Check",
+        "Safety Clinician",
+        (
+            "Which prescribed {time_hint} have you taken today, and at what time? "
+            "If not yet, say when you plan to take them."
+        ),
+        "text",
+        needs_meds=True,
+    ),
+    _CheckinQuestionRow(
+        "weight_kg",
+        "Weight",
+        "Cardiometabolic Strategist",
+        "What was your latest body weight today? (kg or lb)",
+        "weight",
+        buckets=frozenset({"morning", "afternoon"}),
+    ),
+    _CheckinQuestionRow(
+        "bp",
+        "Blood Pressure",
+        "Cardiometabolic Strategist",
+        "If available, share your latest blood-pressure reading today (for example 122/82).",
+        "bp",
+        goal_focuses=frozenset({"cardio", "weight", "general"}),
+    ),
+    _CheckinQuestionRow(
+        "resting_hr_bpm",
+        "Resting HR",
+        "Cardiometabolic Strategist",
+        "If available, share your latest resting heart rate today (bpm).",
+        "int",
+        min=35.0,
+        max=180.0,
+        goal_focuses=frozenset({"cardio", "energy", "general"}),
+    ),
+    _CheckinQuestionRow(
+        "notes",
+        "Goal Strategist Note",
+        "Goal Strategist",
+        "What is the biggest blocker or win from today that impacts your weekly goal progression?",
+        "text",
+    ),
+    _CheckinQuestionRow(
+        "tracked_signals",
+        "Signals Logged",
+        "Orchestrator",
+        (
             "What else did you track today that should influence coaching right now "
             "(for example: meals, hydration, meds, sleep timing, symptoms, workout details)?"
         ),
-        type="text",
-    )
+        "text",
+        always=True,
+    ),
+)
 
-    preferred_order = {
-        "weight": [
-            "weight_kg",
-            "nutrition_on_plan",
-            "training_done",
-            "hydration_progress",
-            "sleep_hours",
-            "energy",
-            "stress",
-            "mood",
-            "bp",
-            "resting_hr_bpm",
-            "meds_taken",
-            "tracked_signals",
-            "notes",
-        ],
-        "cardio": [
-            "bp",
-            "resting_hr_bpm",
-            "meds_taken",
-            "hydration_progress",
-            "sleep_hours",
-            "stress",
-            "energy",
-            "training_done",
-            "nutrition_on_plan",
-            "weight_kg",
-            "tracked_signals",
-            "notes",
-        ],
-        "energy": [
-            "sleep_hours",
-            "energy",
-            "stress",
-            "mood",
-            "hydration_progress",
-            "nutrition_on_plan",
-            "training_done",
-            "resting_hr_bpm",
-            "meds_taken",
-            "tracked_signals",
-            "notes",
-        ],
-        "clarity": [
-            "sleep_hours",
-            "stress",
-            "mood",
-            "energy",
-            "hydration_progress",
-            "nutrition_on_plan",
-            "training_done",
-            "tracked_signals",
-            "notes",
-        ],
-    }.get(goal_focus, [
+_CHECKIN_PREFERRED_ORDER: dict[str, tuple[str, ...]] = {
+    "weight": (
+        "weight_kg",
+        "nutrition_on_plan",
+        "training_done",
+        "hydration_progress",
         "sleep_hours",
         "energy",
         "stress",
         "mood",
+        "bp",
+        "resting_hr_bpm",
+        "meds_taken",
+        "tracked_signals",
+        "notes",
+    ),
+    "cardio": (
+        "bp",
+        "resting_hr_bpm",
+        "meds_taken",
+        "hydration_progress",
+        "sleep_hours",
+        "stress",
+        "energy",
         "training_done",
         "nutrition_on_plan",
+        "weight_kg",
+        "tracked_signals",
+        "notes",
+    ),
+    "energy": (
+        "sleep_hours",
+        "energy",
+        "stress",
+        "mood",
         "hydration_progress",
-        "bp",
+        "nutrition_on_plan",
+        "training_done",
         "resting_hr_bpm",
         "meds_taken",
-        "weight_kg",
         "tracked_signals",
         "notes",
-    ])
+    ),
+    "clarity": (
+        "sleep_hours",
+        "stress",
+        "mood",
+        "energy",
+        "hydration_progress",
+        "nutrition_on_plan",
+        "training_done",
+        "tracked_signals",
+        "notes",
+    ),
+}
+_CHECKIN_DEFAULT_ORDER = (
+    "sleep_hours",
+    "energy",
+    "stress",
+    "mood",
+    "training_done",
+    "nutrition_on_plan",
+    "hydration_progress",
+    "bp",
+    "resting_hr_bpm",
+    "meds_taken",
+    "weight_kg",
+    "tracked_signals",
+    "notes",
+)
 
-    ordered = [proposals[k] for k in preferred_order if k in proposals][:12]
-    if len(ordered) < 4:
-        ordered.extend(
-            q for _, q in proposals.items() if q.key not in {x.key for x in ordered}
+
+_CHECKIN_CATALOG_KEYS = frozenset(row.key for row in _CHECKIN_QUESTION_CATALOG)
+
+
+@lru_cache(maxsize=512)
+def _daily_checkin_specialist_questions(
+    goal_focus: str, bucket: str, has_meds: bool, seen_keys: frozenset[str]
+) -> tuple[DailyCheckinQuestion, ...]:
+    # Questions depend only on this small discrete state; callers never mutate them, so they are shared.
+    needed = [
+        row
+        for row in _CHECKIN_QUESTION_CATALOG
+        if (row.always or row.key not in seen_keys)
+        and (row.buckets is None or bucket in row.buckets)
+        and (row.goal_focuses is None or goal_focus in row.goal_focuses)
+        and (has_meds or not row.needs_meds)
+    ]
+    by_key = {row.key: row for row in needed}
+    ordered_rows = [by_key[k] for k in _CHECKIN_PREFERRED_ORDER.get(goal_focus, _CHECKIN_DEFAULT_ORDER) if k in by_key]
+    ordered_rows = ordered_rows[:12]
+    if len(ordered_rows) < 4:
+        ordered_rows.extend(row for row in needed if row not in ordered_rows)
+        ordered_rows = ordered_rows[:8]
+    bucket_label = bucket.replace("_", " ")
+    time_hint = "morning meds" if bucket in {"morning", "afternoon"} else "evening meds"
+    return tuple(
+        DailyCheckinQuestion.model_construct(
+            key=row.key,
+            label=row.label,
+            specialist=row.specialist,
+            question=row.question.format(bucket=bucket_label, time_hint=time_hint),
+            type=row.type,
+            min=row.min,
+            max=row.max,
         )
-        ordered = ordered[:8]
+        for row in ordered_rows
+    )
+
+
+def _daily_checkin_specialist_plan(
+    *,
+    context: dict[str, Any],
+    local_hour: Optional[int],
+    skip_keys: frozenset[str],
+    weekly_summary: dict[str, Any],
+) -> DailyCheckinPlanResponse:
+    bucket, hour = _daily_checkin_time_bucket(local_hour)
+    goal_focus = _goal_bucket(context)
+    baseline = context.get("baseline") or {}
+    primary_goal = str(baseline.get("primary_goal") or "").strip() or "your current goal"
+    has_meds = bool(str(baseline.get("medication_details") or "").strip()) and str(
+        baseline.get("medication_details")
+    ).lower() != "unknown"
+    questions = _daily_checkin_specialist_questions(
+        goal_focus, bucket, has_meds, _CHECKIN_CATALOG_KEYS.intersection(skip_keys)
+    )
     intro = (
         f"{bucket.replace('_', ' ').title()} check-in (hour {hour}) aligned to {primary_goal}. "
         f"Weekly context: {weekly_summary.get('entries', 0)} logs in last 7 days."
     )
-    return DailyCheckinPlanResponse(
+    return DailyCheckinPlanResponse.model_construct(
         goal_focus=goal_focus,
         time_bucket=bucket,
         intro=intro,
-        questions=ordered,
+        questions=list(questions),
     )
 
 
-def _daily_checkin_plan_prompt(
-    *,
-    context: dict[str, Any],
-    fallback: DailyCheckinPlanResponse,
-    local_hour: Optional[int],
-    daily_summary: dict[str, Any],
-    weekly_summary: dict[str, Any],
-) -> str:
-    body = {
+# Static instructions lead the prompt so OpenAI's automatic prefix cache can reuse them across users;
+# the per-request blocks are appended after this pre-encoded (unterminated) JSON object.
+_DAILY_CHECKIN_PLAN_PROMPT_PREFIX = dumps_compact(
+    {
         "task": "Generate a dynamic daily check-in plan from specialist proposals orchestrated into one flow.",
-        "context": context,
-        "time_context": {
-            "local_hour": local_hour,
-            "time_bucket": fallback.time_bucket,
-        },
-        "daily_summary": daily_summary,
-        "weekly_summary": weekly_summary,
-        "goal_focus": fallback.goal_focus,
         "constraints": {
             "required_keys": ["goal_focus", "time_bucket", "intro", "questions"],
             "question_schema": {
@@ -872,13 +978,42 @@ def _daily_checkin_plan_prompt(
             "no_markdown": True,
         },
     }
-    return json.dumps(body, separators=(",", ":"))
+)[:-1]
+
+
+def _prefixed_prompt(prefix: str, dynamic: dict[str, Any]) -> str:
+    return f"{prefix},{dumps_compact(dynamic)[1:]}"
+
+
+def _daily_checkin_plan_prompt(
+    *,
+    context: dict[str, Any],
+    fallback: DailyCheckinPlanResponse,
+    local_hour: Optional[int],
+    daily_summary: dict[str, Any],
+    weekly_summary: dict[str, Any],
+) -> str:
+    return _prefixed_prompt(
+        _DAILY_CHECKIN_PLAN_PROMPT_PREFIX,
+        {
+            "context": context,
+            "time_context": {
+                "local_hour": local_hour,
+                "time_bucket": fallback.time_bucket,
+            },
+            "daily_summary": daily_summary,
+            "weekly_summary": weekly_summary,
+            "goal_focus": fallback.goal_focus,
+        },
+    )
+
+
+_CHECKIN_QUESTION_TYPES = frozenset({"float", "int", "bool", "signals", "text", "weight", "bp"})
 
 
 def _coerce_daily_checkin_questions(raw_questions: Any) -> list[DailyCheckinQuestion]:
     if not isinstance(raw_questions, list):
         return []
-    allowed_types = {"float", "int", "bool", "signals", "text", "weight", "bp"}
     out: list[DailyCheckinQuestion] = []
     seen_keys: set[str] = set()
     for item in raw_questions:
@@ -889,7 +1024,7 @@ def _coerce_daily_checkin_questions(raw_questions: Any) -> list[DailyCheckinQues
         specialist = str(item.get("specialist", "")).strip() or "Coach"
         question = str(item.get("question", "")).strip()
         qtype = str(item.get("type", "")).strip().lower()
-        if not key or key in seen_keys or not question or qtype not in allowed_types:
+        if not key or key in seen_keys or not question or qtype not in _CHECKIN_QUESTION_TYPES:
             continue
         min_v = item.get("min")
         max_v = item.get("max")
@@ -901,8 +1036,9 @@ def _coerce_daily_checkin_questions(raw_questions: Any) -> list[DailyCheckinQues
             max_num = float(max_v) if max_v is not None else None
         except Exception:
             max_num = None
+        # Every field is already coerced to its declared type above, so skip re-validation.
         out.append(
-            DailyCheckinQuestion(
+            DailyCheckinQuestion.model_construct(
                 key=key,
                 label=label,
                 specialist=specialist,
@@ -927,29 +1063,70 @@ def _merge_ai_daily_checkin_plan(
     questions = _coerce_daily_checkin_questions(raw.get("questions"))
     if len(questions) < 4:
         return fallback
-    return DailyCheckinPlanResponse(
+    if len(questions) > 12:
+        questions = questions[:12]
+    if (
+        goal_focus == fallback.goal_focus
+        and time_bucket == fallback.time_bucket
+        and intro == fallback.intro
+        and questions == fallback.questions
+    ):
+        return fallback
+    # Fields are coerced strings and constructed questions; no need to re-validate.
+    return DailyCheckinPlanResponse.model_construct(
         goal_focus=goal_focus,
         time_bucket=time_bucket,
         intro=intro,
-        questions=questions[:12],
+        questions=questions,
     )
 
 
+def _checkin_skip_keys(daily_summary: dict[str, Any]) -> frozenset[str]:
+    """Keys already captured or answered today; check-in plans must not ask for them again."""
+    captured = (str(k) for k in (daily_summary.get("captured_keys") or []))
+    answered = (str(k) for k in (daily_summary.get("answered_keys") or []))
+    return frozenset(chain(captured, answered))
+
+
 def _suppress_completed_checkin_questions(
-    plan: DailyCheckinPlanResponse, daily_summary: dict[str, Any]
+    plan: DailyCheckinPlanResponse, skip_keys: frozenset[str]
 ) -> DailyCheckinPlanResponse:
-    captured = {str(k) for k in (daily_summary.get("captured_keys") or [])}
-    answered = {str(k) for k in (daily_summary.get("answered_keys") or [])}
-    skip = captured.union(answered)
-    if not skip:
+    if skip_keys.isdisjoint(q.key for q in plan.questions):
         return plan
-    filtered = [q for q in plan.questions if q.key not in skip]
-    return DailyCheckinPlanResponse(
-        goal_focus=plan.goal_focus,
-        time_bucket=plan.time_bucket,
-        intro=plan.intro,
-        questions=filtered,
-    )
+    return plan.model_copy(update={"questions": [q for q in plan.questions if q.key not in skip_keys]})
+
+
+# goal bucket -> (checkpoint, pivot trigger, metric to surface)
+_PROACTIVE_SUCCESS_PATHS: dict[str, tuple[str, str, str]] = {
+    "weight": (
+        "7-day checkpoint: keep nutrition and training adherence above 80% for this week.",
+        "Pivot trigger: if weight trend stalls for 14 days, adjust calories by 100-150/day or add Zone 2 volume.",
+        "weight_kg",
+    ),
+    "cardio": (
+        "7-day checkpoint: collect a stable BP trend (same time daily) and keep stress/sleep consistent.",
+        "Pivot trigger: if BP trend does not improve over 2 weeks, shift priority to recovery + sodium/stress controls.",
+        "bp_systolic",
+    ),
+    "energy": (
+        "7-day checkpoint: anchor wake time and track sleep-hours + energy daily.",
+        "Pivot trigger: if energy stays low for 7 days, prioritize sleep/recovery before adding workload.",
+        "energy_1_10",
+    ),
+    "clarity": (
+        "7-day checkpoint: keep sleep timing stable and reduce stress load spikes.",
+        "Pivot trigger: if clarity/mood trend does not improve in 10-14 days, simplify plan and reduce cognitive friction.",
+        "mood_1_10",
+    ),
+}
+_DEFAULT_PROACTIVE_SUCCESS_PATH = (
+    "7-day checkpoint: execute one high-leverage behavior daily and log results at a fixed time.",
+    "Pivot trigger: if consistency drops below 70% for 2 weeks, reduce plan complexity and reset to one core behavior.",
+    "sleep_hours",
+)
+_PROACTIVE_SUCCESS_HEADING = "### Proactive Success Path"
+_PROACTIVE_FOLLOW_UP_QUESTION = "Want me to set your next weekly checkpoint and auto-adjust triggers from your trend data?"
+_PROACTIVE_RATIONALE = "Guidance is proactive: targets, checkpoints, and pivot triggers use your recent data/history."
 
 
 def _apply_proactive_success_guidance(response: CoachQuestionResponse, context: dict[str, Any]) -> CoachQuestionResponse:
@@ -958,66 +1135,38 @@ def _apply_proactive_success_guidance(response: CoachQuestionResponse, context:
     recent = context.get("recent_conversations") or []
     bucket = _goal_bucket(context)
 
-    if bucket == "weight":
-        checkpoint = "7-day checkpoint: keep nutrition and training adherence above 80% for this week."
-        pivot = "Pivot trigger: if weight trend stalls for 14 days, adjust calories by 100-150/day or add Zone 2 volume."
-        metric_focus = "weight_kg"
-    elif bucket == "cardio":
-        checkpoint = "7-day checkpoint: collect a stable BP trend (same time daily) and keep stress/sleep consistent."
-        pivot = "Pivot trigger: if BP trend does not improve over 2 weeks, shift priority to recovery + sodium/stress controls."
-        metric_focus = "bp_systolic"
-    elif bucket == "energy":
-        checkpoint = "7-day checkpoint: anchor wake time and track sleep-hours + energy daily."
-        pivot = "Pivot trigger: if energy stays low for 7 days, prioritize sleep/recovery before adding workload."
-        metric_focus = "energy_1_10"
-    elif bucket == "clarity":
-        checkpoint = "7-day checkpoint: keep sleep timing stable and reduce stress load spikes."
-        pivot = "Pivot trigger: if clarity/mood trend does not improve in 10-14 days, simplify plan and reduce cognitive friction."
-        metric_focus = "mood_1_10"
-    else:
-        checkpoint = "7-day checkpoint: execute one high-leverage behavior daily and log results at a fixed time."
-        pivot = "Pivot trigger: if consistency drops below 70% for 2 weeks, reduce plan complexity and reset to one core behavior."
-        metric_focus = "sleep_hours"
-
-    metric_latest = ((metrics.get(metric_focus) or {}).get("latest") if isinstance(metrics, dict) else None)
-    metric_line = f"Current signal: {metric_focus} latest={metric_latest}." if metric_latest is not None else None
-    conv_line = None
-    if recent:
-        conv_line = "History-aware note: recent conversations were used to keep guidance consistent with your current direction."
-    log_line = f"Logging momentum: {int(daily.get('entries_7d', 0) or 0)} entries in the last 7 days."
-
-    block_lines = [
-        "### Proactive Success Path",
-        checkpoint,
-        pivot,
-        log_line,
-    ]
-    if metric_line:
-        block_lines.append(metric_line)
-    if conv_line:
-        block_lines.append(conv_line)
-    proactive_block = "\n".join(block_lines)
-    if "### Proactive Success Path" not in response.answer:
+    checkpoint, pivot, metric_focus = _PROACTIVE_SUCCESS_PATHS.get(bucket, _DEFAULT_PROACTIVE_SUCCESS_PATH)
+
+    if _PROACTIVE_SUCCESS_HEADING not in response.answer:
+        metric_latest = ((metrics.get(metric_focus) or {}).get("latest") if isinstance(metrics, dict) else None)
+        block_lines = [
+            _PROACTIVE_SUCCESS_HEADING,
+            checkpoint,
+            pivot,
+            f"Logging momentum: {int(daily.get('entries_7d', 0) or 0)} entries in the last 7 days.",
+        ]
+        if metric_latest is not None:
+            block_lines.append(f"Current signal: {metric_focus} latest={metric_latest}.")
+        if recent:
+            block_lines.append(
+                "History-aware note: recent conversations were used to keep guidance consistent with your current direction."
+            )
+        proactive_block = "\n".join(block_lines)
         response.answer = f"{response.answer}\n\n{proactive_block}"
 
-    proactive_q = "Want me to set your next weekly checkpoint and auto-adjust triggers from your trend data?"
-    if all(proactive_q != item for item in response.suggested_questions):
-        response.suggested_questions = (response.suggested_questions + [proactive_q])[:8]
+    if _PROACTIVE_FOLLOW_UP_QUESTION not in response.suggested_questions:
+        response.suggested_questions = (response.suggested_questions + [_PROACTIVE_FOLLOW_UP_QUESTION])[:8]
 
-    proactive_rationale = "Guidance is proactive: targets, checkpoints, and pivot triggers use your recent data/history."
-    if all(proactive_rationale != item for item in response.rationale_bullets):
-        response.rationale_bullets = (response.rationale_bullets[:6] + [proactive_rationale])[:7]
+    if _PROACTIVE_RATIONALE not in response.rationale_bullets:
+        response.rationale_bullets = (response.rationale_bullets[:6] + [_PROACTIVE_RATIONALE])[:7]
     return response
 
 
-@router.post("/daily-checkin-plan", response_model=DailyCheckinPlanResponse, status_code=status.HTTP_200_OK)
-def get_daily_checkin_plan(
-    payload: DailyCheckinPlanRequest,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    llm_client: LLMClient = Depends(get_llm_client),
-) -> DailyCheckinPlanResponse:
-    context = build_coaching_context(db=db, user_id=user.id)
+def _daily_checkin_plan_stages(
+    payload: DailyCheckinPlanRequest, user: User, db: Session, llm_client: LLMClient
+) -> Iterator[tuple[str, DailyCheckinPlanResponse]]:
+    """Yield the deterministic fallback plan as soon as it is built, then the final plan."""
+    context = get_coaching_context(db=db, user_id=user.id)
     local_date = _daily_checkin_local_date(payload.timezone_offset_minutes)
     daily_summary, weekly_summary = _build_daily_weekly_checkin_context(
         db=db,
@@ -1025,15 +1174,18 @@ def get_daily_checkin_plan(
         local_date=local_date,
         timezone_offset_minutes=payload.timezone_offset_minutes,
     )
+    skip_keys = _checkin_skip_keys(daily_summary)
     fallback = _daily_checkin_specialist_plan(
         context=context,
         local_hour=payload.local_hour,
-        daily_summary=daily_summary,
+        skip_keys=skip_keys,
         weekly_summary=weekly_summary,
     )
-    fallback = _suppress_completed_checkin_questions(fallback, daily_summary)
+    fallback = _suppress_completed_checkin_questions(fallback, skip_keys)
+    yield "fallback", fallback
     if not payload.generate_with_ai:
-        return fallback
+        yield "final", fallback
+        return
     try:
         raw = llm_client.generate_json(
             db=db,
@@ -1049,24 +1201,67 @@ def get_daily_checkin_plan(
             allow_web_search=False,
         )
         merged = _merge_ai_daily_checkin_plan(fallback, raw)
-        return _suppress_completed_checkin_questions(merged, daily_summary)
+        plan = _suppress_completed_checkin_questions(merged, skip_keys)
     except Exception:
-        return fallback
+        plan = fallback
+    yield "final", plan
 
 
-def _daily_checkin_answer_parse_prompt(payload: DailyCheckinAnswerParseRequest) -> str:
-    body = {
-        "task": "Parse a daily check-in free-text answer into structured fields.",
-        "context": {
-            "key": payload.key,
-            "value_type": payload.value_type,
-            "question": payload.question,
-            "goal_focus": payload.goal_focus or "general",
-            "time_bucket": payload.time_bucket or "unknown",
-        },
-        "input": {
-            "answer_text": payload.answer_text,
-        },
+def _daily_checkin_plan(
+    payload: DailyCheckinPlanRequest, user: User, db: Session, llm_client: LLMClient
+) -> DailyCheckinPlanResponse:
+    for _stage, plan in _daily_checkin_plan_stages(payload=payload, user=user, db=db, llm_client=llm_client):
+        pass
+    return plan
+
+
+def _ndjson_plan_line(stage: str, plan: DailyCheckinPlanResponse) -> bytes:
+    return b'{"stage":"' + stage.encode("ascii") + b'","plan":' + model_json_bytes(plan) + b"}\n"
+
+
+def _ndjson_error_line(detail: str) -> bytes:
+    return dumps_compact({"stage": "error", "detail": detail}).encode("utf-8") + b"\n"
+
+
+@router.post("/daily-checkin-plan", response_model=DailyCheckinPlanResponse, status_code=status.HTTP_200_OK)
+def get_daily_checkin_plan(
+    payload: DailyCheckinPlanRequest,
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    llm_client: LLMClient = Depends(get_llm_client),
+) -> Response:
+    if "application/x-ndjson" not in request.headers.get("accept", ""):
+        return model_json_response(_daily_checkin_plan(payload=payload, user=user, db=db, llm_client=llm_client))
+
+    # NDJSON clients get the deterministic plan immediately and the AI-orchestrated plan once the model
+    # answers, so the check-in UI can render before the LLM round-trip completes.
+    user_id = user.id
+
+    def lines():
+        # Headers are already sent once the body runs, so failures become a final error line, not a 500.
+        try:
+            # Request-scoped sessions close before a streamed body runs, so the stream owns its session.
+            with SessionLocal() as stream_db:
+                stream_user = stream_db.get(User, user_id)
+                if stream_user is None:
+                    yield _ndjson_error_line("User not found.")
+                    return
+                stages = _daily_checkin_plan_stages(
+                    payload=payload, user=stream_user, db=stream_db, llm_client=llm_client
+                )
+                for stage, plan in stages:
+                    yield _ndjson_plan_line(stage, plan)
+        except Exception as exc:
+            logger.exception("daily_checkin_plan_stream_error user_id=%s detail=%s", user_id, str(exc))
+            yield _ndjson_error_line("Check-in plan failed. Please retry.")
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+
+_DAILY_CHECKIN_ANSWER_PARSE_PROMPT_PREFIX = dumps_compact(
+    {
+        "task": "Parse a daily check-in free-text answer into structured fields.",
         "output_schema": {
             "parsed_bool": "boolean or null; infer yes/no intent for bool questions even when mixed with details",
             "captured_text": "short extracted details from answer_text (for logging), or null",
@@ -1078,43 +1273,56 @@ def _daily_checkin_answer_parse_prompt(payload: DailyCheckinAnswerParseRequest)
             "Return strict JSON only.",
         ],
     }
-    return json.dumps(body, separators=(",", ":"))
+)[:-1]
+
+
+def _daily_checkin_answer_parse_prompt(payload: DailyCheckinAnswerParseRequest) -> str:
+    return _prefixed_prompt(
+        _DAILY_CHECKIN_ANSWER_PARSE_PROMPT_PREFIX,
+        {
+            "context": {
+                "key": payload.key,
+                "value_type": payload.value_type,
+                "question": payload.question,
+                "goal_focus": payload.goal_focus or "general",
+                "time_bucket": payload.time_bucket or "unknown",
+            },
+            "input": {
+                "answer_text": payload.answer_text,
+            },
+        },
+    )
+
+
+_CHECKIN_NO_RE = re.compile(r"\b(?:no|n|nope|not|didn['’]?t|haven['’]?t|have\s+not|missed)\b", re.IGNORECASE)
+_CHECKIN_YES_RE = re.compile(r"\b(?:yes|y|yeah|yep|done|completed|logged|took|did)\b", re.IGNORECASE)
+# Numbers, food words or measurement words mean the user gave concrete data.
+_CHECKIN_DETAIL_RE = re.compile(
+    r"\d|\b(?:ate|meals?|breakfast|lunch(?:es)?|dinners?|snacks?|pizzas?"
+    r"|bp|blood\s+pressure|hr|heart\s+rate|weight|kg|lbs?)\b",
+    re.IGNORECASE,
+)
 
 
 def _heuristic_parse_daily_checkin_answer(payload: DailyCheckinAnswerParseRequest) -> DailyCheckinAnswerParseResponse:
     text = str(payload.answer_text or "").strip()
     if not text:
         return DailyCheckinAnswerParseResponse()
-    lower = text.lower()
-    yes_terms = (" yes", "y ", "yeah", "yep", "done", "completed", "logged", "took", "did")
-    no_terms = (" no", "n ", "not yet", "didn't", "didnt", "haven't", "have not", "missed")
     parsed_bool: Optional[bool] = None
     if payload.value_type == "bool":
-        if any(term in f" {lower} " for term in no_terms):
+        if _CHECKIN_NO_RE.search(text):
             parsed_bool = False
-        if parsed_bool is None and any(term in f" {lower} " for term in yes_terms):
+        elif _CHECKIN_YES_RE.search(text):
             parsed_bool = True
-        if parsed_bool is None:
+        elif _CHECKIN_DETAIL_RE.search(text):
             # If no explicit yes/no but user gave concrete data, treat as affirmative capture.
-            has_number = bool(re.search(r"\d", lower))
-            has_food = any(word in lower for word in ("ate", "meal", "breakfast", "lunch", "dinner", "snack", "pizza"))
-            has_measure = any(word in lower for word in ("bp", "blood pressure", "hr", "heart rate", "weight", "kg", "lb"))
-            if has_number or has_food or has_measure:
-                parsed_bool = True
+            parsed_bool = True
     captured_text = text[:600]
     return DailyCheckinAnswerParseResponse(parsed_bool=parsed_bool, captured_text=captured_text, notes="heuristic")
 
 
-@router.post(
-    "/daily-checkin/parse-answer",
-    response_model=DailyCheckinAnswerParseResponse,
-    status_code=status.HTTP_200_OK,
-)
-def parse_daily_checkin_answer(
-    payload: DailyCheckinAnswerParseRequest,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    llm_client: LLMClient = Depends(get_llm_client),
+def _parse_daily_checkin_answer(
+    payload: DailyCheckinAnswerParseRequest, user: User, db: Session, llm_client: LLMClient
 ) -> DailyCheckinAnswerParseResponse:
     # Use utility model for low-cost extraction from free-text check-in responses.
     try:
@@ -1156,29 +1364,25 @@ def parse_daily_checkin_answer(
         return _heuristic_parse_daily_checkin_answer(payload)
 
 
-def _daily_food_log_prompt(
-    *,
-    entry_text: str,
-    goal_focus: str,
-    primary_goal: str,
-    log_date: date,
-    local_time_label: str,
-    prior_notes: str,
-    prior_daily: dict[str, Any],
-) -> str:
-    body = {
+@router.post(
+    "/daily-checkin/parse-answer",
+    response_model=DailyCheckinAnswerParseResponse,
+    status_code=status.HTTP_200_OK,
+)
+def parse_daily_checkin_answer(
+    payload: DailyCheckinAnswerParseRequest,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    llm_client: LLMClient = Depends(get_llm_client),
+) -> Response:
+    return model_json_response(
+        _parse_daily_checkin_answer(payload=payload, user=user, db=db, llm_client=llm_client)
+    )
+
+
+_DAILY_FOOD_LOG_PROMPT_PREFIX = dumps_compact(
+    {
         "task": "Convert a user food check-in into a concise coaching markdown log.",
-        "context": {
-            "goal_focus": goal_focus,
-            "primary_goal": primary_goal or "general health",
-            "log_date": str(log_date),
-            "local_time_label": local_time_label or "unspecified",
-            "prior_notes": prior_notes[:600],
-            "prior_daily_log": prior_daily,
-        },
-        "input": {
-            "entry_text": entry_text,
-        },
         "output_schema": {
             "title_line": "short emoji title, e.g. '🍽️ Logged your meal'",
             "meal_heading": "one line heading",
@@ -1206,7 +1410,44 @@ def _daily_food_log_prompt(
             "Return strict JSON only.",
         ],
     }
-    return json.dumps(body, separators=(",", ":"))
+)[:-1]
+
+
+def _daily_food_log_prompt(
+    *,
+    entry_text: str,
+    goal_focus: str,
+    primary_goal: str,
+    log_date: date,
+    local_time_label: str,
+    prior_notes: str,
+    prior_daily: dict[str, Any],
+) -> str:
+    return _prefixed_prompt(
+        _DAILY_FOOD_LOG_PROMPT_PREFIX,
+        {
+            "context": {
+                "goal_focus": goal_focus,
+                "primary_goal": primary_goal or "general health",
+                "log_date": str(log_date),
+                "local_time_label": local_time_label or "unspecified",
+                "prior_notes": prior_notes[:600],
+                "prior_daily_log": prior_daily,
+            },
+            "input": {
+                "entry_text": entry_text,
+            },
+        },
+    )
+
+
+_FOOD_LOG_NUTRITION_LABELS = (
+    ("calories", "Calories"),
+    ("protein_g", "Protein"),
+    ("carbs_g", "Carbs"),
+    ("fat_g", "Fat"),
+    ("hydration_ml", "Hydration"),
+)
 
 
 def _format_daily_food_log_markdown(
@@ -1234,74 +1475,30 @@ def _format_daily_food_log_markdown(
             "stress": str(prior_daily.get("stress", "unknown")),
         }
 
-    md: list[str] = []
-    md.append(title)
-    md.append("")
-    md.append(f"### {heading}")
-    md.append("")
-    if items:
-        md.append("Items:")
-        md.extend([f"- {x}" for x in items])
-        md.append("")
-    if est:
-        md.append("Estimated Nutrition:")
-        calories = est.get("calories")
-        protein = est.get("protein_g")
-        carbs = est.get("carbs_g")
-        fat = est.get("fat_g")
-        hydration = est.get("hydration_ml")
-        if calories:
-            md.append(f"- Calories: {calories}")
-        if protein:
-            md.append(f"- Protein: {protein}")
-        if carbs:
-            md.append(f"- Carbs: {carbs}")
-        if fat:
-            md.append(f"- Fat: {fat}")
-        if hydration:
-            md.append(f"- Hydration: {hydration}")
-        md.append("")
-
-    md.append("Daily Progress:")
-    md.append(f"- Training done: {progress.get('training_done', 'unknown')}")
-    md.append(f"- Nutrition logged: {progress.get('nutrition_logged', 'unknown')}")
-    md.append(f"- Sleep hours: {progress.get('sleep_hours', 'unknown')}")
-    md.append(f"- Energy: {progress.get('energy', 'unknown')}")
-    md.append(f"- Stress: {progress.get('stress', 'unknown')}")
-    md.append("")
-    if insights:
-        md.append("Summary Insight:")
-        md.extend([f"- {x}" for x in insights])
-        md.append("")
-    md.append(follow_up)
-    return "\n".join(md).strip()
-
-
-def _daily_step_summary_prompt(
-    *,
-    payload: DailyCheckinStepSummaryRequest,
-    goal_focus: str,
-    primary_goal: str,
-    prior_daily: dict[str, Any],
-) -> str:
-    body = {
+    items_block = "Items:\n" + "".join(f"- {x}\n" for x in items) + "\n" if items else ""
+    nutrition_block = (
+        "Estimated Nutrition:\n"
+        + "".join(f"- {label}: {est[key]}\n" for key, label in _FOOD_LOG_NUTRITION_LABELS if est.get(key))
+        + "\n"
+        if est
+        else ""
+    )
+    insights_block = "Summary Insight:\n" + "".join(f"- {x}\n" for x in insights) + "\n" if insights else ""
+    return (
+        f"{title}\n\n### {heading}\n\n{items_block}{nutrition_block}"
+        "Daily Progress:\n"
+        f"- Training done: {progress.get('training_done', 'unknown')}\n"
+        f"- Nutrition logged: {progress.get('nutrition_logged', 'unknown')}\n"
+        f"- Sleep hours: {progress.get('sleep_hours', 'unknown')}\n"
+        f"- Energy: {progress.get('energy', 'unknown')}\n"
+        f"- Stress: {progress.get('stress', 'unknown')}\n\n"
+        f"{insights_block}{follow_up}"
+    ).strip()
+
+
+_DAILY_STEP_SUMMARY_PROMPT_PREFIX = dumps_compact(
+    {
         "task": "Create a concise coaching check-in update after a single logged user entry.",
-        "context": {
-            "goal_focus": goal_focus,
-            "primary_goal": primary_goal or "general health",
-            "time_bucket": payload.time_bucket or "unknown",
-            "log_date": str(payload.log_date or datetime.now(timezone.utc).date()),
-            "step": {
-                "key": payload.key,
-                "label": payload.label,
-                "specialist": payload.specialist,
-                "raw_answer": payload.raw_answer,
-                "parsed_value": payload.parsed_value,
-            },
-            "current_payload": payload.current_payload,
-            "current_extras": payload.current_extras,
-            "prior_daily": prior_daily,
-        },
         "output_schema": {
             "logged_line": "short logged confirmation line with units/time if available",
             "updated_status": ["2-5 bullets showing progress toward user's goal/objectives"],
@@ -1317,7 +1514,37 @@ def _daily_step_summary_prompt(
             "Return strict JSON only.",
         ],
     }
-    return json.dumps(body, separators=(",", ":"))
+)[:-1]
+
+
+def _daily_step_summary_prompt(
+    *,
+    payload: DailyCheckinStepSummaryRequest,
+    goal_focus: str,
+    primary_goal: str,
+    prior_daily: dict[str, Any],
+) -> str:
+    return _prefixed_prompt(
+        _DAILY_STEP_SUMMARY_PROMPT_PREFIX,
+        {
+            "context": {
+                "goal_focus": goal_focus,
+                "primary_goal": primary_goal or "general health",
+                "time_bucket": payload.time_bucket or "unknown",
+                "log_date": str(payload.log_date or datetime.now(timezone.utc).date()),
+                "step": {
+                    "key": payload.key,
+                    "label": payload.label,
+                    "specialist": payload.specialist,
+                    "raw_answer": payload.raw_answer,
+                    "parsed_value": payload.parsed_value,
+                },
+                "current_payload": payload.current_payload,
+                "current_extras": payload.current_extras,
+                "prior_daily": prior_daily,
+            },
+        },
+    )
 
 
 def _format_daily_step_summary_markdown(
@@ -1335,28 +1562,51 @@ def _format_daily_step_summary_markdown(
     checklist = [str(x).strip() for x in checklist if str(x).strip()][:5]
     follow_up = str(raw.get("follow_up") or "Ready for the next check-in item?").strip()
 
-    md: list[str] = []
-    md.append("## Logged Update")
-    md.append(logged_line)
-    md.append("")
-    md.append("## Goal Progress Snapshot")
-    md.append(f"- Primary goal: {goal_label}")
-    if status:
-        md.extend([f"- {x}" for x in status])
-    md.append("")
-    md.append("## Coach Insight")
-    md.append(insight)
-    md.append("")
-    if guidance:
-        md.append("## Next Guidance")
-        md.extend([f"- {x}" for x in guidance])
-        md.append("")
-    if checklist:
-        md.append("## Checklist")
-        md.extend([f"- {x}" for x in checklist])
-        md.append("")
-    md.append(follow_up)
-    return "\n".join(md).strip()
+    status_block = "".join(f"- {x}\n" for x in status)
+    guidance_block = "## Next Guidance\n" + "".join(f"- {x}\n" for x in guidance) + "\n" if guidance else ""
+    checklist_block = "## Checklist\n" + "".join(f"- {x}\n" for x in checklist) + "\n" if checklist else ""
+    return (
+        f"## Logged Update\n{logged_line}\n\n"
+        f"## Goal Progress Snapshot\n- Primary goal: {goal_label}\n{status_block}\n"
+        f"## Coach Insight\n{insight}\n\n"
+        f"{guidance_block}{checklist_block}{follow_up}"
+    ).strip()
+
+
+_EMPTY_PRIOR_DAILY: dict[str, Any] = {
+    "sleep_hours": None,
+    "energy": None,
+    "mood": None,
+    "stress": None,
+    "training_done": False,
+    "nutrition_on_plan": False,
+}
+
+
+def _prior_daily_snapshot(db: Session, user_id: int, log_date: date) -> tuple[dict[str, Any], str]:
+    # Only the columns the prompts use; skips loading the (large) checkin_payload_json blob.
+    row = db.execute(
+        select(
+            DailyLog.sleep_hours,
+            DailyLog.energy,
+            DailyLog.mood,
+            DailyLog.stress,
+            DailyLog.training_done,
+            DailyLog.nutrition_on_plan,
+            DailyLog.notes,
+        ).where(DailyLog.user_id == user_id, DailyLog.log_date == log_date)
+    ).first()
+    if row is None:
+        return dict(_EMPTY_PRIOR_DAILY), ""
+    prior_daily = {
+        "sleep_hours": row.sleep_hours,
+        "energy": row.energy,
+        "mood": row.mood,
+        "stress": row.stress,
+        "training_done": bool(row.training_done),
+        "nutrition_on_plan": bool(row.nutrition_on_plan),
+    }
+    return prior_daily, str(row.notes or "")
 
 
 @router.post(
@@ -1369,23 +1619,10 @@ def daily_checkin_food_log_summary(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     llm_client: LLMClient = Depends(get_llm_client),
-) -> DailyCheckinFoodLogResponse:
+) -> Response:
     log_date = payload.log_date or datetime.now(timezone.utc).date()
-    row = (
-        db.query(DailyLog)
-        .filter(DailyLog.user_id == user.id, DailyLog.log_date == log_date)
-        .first()
-    )
-    baseline = build_coaching_context(db=db, user_id=user.id).get("baseline") or {}
-    prior_daily = {
-        "sleep_hours": row.sleep_hours if row else None,
-        "energy": row.energy if row else None,
-        "mood": row.mood if row else None,
-        "stress": row.stress if row else None,
-        "training_done": bool(row.training_done) if row else False,
-        "nutrition_on_plan": bool(row.nutrition_on_plan) if row else False,
-    }
-    prior_notes = str(row.notes or "") if row and row.notes else ""
+    prior_daily, prior_notes = _prior_daily_snapshot(db, user.id, log_date)
+    baseline = get_coaching_context(db=db, user_id=user.id).get("baseline") or {}
     goal_focus = _goal_bucket({"baseline": baseline})
     primary_goal = str(baseline.get("primary_goal") or "")
     local_time = str(payload.local_time_label or "")
@@ -1420,7 +1657,7 @@ def daily_checkin_food_log_summary(
             f"- Stress: {prior_daily['stress'] if prior_daily['stress'] is not None else 'unknown'}\n\n"
             "Would you like me to close today’s log and generate your daily plan?"
         )
-    return DailyCheckinFoodLogResponse(markdown=markdown)
+    return model_json_response(DailyCheckinFoodLogResponse.model_construct(markdown=markdown))
 
 
 @router.post(
@@ -1433,24 +1670,12 @@ def daily_checkin_step_summary(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     llm_client: LLMClient = Depends(get_llm_client),
-) -> DailyCheckinStepSummaryResponse:
+) -> Response:
     log_date = payload.log_date or datetime.now(timezone.utc).date()
-    row = (
-        db.query(DailyLog)
-        .filter(DailyLog.user_id == user.id, DailyLog.log_date == log_date)
-        .first()
-    )
-    baseline = build_coaching_context(db=db, user_id=user.id).get("baseline") or {}
+    prior_daily, _prior_notes = _prior_daily_snapshot(db, user.id, log_date)
+    baseline = get_coaching_context(db=db, user_id=user.id).get("baseline") or {}
     goal_focus = _goal_bucket({"baseline": baseline})
     primary_goal = str(baseline.get("primary_goal") or "general health")
-    prior_daily = {
-        "sleep_hours": row.sleep_hours if row else None,
-        "energy": row.energy if row else None,
-        "mood": row.mood if row else None,
-        "stress": row.stress if row else None,
-        "training_done": bool(row.training_done) if row else False,
-        "nutrition_on_plan": bool(row.nutrition_on_plan) if row else False,
-    }
     try:
         raw = llm_client.generate_json(
             db=db,
@@ -1487,16 +1712,30 @@ def daily_checkin_step_summary(
             "- Keep units and timing in each update.\n\n"
             "Ready for the next check-in item?"
         )
-    return DailyCheckinStepSummaryResponse(markdown=markdown)
+    return model_json_response(DailyCheckinStepSummaryResponse.model_construct(markdown=markdown))
+
+
+_RECENT_DAILY_LOG_COLUMNS = (
+    DailyLog.log_date,
+    DailyLog.sleep_hours,
+    DailyLog.energy,
+    DailyLog.mood,
+    DailyLog.stress,
+    DailyLog.training_done,
+    DailyLog.nutrition_on_plan,
+    DailyLog.notes,
+    DailyLog.checkin_payload_json,
+)
 
 
-def _serialize_recent_daily_logs(rows: list[DailyLog]) -> list[dict[str, Any]]:
+def _serialize_recent_daily_logs(rows: Sequence[Any]) -> list[dict[str, Any]]:
+    # rows are DailyLog instances or rows selected with _RECENT_DAILY_LOG_COLUMNS.
     out: list[dict[str, Any]] = []
     for row in rows[:30]:
         parsed_payload: Optional[dict[str, Any]] = None
         if row.checkin_payload_json:
             try:
-                loaded = json.loads(row.checkin_payload_json)
+                loaded = loads(row.checkin_payload_json)
                 if isinstance(loaded, dict):
                     parsed_payload = loaded
             except json.JSONDecodeError:
@@ -1517,6 +1756,24 @@ def _serialize_recent_daily_logs(rows: list[DailyLog]) -> list[dict[str, Any]]:
     return out
 
 
+_CHAT_PROGRESS_NOTE_RE = re.compile(r"chat_progress:\s*([^|]+)", re.IGNORECASE)
+_FOOD_NOTE_RE = _keyword_re(
+    "ate",
+    "meal",
+    "breakfast",
+    "lunch",
+    "dinner",
+    "supper",
+    "snack",
+    "pizza",
+    "toast",
+    "muffin",
+    "eggs",
+    "rice",
+)
+_OPERATIONAL_EVENT_TYPES = frozenset({"food", "hydration", "medication", "supplement", "workout"})
+
+
 def _extract_today_operational_signals(today_log: Optional[dict[str, Any]]) -> dict[str, Any]:
     if not isinstance(today_log, dict):
         return {
@@ -1561,22 +1818,25 @@ def _extract_today_operational_signals(today_log: Optional[dict[str, Any]]) -> d
             return text or None
         return None
 
-    def _latest_event_text(event_type: str) -> Optional[str]:
-        for item in reversed(events):
-            if not isinstance(item, dict):
-                continue
-            if str(item.get("event_type") or "").strip().lower() != event_type:
-                continue
-            details = str(item.get("details") or "").strip()
-            if details:
-                return details[:600]
-        return None
-
-    fallback_food = _latest_event_text("food")
-    fallback_hydration = _latest_event_text("hydration")
-    fallback_meds = _latest_event_text("medication")
-    fallback_supplements = _latest_event_text("supplement")
-    fallback_training = _latest_event_text("workout")
+    # One reverse pass picks up the latest non-empty details for every event type the summary reads.
+    latest_event_text: dict[str, str] = {}
+    for item in reversed(events):
+        if not isinstance(item, dict):
+            continue
+        event_type = str(item.get("event_type") or "").strip().lower()
+        if event_type not in _OPERATIONAL_EVENT_TYPES or event_type in latest_event_text:
+            continue
+        details = str(item.get("details") or "").strip()
+        if details:
+            latest_event_text[event_type] = details[:600]
+            if len(latest_event_text) == len(_OPERATIONAL_EVENT_TYPES):
+                break
+
+    fallback_food = latest_event_text.get("food")
+    fallback_hydration = latest_event_text.get("hydration")
+    fallback_meds = latest_event_text.get("medication")
+    fallback_supplements = latest_event_text.get("supplement")
+    fallback_training = latest_event_text.get("workout")
     fallback_unparsed_text = None
     if unparsed_updates:
         last = unparsed_updates[-1]
@@ -1587,12 +1847,12 @@ def _extract_today_operational_signals(today_log: Optional[dict[str, Any]]) -> d
     fallback_note_text = None
     if notes_text:
         # Notes often contain "chat_progress: ..." lines that should remain usable for summaries.
-        match = re.findall(r"chat_progress:\s*([^|]+)", notes_text, flags=re.IGNORECASE)
+        match = _CHAT_PROGRESS_NOTE_RE.findall(notes_text)
         if match:
             candidate = str(match[-1]).strip()
             if candidate:
                 fallback_note_text = candidate[:600]
-        elif any(k in notes_text.lower() for k in ("ate", "meal", "breakfast", "lunch", "dinner", "supper", "snack", "pizza", "toast", "muffin", "eggs", "rice")):
+        elif _FOOD_NOTE_RE.search(notes_text.lower()):
             fallback_note_text = notes_text[:600]
 
     return {
@@ -1604,94 +1864,105 @@ def _extract_today_operational_signals(today_log: Optional[dict[str, Any]]) -> d
     }
 
 
+_SOURDOUGH_RE = re.compile(r"\bsour\s*dough\b")
+_TWO_PIECES_RE = re.compile(r"\b(to|too)\s+pieces?\b")
+_FOOD_NUMBER_WORDS: dict[str, float] = {
+    "zero": 0.0,
+    "one": 1.0,
+    "two": 2.0,
+    "to": 2.0,
+    "too": 2.0,
+    "three": 3.0,
+    "four": 4.0,
+    "five": 5.0,
+    "six": 6.0,
+    "seven": 7.0,
+    "eight": 8.0,
+    "nine": 9.0,
+    "ten": 10.0,
+    "half": 0.5,
+    "quarter": 0.25,
+}
+_PEANUT_BUTTER_PORTION_RE = re.compile(r"(\d+|[a-z]+)\s*(?:tbsp|tablespoon|tablespoons).{0,20}peanut butter")
+_BANANA_PORTION_RE = re.compile(r"(\d+|[a-z]+)\s*(?:banana|bananas)")
+# Coarse heuristic portions for common logged items. Each pattern only runs when one of its literal
+# anchors is in the text, so a note mentioning two foods costs two regex scans instead of eight.
+_FOOD_PORTION_CATALOG: tuple[tuple[tuple[str, ...], re.Pattern[str], dict[str, float]], ...] = (
+    (
+        ("pizza",),
+        re.compile(r"(\d+|[a-z]+)\s*(?:slice|slices|piece|pieces).{0,20}pizza"),
+        {"kcal": 285, "protein": 12, "carbs": 34, "fat": 11},
+    ),
+    (
+        ("sourdough", "toast"),
+        re.compile(r"(\d+|[a-z]+)\s*(?:slice|slices|piece|pieces).{0,20}(?:sourdough|toast)"),
+        {"kcal": 120, "protein": 4.5, "carbs": 24.5, "fat": 0.7},
+    ),
+    (("peanut butter",), _PEANUT_BUTTER_PORTION_RE, {"kcal": 95, "protein": 3.5, "carbs": 3, "fat": 8}),
+    (("banana",), _BANANA_PORTION_RE, {"kcal": 105, "protein": 1.3, "carbs": 27, "fat": 0.4}),
+    (("egg",), re.compile(r"(\d+|[a-z]+)\s*(?:egg|eggs)"), {"kcal": 72, "protein": 6.3, "carbs": 0.4, "fat": 4.8}),
+    (
+        ("cottage cheese",),
+        re.compile(r"(\d+|[a-z]+)\s*(?:cup|cups).{0,20}cottage cheese"),
+        {"kcal": 200, "protein": 28, "carbs": 12, "fat": 5},
+    ),
+    (
+        ("grapes",),
+        re.compile(r"(\d+|[a-z]+)\s*(?:cup|cups).{0,20}grapes"),
+        {"kcal": 105, "protein": 1, "carbs": 27, "fat": 0},
+    ),
+    (
+        ("rice",),
+        re.compile(r"(\d+|[a-z]+)\s*(?:cup|cups).{0,20}rice"),
+        {"kcal": 205, "protein": 4.3, "carbs": 45, "fat": 0.4},
+    ),
+)
+# Every catalog anchor and keyword fallback needs one of these, checked before the normalizing
+# substitutions ("dough" also covers "sour dough", which only becomes "sourdough" after them).
+_FOOD_ESTIMATE_KEYWORDS = ("pizza", "toast", "dough", "peanut butter", "banana", "egg", "cottage cheese", "grapes", "rice")
+
+
+def _food_quantity(token: str) -> float:
+    # Catalog patterns capture (\d+|[a-z]+) from already-lowercased text, so the token is a bare
+    # digit run or word; unknown words count as a single portion.
+    value = _FOOD_NUMBER_WORDS.get(token)
+    if value is not None:
+        return value
+    return float(token) if token.isdigit() else 1.0
+
+
 def _estimate_food_totals_from_text(food_text: Optional[str]) -> Optional[dict[str, str]]:
     text = str(food_text or "").strip().lower()
-    if not text or text == "not logged":
+    if not text or text == "not logged" or not any(k in text for k in _FOOD_ESTIMATE_KEYWORDS):
         return None
 
-    text = re.sub(r"\bsour\s*dough\b", "sourdough", text)
-    text = re.sub(r"\b(to|too)\s+pieces?\b", "2 pieces", text)
-
-    number_words = {
-        "zero": 0,
-        "one": 1,
-        "two": 2,
-        "to": 2,
-        "too": 2,
-        "three": 3,
-        "four": 4,
-        "five": 5,
-        "six": 6,
-        "seven": 7,
-        "eight": 8,
-        "nine": 9,
-        "ten": 10,
-        "half": 0.5,
-        "quarter": 0.25,
-    }
-
-    def _qty(token: Optional[str]) -> float:
-        raw = str(token or "").strip().lower()
-        if not raw:
-            return 1.0
-        if raw.isdigit():
-            return float(int(raw))
-        if raw in number_words:
-            return float(number_words[raw])
-        if "/" in raw:
-            try:
-                num, den = raw.split("/", 1)
-                return float(num) / float(den)
-            except Exception:
-                return 1.0
-        return 1.0
-
-    # Coarse heuristic portions for common logged items.
-    catalog = [
-        (
-            r"(\d+|[a-z]+)\s*(?:slice|slices|piece|pieces).{0,20}pizza",
-            {"kcal": 285, "protein": 12, "carbs": 34, "fat": 11},
-        ),
-        (
-            r"(\d+|[a-z]+)\s*(?:slice|slices|piece|pieces).{0,20}(?:sourdough|toast)",
-            {"kcal": 120, "protein": 4.5, "carbs": 24.5, "fat": 0.7},
-        ),
-        (
-            r"(\d+|[a-z]+)\s*(?:tbsp|tablespoon|tablespoons).{0,20}peanut butter",
-            {"kcal": 95, "protein": 3.5, "carbs": 3, "fat": 8},
-        ),
-        (r"(\d+|[a-z]+)\s*(?:banana|bananas)", {"kcal": 105, "protein": 1.3, "carbs": 27, "fat": 0.4}),
-        (r"(\d+|[a-z]+)\s*(?:egg|eggs)", {"kcal": 72, "protein": 6.3, "carbs": 0.4, "fat": 4.8}),
-        (
-            r"(\d+|[a-z]+)\s*(?:cup|cups).{0,20}cottage cheese",
-            {"kcal": 200, "protein": 28, "carbs": 12, "fat": 5},
-        ),
-        (r"(\d+|[a-z]+)\s*(?:cup|cups).{0,20}grapes", {"kcal": 105, "protein": 1, "carbs": 27, "fat": 0}),
-        (r"(\d+|[a-z]+)\s*(?:cup|cups).{0,20}rice", {"kcal": 205, "protein": 4.3, "carbs": 45, "fat": 0.4}),
-    ]
+    text = _SOURDOUGH_RE.sub("sourdough", text)
+    text = _TWO_PIECES_RE.sub("2 pieces", text)
 
     totals = {"kcal": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0}
     matched_any = False
-    for pattern, macros in catalog:
-        for m in re.finditer(pattern, text):
-            qty = _qty(m.group(1))
+    portioned: set[re.Pattern[str]] = set()
+    for anchors, pattern, macros in _FOOD_PORTION_CATALOG:
+        if not any(anchor in text for anchor in anchors):
+            continue
+        for m in pattern.finditer(text):
+            qty = _food_quantity(m.group(1))
             totals["kcal"] += macros["kcal"] * qty
             totals["protein"] += macros["protein"] * qty
             totals["carbs"] += macros["carbs"] * qty
             totals["fat"] += macros["fat"] * qty
             matched_any = True
+            portioned.add(pattern)
 
     # Additional keyword-only coarse additions when quantity is unclear.
-    if "peanut butter" in text and not re.search(
-        r"(\d+|[a-z]+)\s*(?:tbsp|tablespoon|tablespoons).{0,20}peanut butter", text
-    ):
+    if "peanut butter" in text and _PEANUT_BUTTER_PORTION_RE not in portioned:
         totals["kcal"] += 190
         totals["protein"] += 7
         totals["carbs"] += 6
         totals["fat"] += 16
         matched_any = True
 
-    if "banana" in text and not re.search(r"(\d+|[a-z]+)\s*(?:banana|bananas)", text):
+    if "banana" in text and _BANANA_PORTION_RE not in portioned:
         totals["kcal"] += 105
         totals["protein"] += 1.3
         totals["carbs"] += 27
@@ -1712,191 +1983,324 @@ def _estimate_food_totals_from_text(food_text: Optional[str]) -> Optional[dict[s
     }
 
 
-def _proactive_card_prompt(
+_PROACTIVE_CARD_REQUIREMENTS: dict[str, tuple[str, ...]] = {
+    "daily_summary": (
+        "Include a Daily Totals Snapshot section with: calories (estimated if needed), protein, carbs, fat, hydration/water, sleep, training status, meds taken status, supplements taken status.",
+        "Include Remaining Today vs Goal with calories/macros remaining. If explicit goal targets are missing, state estimated target range with assumptions.",
+        "Include Goal Progress & Adaptive Learning using weekly and monthly summary trends.",
+        "Include Missing Data section that asks only high-value missing items needed for better precision.",
+    ),
+    "daily_plan": (
+        "Convert current-day status into a concrete execution checklist for the rest of today.",
+        "Include macro and hydration targets for remaining day window.",
+        "Include medication/supplement timing reminders if applicable to user context.",
+        "Use weekly/monthly trend data to prioritize the highest ROI tasks.",
+    ),
+    "what_next": (
+        "Prioritize next 3 moves tied to user goals/objectives and trend signals.",
+        "Include one measurable target and one adaptive pivot trigger.",
+        "Reference monthly and weekly trends to justify why these are next.",
+    ),
+}
+_DEFAULT_CARD_REQUIREMENTS = ("Provide a concise goal-aligned coaching card.",)
+
+
+@lru_cache(maxsize=8)
+def _proactive_card_prompt_prefix(card_type: str) -> str:
+    return dumps_compact(
+        {
+            "task": "Generate an agentic coaching card markdown for the requested card type.",
+            "card_type": card_type,
+            "agent_workflow": [
+                "Nutritionist, Movement Coach, Sleep Expert, Cardiometabolic Strategist, and Safety Clinician review the provided summaries/logs.",
+                "Goal Strategist maps findings to objective progress and phase direction.",
+                "Orchestrator synthesizes one clear user-facing output.",
+            ],
+            "output_requirements": {
+                "format": "markdown",
+                "must_be_readable": True,
+                "must_reference_data": "Use concrete values from daily/weekly/monthly summaries where available.",
+                "must_be_goal_aligned": True,
+                "card_specific_requirements": _PROACTIVE_CARD_REQUIREMENTS.get(card_type, _DEFAULT_CARD_REQUIREMENTS),
+                "no_diagnosis": True,
+            },
+            "return_schema": {
+                "markdown": "string",
+            },
+        }
+    )[:-1]
+
+
+def _proactive_card_prompt_inputs(
     *,
-    card_type: str,
     context: dict[str, Any],
     overall_summary: summary_api.OverallSummaryResponse,
     daily_logs: list[dict[str, Any]],
     today_signals: dict[str, Any],
 ) -> str:
-    card_requirements = {
-        "daily_summary": [
-            "Include a Daily Totals Snapshot section with: calories (estimated if needed), protein, carbs, fat, hydration/water, sleep, training status, meds taken status, supplements taken status.",
-            "Include Remaining Today vs Goal with calories/macros remaining. If explicit goal targets are missing, state estimated target range with assumptions.",
-            "Include Goal Progress & Adaptive Learning using weekly and monthly summary trends.",
-            "Include Missing Data section that asks only high-value missing items needed for better precision.",
-        ],
-        "daily_plan": [
-            "Convert current-day status into a concrete execution checklist for the rest of today.",
-            "Include macro and hydration targets for remaining day window.",
-            "Include medication/supplement timing reminders if applicable to user context.",
-            "Use weekly/monthly trend data to prioritize the highest ROI tasks.",
-        ],
-        "what_next": [
-            "Prioritize next 3 moves tied to user goals/objectives and trend signals.",
-            "Include one measurable target and one adaptive pivot trigger.",
-            "Reference monthly and weekly trends to justify why these are next.",
-        ],
-    }.get(card_type, ["Provide a concise goal-aligned coaching card."])
+    # Card-independent tail of the prompt object (opening brace stripped), serialized once per cached input set.
+    return dumps_compact(
+        {
+            "inputs": {
+                "coaching_context": context,
+                "daily_logs_recent": daily_logs,
+                "daily_summary": overall_summary.today.model_dump(),
+                "weekly_summary": overall_summary.trend_7d.model_dump(),
+                "monthly_summary": overall_summary.trend_30d.model_dump(),
+                "today_operational_signals": today_signals,
+                "wins": overall_summary.top_wins,
+                "risks": overall_summary.top_risks,
+                "next_best_action": overall_summary.next_best_action,
+                "weekly_personalized_insights": overall_summary.weekly_personalized_insights,
+            },
+        }
+    )[1:]
+
+
+def _proactive_card_prompt(*, card_type: str, prompt_inputs: str) -> str:
+    return f"{_proactive_card_prompt_prefix(card_type)},{prompt_inputs}"
+
+
+_DAILY_PLAN_CARD_TEMPLATE = (
+    "## Daily Plan\n"
+    "\n"
+    "- Goal alignment: **{primary_goal}**\n"
+    "- Weekly entries: **{weekly_entries}**\n"
+    "- Monthly entries: **{monthly_entries}**\n"
+    "\n"
+    "### Complete Today\n"
+    "{checklist}"
+    "\n"
+    "### Remaining Macro + Hydration Window\n"
+    "- Calories/macros remaining: estimate from logged intake and target range.\n"
+    "- Hydration status: {hydration}\n"
+    "\n"
+    "### Medication + Supplement Timing\n"
+    "- Medications: {meds}\n"
+    "- Supplements: {supplements}\n"
+    "\n"
+    "### Priority\n"
+    "- {next_best_action}"
+)
 
-    body = {
-        "task": "Generate an agentic coaching card markdown for the requested card type.",
-        "card_type": card_type,
-        "inputs": {
-            "coaching_context": context,
-            "daily_logs_recent": daily_logs,
-            "daily_summary": overall_summary.today.model_dump(),
-            "weekly_summary": overall_summary.trend_7d.model_dump(),
-            "monthly_summary": overall_summary.trend_30d.model_dump(),
-            "today_operational_signals": today_signals,
-            "wins": overall_summary.top_wins,
-            "risks": overall_summary.top_risks,
-            "next_best_action": overall_summary.next_best_action,
-            "weekly_personalized_insights": overall_summary.weekly_personalized_insights,
-        },
-        "agent_workflow": [
-            "Nutritionist, Movement Coach, Sleep Expert, Cardiometabolic Strategist, and Safety Clinician review the provided summaries/logs.",
-            "Goal Strategist maps findings to objective progress and phase direction.",
-            "Orchestrator synthesizes one clear user-facing output.",
-        ],
-        "output_requirements": {
-            "format": "markdown",
-            "must_be_readable": True,
-            "must_reference_data": "Use concrete values from daily/weekly/monthly summaries where available.",
-            "must_be_goal_aligned": True,
-            "card_specific_requirements": card_requirements,
-            "no_diagnosis": True,
-        },
-        "return_schema": {
-            "markdown": "string",
-        },
-    }
-    return json.dumps(body, separators=(",", ":"))
 
+def _daily_plan_card_markdown(
+    *,
+    overall_summary: summary_api.OverallSummaryResponse,
+    primary_goal: str,
+    today_signals: dict[str, Any],
+) -> str:
+    today = overall_summary.today
+    checklist = (
+        (today.sleep_hours is not None, "Log sleep hours"),
+        (today.energy is not None, "Log energy (1-10)"),
+        (today.mood is not None, "Log mood (1-10)"),
+        (today.stress is not None, "Log stress (1-10)"),
+        (bool(today.training_done), "Complete/mark training"),
+        (bool(today.nutrition_on_plan), "Log food intake"),
+    )
+    return _DAILY_PLAN_CARD_TEMPLATE.format(
+        primary_goal=primary_goal,
+        weekly_entries=overall_summary.trend_7d.entries,
+        monthly_entries=overall_summary.trend_30d.entries,
+        checklist="".join(f"- {'[x]' if done else '[ ]'} {label}\n" for done, label in checklist),
+        hydration=today_signals.get("hydration_progress") or "not logged",
+        meds=today_signals.get("meds_taken") or "not logged",
+        supplements=today_signals.get("supplements_taken") or "not logged",
+        next_best_action=overall_summary.next_best_action,
+    )
 
-def _fallback_proactive_card_markdown(
+
+_WHAT_NEXT_CARD_TEMPLATE = (
+    "## What Next\n"
+    "\n"
+    "For **{primary_goal}**, your next priority is:\n"
+    "- **{next_best_action}**\n"
+    "\n"
+    "### Next 3 Moves\n"
+    "{next_moves}"
+    "\n"
+    "### Adaptive Trigger\n"
+    "- If weekly trend stalls, tighten one lever only (calories, movement, or sleep consistency) and reassess in 7 days."
+)
+_DEFAULT_NEXT_MOVES = (
+    "- Keep logging consistently for 7 days.\n"
+    "- Review weekly trend direction.\n"
+    "- Adjust one lever at a time.\n"
+)
+
+
+def _what_next_card_markdown(
+    *,
+    overall_summary: summary_api.OverallSummaryResponse,
+    primary_goal: str,
+    today_signals: dict[str, Any],
+) -> str:
+    insights = overall_summary.weekly_personalized_insights[:3] if overall_summary.weekly_personalized_insights else []
+    return _WHAT_NEXT_CARD_TEMPLATE.format(
+        primary_goal=primary_goal,
+        next_best_action=overall_summary.next_best_action,
+        next_moves="".join(f"- {x}\n" for x in insights) if insights else _DEFAULT_NEXT_MOVES,
+    )
+
+
+_DAILY_SUMMARY_CARD_TEMPLATE = (
+    "## Daily Summary\n"
+    "\n"
+    "- Goal focus: **{primary_goal}**\n"
+    "- Health score: **{health_score}**\n"
+    "- Next best action: {next_best_action}\n"
+    "\n"
+    "### Daily Totals Snapshot\n"
+    "- Calories: {calories}\n"
+    "- Protein: {protein}\n"
+    "- Carbs: {carbs}\n"
+    "- Fat: {fat}\n"
+    "- Food log details: {food_details}\n"
+    "- Hydration: {hydration}\n"
+    "- Sleep: {sleep}\n"
+    "- Training: {training}\n"
+    "- Medications: {meds}\n"
+    "- Supplements: {supplements}\n"
+    "\n"
+    "### Remaining Today vs Goal\n"
+    "{remaining}"
+    "\n"
+    "### Today Signals\n"
+    "- Energy/Mood/Stress: {energy} / {mood} / {stress}\n"
+    "- Food logged: {food_logged}\n"
+    "\n"
+    "### Goal Progress & Adaptive Learning\n"
+    "- Weekly trend entries: {weekly_entries}\n"
+    "- Monthly trend entries: {monthly_entries}\n"
+    "\n"
+    "### Top Wins\n"
+    "{wins}"
+    "\n"
+    "### Top Risks\n"
+    "{risks}"
+    "\n"
+    "### Missing Data To Improve Precision\n"
+    "- Add exact meal portions/macros and hydration totals.\n"
+    "- Add medication/supplement timing confirmations when taken."
+)
+_ESTIMATED_REMAINING = (
+    "- Calories remaining: compare estimated intake vs your current target range.\n"
+    "- Macro remaining: prioritize protein at next meal and keep fats/carbs aligned to plan.\n"
+)
+_UNESTIMATED_REMAINING = (
+    "- Calories remaining: estimate requires clear calorie target and full meal logging.\n"
+    "- Macro remaining: estimate requires protein/carb/fat target and full meal logging.\n"
+)
+_NEEDS_DETAILED_MEAL_LOG = "estimate requires more detailed meal logging."
+_UNESTIMATED_FIELDS = {
+    "calories": _NEEDS_DETAILED_MEAL_LOG,
+    "protein": _NEEDS_DETAILED_MEAL_LOG,
+    "carbs": _NEEDS_DETAILED_MEAL_LOG,
+    "fat": _NEEDS_DETAILED_MEAL_LOG,
+    "remaining": _UNESTIMATED_REMAINING,
+}
+
+
+def _daily_summary_card_markdown(
     *,
-    card_type: str,
     overall_summary: summary_api.OverallSummaryResponse,
     primary_goal: str,
     today_signals: dict[str, Any],
 ) -> str:
     today = overall_summary.today
-    hydration = today_signals.get("hydration_progress") or "not logged"
-    meds = today_signals.get("meds_taken") or "not logged"
-    supplements = today_signals.get("supplements_taken") or "not logged"
     food_details = today_signals.get("food_details") or "not logged"
+    # Only this card reports food totals, so only it pays for the portion-regex scan.
     estimated = _estimate_food_totals_from_text(food_details)
-    food_logged = bool(today.nutrition_on_plan) or (bool(food_details) and str(food_details).strip().lower() != "not logged")
-    if card_type == "daily_plan":
-        checklist = [
-            f"- {'[x]' if today.sleep_hours is not None else '[ ]'} Log sleep hours",
-            f"- {'[x]' if today.energy is not None else '[ ]'} Log energy (1-10)",
-            f"- {'[x]' if today.mood is not None else '[ ]'} Log mood (1-10)",
-            f"- {'[x]' if today.stress is not None else '[ ]'} Log stress (1-10)",
-            f"- {'[x]' if bool(today.training_done) else '[ ]'} Complete/mark training",
-            f"- {'[x]' if bool(today.nutrition_on_plan) else '[ ]'} Log food intake",
-        ]
-        return "\n".join(
-            [
-                "## Daily Plan",
-                "",
-                f"- Goal alignment: **{primary_goal}**",
-                f"- Weekly entries: **{overall_summary.trend_7d.entries}**",
-                f"- Monthly entries: **{overall_summary.trend_30d.entries}**",
-                "",
-                "### Complete Today",
-                *checklist,
-                "",
-                "### Remaining Macro + Hydration Window",
-                "- Calories/macros remaining: estimate from logged intake and target range.",
-                f"- Hydration status: {hydration}",
-                "",
-                "### Medication + Supplement Timing",
-                f"- Medications: {meds}",
-                f"- Supplements: {supplements}",
-                "",
-                "### Priority",
-                f"- {overall_summary.next_best_action}",
-            ]
-        )
-    if card_type == "what_next":
-        insights = overall_summary.weekly_personalized_insights[:3] if overall_summary.weekly_personalized_insights else []
-        next_moves = (
-            [f"- {x}" for x in insights]
-            if insights
-            else [
-                "- Keep logging consistently for 7 days.",
-                "- Review weekly trend direction.",
-                "- Adjust one lever at a time.",
-            ]
-        )
-        return "\n".join(
-            [
-                "## What Next",
-                "",
-                f"For **{primary_goal}**, your next priority is:",
-                f"- **{overall_summary.next_best_action}**",
-                "",
-                "### Next 3 Moves",
-                *next_moves,
-                "",
-                "### Adaptive Trigger",
-                "- If weekly trend stalls, tighten one lever only (calories, movement, or sleep consistency) and reassess in 7 days.",
-            ]
-        )
-    return "\n".join(
-        [
-            "## Daily Summary",
-            "",
-            f"- Goal focus: **{primary_goal}**",
-            f"- Health score: **{overall_summary.health_score}**",
-            f"- Next best action: {overall_summary.next_best_action}",
-            "",
-            "### Daily Totals Snapshot",
-            f"- Calories: {estimated['calories_range'] if estimated else 'estimate requires more detailed meal logging.'}",
-            f"- Protein: {estimated['protein_range'] if estimated else 'estimate requires more detailed meal logging.'}",
-            f"- Carbs: {estimated['carbs_range'] if estimated else 'estimate requires more detailed meal logging.'}",
-            f"- Fat: {estimated['fat_range'] if estimated else 'estimate requires more detailed meal logging.'}",
-            f"- Food log details: {food_details}",
-            f"- Hydration: {hydration}",
-            f"- Sleep: {today.sleep_hours if today.sleep_hours is not None else 'not logged'}",
-            f"- Training: {'done' if bool(today.training_done) else 'not done / not logged'}",
-            f"- Medications: {meds}",
-            f"- Supplements: {supplements}",
-            "",
-            "### Remaining Today vs Goal",
-            (
-                "- Calories remaining: compare estimated intake vs your current target range."
-                if estimated
-                else "- Calories remaining: estimate requires clear calorie target and full meal logging."
-            ),
-            (
-                "- Macro remaining: prioritize protein at next meal and keep fats/carbs aligned to plan."
-                if estimated
-                else "- Macro remaining: estimate requires protein/carb/fat target and full meal logging."
-            ),
-            "",
-            "### Today Signals",
-            f"- Energy/Mood/Stress: {today.energy if today.energy is not None else 'n/a'} / {today.mood if today.mood is not None else 'n/a'} / {today.stress if today.stress is not None else 'n/a'}",
-            f"- Food logged: {'yes' if food_logged else 'no / not logged'}",
-            "",
-            "### Goal Progress & Adaptive Learning",
-            f"- Weekly trend entries: {overall_summary.trend_7d.entries}",
-            f"- Monthly trend entries: {overall_summary.trend_30d.entries}",
-            "",
-            "### Top Wins",
-            *(f"- {x}" for x in overall_summary.top_wins[:4]),
-            "",
-            "### Top Risks",
-            *(f"- {x}" for x in overall_summary.top_risks[:4]),
-            "",
-            "### Missing Data To Improve Precision",
-            "- Add exact meal portions/macros and hydration totals.",
-            "- Add medication/supplement timing confirmations when taken.",
-        ]
+    if estimated:
+        estimate_fields = {
+            "calories": estimated["calories_range"],
+            "protein": estimated["protein_range"],
+            "carbs": estimated["carbs_range"],
+            "fat": estimated["fat_range"],
+            "remaining": _ESTIMATED_REMAINING,
+        }
+    else:
+        estimate_fields = _UNESTIMATED_FIELDS
+    # food_details always falls back to "not logged", so it is logged exactly when it differs from that.
+    food_logged = bool(today.nutrition_on_plan) or str(food_details).strip().lower() != "not logged"
+    return _DAILY_SUMMARY_CARD_TEMPLATE.format(
+        **estimate_fields,
+        primary_goal=primary_goal,
+        health_score=overall_summary.health_score,
+        next_best_action=overall_summary.next_best_action,
+        food_details=food_details,
+        hydration=today_signals.get("hydration_progress") or "not logged",
+        sleep=today.sleep_hours if today.sleep_hours is not None else "not logged",
+        training="done" if bool(today.training_done) else "not done / not logged",
+        meds=today_signals.get("meds_taken") or "not logged",
+        supplements=today_signals.get("supplements_taken") or "not logged",
+        energy=today.energy if today.energy is not None else "n/a",
+        mood=today.mood if today.mood is not None else "n/a",
+        stress=today.stress if today.stress is not None else "n/a",
+        food_logged="yes" if food_logged else "no / not logged",
+        weekly_entries=overall_summary.trend_7d.entries,
+        monthly_entries=overall_summary.trend_30d.entries,
+        wins="".join(f"- {x}\n" for x in overall_summary.top_wins[:4]),
+        risks="".join(f"- {x}\n" for x in overall_summary.top_risks[:4]),
+    )
+
+
+_FALLBACK_CARD_BUILDERS: dict[str, Callable[..., str]] = {
+    "daily_summary": _daily_summary_card_markdown,
+    "daily_plan": _daily_plan_card_markdown,
+    "what_next": _what_next_card_markdown,
+}
+
+
+def _fallback_proactive_card_markdown(
+    *,
+    card_type: str,
+    overall_summary: summary_api.OverallSummaryResponse,
+    primary_goal: str,
+    today_signals: dict[str, Any],
+) -> str:
+    builder = _FALLBACK_CARD_BUILDERS.get(card_type, _daily_summary_card_markdown)
+    return builder(overall_summary=overall_summary, primary_goal=primary_goal, today_signals=today_signals)
+
+
+class _ProactiveCardInputs(NamedTuple):
+    context: dict[str, Any]
+    overall: summary_api.OverallSummaryResponse
+    today_signals: dict[str, Any]
+    prompt_inputs: str
+
+
+def _proactive_card_inputs(db: Session, user: User) -> _ProactiveCardInputs:
+    context = get_coaching_context(db=db, user_id=user.id)
+    now = datetime.now(timezone.utc).date()
+    key = (user.id, now)
+    cached = _PROACTIVE_CARD_INPUTS_CACHE.get(key) if PROACTIVE_CARD_INPUTS_CACHE_TTL_SECONDS > 0 else None
+    # Every write path invalidates the coaching context, so inputs built against an older context object are stale.
+    if cached is not None and cached.context is context:
+        return cached
+    overall = summary_api.get_overall_summary(user=user, db=db)
+    rows_30 = db.execute(
+        select(*_RECENT_DAILY_LOG_COLUMNS)
+        .where(DailyLog.user_id == user.id, DailyLog.log_date >= (now - timedelta(days=29)), DailyLog.log_date <= now)
+        .order_by(DailyLog.log_date.desc())
+    ).all()
+    serialized_logs = _serialize_recent_daily_logs(rows_30)
+    today_signals = _extract_today_operational_signals(serialized_logs[0] if serialized_logs else None)
+    inputs = _ProactiveCardInputs(
+        context=context,
+        overall=overall,
+        today_signals=today_signals,
+        prompt_inputs=_proactive_card_prompt_inputs(
+            context=context,
+            overall_summary=overall,
+            daily_logs=serialized_logs,
+            today_signals=today_signals,
+        ),
     )
+    if PROACTIVE_CARD_INPUTS_CACHE_TTL_SECONDS > 0:
+        _PROACTIVE_CARD_INPUTS_CACHE.set(key, inputs)
+    return inputs
 
 
 @router.post(
@@ -1909,24 +2313,14 @@ def proactive_card(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     llm_client: LLMClient = Depends(get_llm_client),
-) -> ProactiveCardResponse:
+) -> Response:
     card_type = str(payload.card_type or "").strip().lower()
-    if card_type not in {"daily_summary", "daily_plan", "what_next"}:
+    if card_type not in _FALLBACK_CARD_BUILDERS:
         raise HTTPException(status_code=422, detail="card_type must be one of daily_summary, daily_plan, what_next")
 
-    context = build_coaching_context(db=db, user_id=user.id)
+    context, overall, today_signals, prompt_inputs = _proactive_card_inputs(db, user)
     baseline = context.get("baseline") or {}
     primary_goal = str(baseline.get("primary_goal") or "your current goal")
-    overall = summary_api.get_overall_summary(user=user, db=db)
-    now = datetime.now(timezone.utc).date()
-    rows_30 = (
-        db.query(DailyLog)
-        .filter(DailyLog.user_id == user.id, DailyLog.log_date >= (now - timedelta(days=29)), DailyLog.log_date <= now)
-        .order_by(DailyLog.log_date.desc())
-        .all()
-    )
-    serialized_logs = _serialize_recent_daily_logs(rows_30)
-    today_signals = _extract_today_operational_signals(serialized_logs[0] if serialized_logs else None)
     orchestrator_prompt = render_agent_system_prompt(
         agent_id="orchestrator",
         user_goals=primary_goal,
@@ -1948,13 +2342,7 @@ def proactive_card(
         raw = llm_client.generate_json(
             db=db,
             user_id=user.id,
-            prompt=_proactive_card_prompt(
-                card_type=card_type,
-                context=context,
-                overall_summary=overall,
-                daily_logs=serialized_logs,
-                today_signals=today_signals,
-            ),
+            prompt=_proactive_card_prompt(card_type=card_type, prompt_inputs=prompt_inputs),
             task_type="utility",
             allow_web_search=False,
             system_instruction=(
@@ -1979,11 +2367,13 @@ def proactive_card(
             primary_goal=primary_goal,
             today_signals=today_signals,
         )
-    return ProactiveCardResponse(card_type=card_type, markdown=markdown)
+    return model_json_response(ProactiveCardResponse.model_construct(card_type=card_type, markdown=markdown))
 
 
-def _agent_profiles(include_supplement_audit: bool) -> list[dict[str, str]]:
-    base = [
+@lru_cache(maxsize=2)
+def _agent_profiles(include_supplement_audit: bool) -> tuple[dict[str, str], ...]:
+    # Shared across requests; callers only read the profile dicts.
+    return (
         {
             "id": "goal_strategist",
             "title": "Goal Strategist",
@@ -2044,261 +2434,252 @@ def _agent_profiles(include_supplement_audit: bool) -> list[dict[str, str]]:
             ),
             "task_type": "utility",
         },
-    ]
-    return base
+    )
+
+
+_BEHAVIOR_QUESTION_RE = _keyword_re(
+    "habit",
+    "adherence",
+    "compliance",
+    "consistency",
+    "friction",
+    "motivation",
+    "discipline",
+    "routine",
+)
 
 
 def _is_behavior_question(question: str) -> bool:
-    q = (question or "").lower()
-    return any(
-        k in q
-        for k in [
-            "habit",
-            "adherence",
-            "compliance",
-            "consistency",
-            "friction",
-            "motivation",
-            "discipline",
-            "routine",
-        ]
-    )
+    return bool(_BEHAVIOR_QUESTION_RE.search((question or "").lower()))
+
+
+_RECOVERY_STRESS_QUESTION_RE = _keyword_re(
+    "recovery",
+    "stress",
+    "hrv",
+    "cortisol",
+    "deload",
+    "burnout",
+    "alcohol",
+    "nervous system",
+)
 
 
 def _is_recovery_stress_question(question: str) -> bool:
-    q = (question or "").lower()
-    return any(
-        k in q
-        for k in [
-            "recovery",
-            "stress",
-            "hrv",
-            "cortisol",
-            "deload",
-            "burnout",
-            "alcohol",
-            "nervous system",
-        ]
-    )
+    return bool(_RECOVERY_STRESS_QUESTION_RE.search((question or "").lower()))
+
+
+_BEHAVIOR_ARCHITECT_PROFILE = {
+    "id": "behavior_architect",
+    "title": "Behavior Architect",
+    "instruction": (
+        "Engineer adherence systems: reduce decision fatigue, simplify rules, and convert goals "
+        "into low-friction autopilot habits."
+    ),
+    "task_type": "utility",
+}
+_RECOVERY_STRESS_REGULATOR_PROFILE = {
+    "id": "recovery_stress_regulator",
+    "title": "Recovery & Stress Regulator",
+    "instruction": (
+        "Assess CNS load, recovery pacing, stress burden, alcohol impact, and when to deload "
+        "to protect long-term progress."
+    ),
+    "task_type": "utility",
+}
+_SUPPLEMENT_AUDITOR_PROFILE = {
+    "id": "supplement_auditor",
+    "title": "Supplement Auditor",
+    "instruction": (
+        "Review supplement stack for overlap, timing, safety caveats, and monitoring suggestions. "
+        "Do not diagnose disease."
+    ),
+    "task_type": "utility",
+}
+_PROFILES_BY_ID: dict[str, dict[str, str]] = {p["id"]: p for p in _agent_profiles(include_supplement_audit=False)}
 
 
 def _enriched_profiles(question: str, include_supplement_audit: bool) -> list[dict[str, str]]:
-    profiles = [
-        *_agent_profiles(include_supplement_audit=False),
-    ]
+    profiles = list(_agent_profiles(include_supplement_audit=False))
     if _is_behavior_question(question):
-        profiles.append(
-            {
-                "id": "behavior_architect",
-                "title": "Behavior Architect",
-                "instruction": (
-                    "Engineer adherence systems: reduce decision fatigue, simplify rules, and convert goals "
-                    "into low-friction autopilot habits."
-                ),
-                "task_type": "utility",
-            }
-        )
+        profiles.append(_BEHAVIOR_ARCHITECT_PROFILE)
     if _is_recovery_stress_question(question):
-        profiles.append(
-            {
-                "id": "recovery_stress_regulator",
-                "title": "Recovery & Stress Regulator",
-                "instruction": (
-                    "Assess CNS load, recovery pacing, stress burden, alcohol impact, and when to deload "
-                    "to protect long-term progress."
-                ),
-                "task_type": "utility",
-            }
-        )
+        profiles.append(_RECOVERY_STRESS_REGULATOR_PROFILE)
     if include_supplement_audit:
-        profiles.append(
-            {
-                "id": "supplement_auditor",
-                "title": "Supplement Auditor",
-                "instruction": (
-                    "Review supplement stack for overlap, timing, safety caveats, and monitoring suggestions. "
-                    "Do not diagnose disease."
-                ),
-                "task_type": "utility",
-            }
-        )
+        profiles.append(_SUPPLEMENT_AUDITOR_PROFILE)
     return profiles
 
 
+_GOAL_STRATEGY_QUESTION_RE = _keyword_re(
+    "goal",
+    "target",
+    "milestone",
+    "phase",
+    "6 week",
+    "12 week",
+    "3 month",
+    "6 month",
+    "roadmap",
+    "plan",
+    "stall",
+    "pivot",
+    "arc",
+    "objective",
+)
+
+
 def _is_goal_strategy_question(question: str) -> bool:
-    q = (question or "").lower()
-    return any(
-        k in q
-        for k in [
-            "goal",
-            "target",
-            "milestone",
-            "phase",
-            "6 week",
-            "12 week",
-            "3 month",
-            "6 month",
-            "roadmap",
-            "plan",
-            "stall",
-            "pivot",
-            "arc",
-            "objective",
-        ]
-    )
+    return bool(_GOAL_STRATEGY_QUESTION_RE.search((question or "").lower()))
+
+
+_CARDIOMETABOLIC_QUESTION_RE = _keyword_re("ldl", "hdl", "triglyceride", "cholesterol", "lipid", "bp", "blood pressure", "insulin")
+_NUTRITION_QUESTION_RE = _keyword_re("eat", "meal", "nutrition", "diet", "protein", "carb", "sodium", "potassium", "calorie")
+_SLEEP_QUESTION_RE = _keyword_re("sleep", "wake", "tired", "fatigue")
+_MOVEMENT_QUESTION_RE = _keyword_re("train", "exercise", "steps", "workout", "zone 2", "strength", "overtraining")
 
 
 def _quick_mode_profiles(question: str, include_supplement_audit: bool) -> list[dict[str, str]]:
     q = (question or "").lower()
+    # Each specialist is appended at most once, so no de-duplication pass is needed.
     profiles: list[dict[str, str]] = []
-    by_id = {p["id"]: p for p in _enriched_profiles(question, include_supplement_audit)}
-    if _is_goal_strategy_question(question):
-        profiles.append(by_id["goal_strategist"])
-    if any(k in q for k in ["ldl", "hdl", "triglyceride", "cholesterol", "lipid", "bp", "blood pressure", "insulin"]):
-        profiles.append(by_id["cardiometabolic_strategist"])
-    if any(k in q for k in ["eat", "meal", "nutrition", "diet", "protein", "carb", "sodium", "potassium", "calorie"]):
-        profiles.append(by_id["nutritionist"])
-    if any(k in q for k in ["sleep", "wake", "tired", "fatigue"]):
-        profiles.append(by_id["sleep_expert"])
-    if any(k in q for k in ["train", "exercise", "steps", "workout", "zone 2", "strength", "overtraining"]):
-        profiles.append(by_id["movement_coach"])
-    if include_supplement_audit and "supplement_auditor" in by_id:
-        profiles.append(by_id["supplement_auditor"])
-    if _is_behavior_question(question) and "behavior_architect" in by_id:
-        profiles.append(by_id["behavior_architect"])
-    if _is_recovery_stress_question(question) and "recovery_stress_regulator" in by_id:
-        profiles.append(by_id["recovery_stress_regulator"])
-    profiles.append(by_id["safety_clinician"])
-
-    seen = set()
-    deduped = []
-    for p in profiles:
-        if p["id"] in seen:
-            continue
-        seen.add(p["id"])
-        deduped.append(p)
-    return deduped[:3]
-
-
-def _build_agent_prompt(
-    *,
-    question: str,
-    context_hint: Optional[str],
-    context: dict[str, Any],
-    mode: str,
-    agent_title: str,
-    agent_instruction: str,
-    web_search_enabled: bool = True,
-    prior_agents: Optional[list[dict[str, Any]]] = None,
-) -> str:
-    baseline = context.get("baseline") or {}
-    primary_goal = str(baseline.get("primary_goal") or "improve healthspan").strip()
-    top_goals = baseline.get("top_goals") if isinstance(baseline.get("top_goals"), list) else []
-    goal_vector = ", ".join([primary_goal, *[str(g) for g in top_goals[:3] if str(g).strip()]])
-    if not goal_vector:
-        goal_vector = "general longevity improvement"
-    body = {
-        "question": question,
-        "context_hint": context_hint,
-        "context": context,
-        "agent_profile": {
-            "name": agent_title,
-            "instruction": agent_instruction,
-        },
-        "web_search_enabled": bool(web_search_enabled),
-        "prior_agent_outputs": prior_agents or [],
-        "instructions": {
-            "tone": "warm, practical, science-informed, never shame-based",
-            "mode": mode,
-            "goal_personalization": (
-                f"Customize guidance to this user's goals/objectives: {goal_vector}. "
-                "Tie recommendations and follow-up questions directly to those goals."
-            ),
-            "interaction_contract": (
-                "Operate as a proactive coaching loop. When the user provides progress updates "
-                "(food, hydration, meds, vitals, workouts, sleep, fasting), always: "
-                "1) confirm what was logged, "
-                "2) provide structured estimated impact/macros where relevant, "
-                "3) show an updated day-status snapshot against goals, "
-                "4) give one next best task, "
-                "5) ask one targeted follow-up question."
-            ),
-            "memory_contract": (
-                "Use context.structured_memory and context.daily_log_summary as authoritative short-memory inputs. "
-                "Assume chat context window can be incomplete and rely on stored updates/trends when deciding guidance."
-            ),
-            "proactive": (
-                "Be proactive and success-oriented. Use available trend/history context to define near-term checkpoints, "
-                "clear success measures, and pivot triggers instead of only reactive advice."
-            ),
-            "format": (
-                "answer must be readable markdown with short sections, bullets, spacing, and explicit headers. "
-                "Prefer structures like: Weekly Progress Report, Metrics, Key Actions, Learnings, Outcomes, Next Focus. "
-                "For daily interactions prefer: Logged Update, Entry, Estimated Nutrition/Impact, Daily Totals Snapshot, Coach Insight, Next Task, Coach Question. "
-                "Avoid one long paragraph."
-            ),
-            "detail_requirements": [
-                "For food/beverage logs include: itemized entry, estimated calories/macros/hydration impact when inferable.",
-                "For fasting logs include: start/end/duration and whether aligned to current goal and day type.",
-                "For vitals logs include: quick interpretation in context of recent trend and safety guardrails.",
-                "For workout logs include: session summary, likely training effect, and immediate recovery adjustment.",
-                "Use explicit units and timestamps when provided by user; ask for missing time only when needed.",
-            ],
-            "must_include": [
-                "answer",
-                "rationale_bullets (3-7)",
-                "recommended_actions (1-3 items with title + steps)",
-                "suggested_questions (3-8 direct coach questions for the user to answer next)",
-                "safety_flags",
-            ],
-        },
+    if _GOAL_STRATEGY_QUESTION_RE.search(q):
+        profiles.append(_PROFILES_BY_ID["goal_strategist"])
+    if _CARDIOMETABOLIC_QUESTION_RE.search(q):
+        profiles.append(_PROFILES_BY_ID["cardiometabolic_strategist"])
+    if _NUTRITION_QUESTION_RE.search(q):
+        profiles.append(_PROFILES_BY_ID["nutritionist"])
+    if _SLEEP_QUESTION_RE.search(q):
+        profiles.append(_PROFILES_BY_ID["sleep_expert"])
+    if _MOVEMENT_QUESTION_RE.search(q):
+        profiles.append(_PROFILES_BY_ID["movement_coach"])
+    if include_supplement_audit:
+        profiles.append(_SUPPLEMENT_AUDITOR_PROFILE)
+    if _BEHAVIOR_QUESTION_RE.search(q):
+        profiles.append(_BEHAVIOR_ARCHITECT_PROFILE)
+    if _RECOVERY_STRESS_QUESTION_RE.search(q):
+        profiles.append(_RECOVERY_STRESS_REGULATOR_PROFILE)
+    profiles.append(_PROFILES_BY_ID["safety_clinician"])
+    return profiles[:3]
+
+
+# Everything in the agent prompt after goal_personalization is fixed, so it is serialized once at import
+# and spliced in per call. Key order matches the original dict so the prompt bytes are unchanged.
+_AGENT_PROMPT_TONE = dumps_compact("warm, practical, science-informed, never shame-based")
+_AGENT_PROMPT_STATIC_INSTRUCTIONS = dumps_compact(
+    {
+        "interaction_contract": (
+            "Operate as a proactive coaching loop. When the user provides progress updates "
+            "(food, hydration, meds, vitals, workouts, sleep, fasting), always: "
+            "1) confirm what was logged, "
+            "2) provide structured estimated impact/macros where relevant, "
+            "3) show an updated day-status snapshot against goals, "
+            "4) give one next best task, "
+            "5) ask one targeted follow-up question."
+        ),
+        "memory_contract": (
+            "Use context.structured_memory and context.daily_log_summary as authoritative short-memory inputs. "
+            "Assume chat context window can be incomplete and rely on stored updates/trends when deciding guidance."
+        ),
+        "proactive": (
+            "Be proactive and success-oriented. Use available trend/history context to define near-term checkpoints, "
+            "clear success measures, and pivot triggers instead of only reactive advice."
+        ),
+        "format": (
+            "answer must be readable markdown with short sections, bullets, spacing, and explicit headers. "
+            "Prefer structures like: Weekly Progress Report, Metrics, Key Actions, Learnings, Outcomes, Next Focus. "
+            "For daily interactions prefer: Logged Update, Entry, Estimated Nutrition/Impact, Daily Totals Snapshot, Coach Insight, Next Task, Coach Question. "
+            "Avoid one long paragraph."
+        ),
+        "detail_requirements": [
+            "For food/beverage logs include: itemized entry, estimated calories/macros/hydration impact when inferable.",
+            "For fasting logs include: start/end/duration and whether aligned to current goal and day type.",
+            "For vitals logs include: quick interpretation in context of recent trend and safety guardrails.",
+            "For workout logs include: session summary, likely training effect, and immediate recovery adjustment.",
+            "Use explicit units and timestamps when provided by user; ask for missing time only when needed.",
+        ],
+        "must_include": [
+            "answer",
+            "rationale_bullets (3-7)",
+            "recommended_actions (1-3 items with title + steps)",
+            "suggested_questions (3-8 direct coach questions for the user to answer next)",
+            "safety_flags",
+        ],
     }
-    return json.dumps(body, separators=(",", ":"))
+)[1:]
+
+
+def _build_agent_prompt(
+    *,
+    question: str,
+    context_hint: Optional[str],
+    context: dict[str, Any],
+    mode: str,
+    agent_title: str,
+    agent_instruction: str,
+    web_search_enabled: bool = True,
+    prior_agents: Optional[list[dict[str, Any]]] = None,
+) -> str:
+    baseline = context.get("baseline") or {}
+    primary_goal = str(baseline.get("primary_goal") or "improve healthspan").strip()
+    top_goals = baseline.get("top_goals") if isinstance(baseline.get("top_goals"), list) else []
+    goal_vector = ", ".join([primary_goal, *[str(g) for g in top_goals[:3] if str(g).strip()]])
+    if not goal_vector:
+        goal_vector = "general longevity improvement"
+    goal_personalization = (
+        f"Customize guidance to this user's goals/objectives: {goal_vector}. "
+        "Tie recommendations and follow-up questions directly to those goals."
+    )
+    return (
+        f'{{"question":{dumps_compact(question)},"context_hint":{dumps_compact(context_hint)},'
+        f'"context":{dumps_compact(context)},'
+        f'"agent_profile":{{"name":{dumps_compact(agent_title)},"instruction":{dumps_compact(agent_instruction)}}},'
+        f'"web_search_enabled":{"true" if web_search_enabled else "false"},'
+        f'"prior_agent_outputs":{dumps_compact(prior_agents or [])},'
+        f'"instructions":{{"tone":{_AGENT_PROMPT_TONE},"mode":{dumps_compact(mode)},'
+        f'"goal_personalization":{dumps_compact(goal_personalization)},{_AGENT_PROMPT_STATIC_INSTRUCTIONS}}}'
+    )
+
+
+# Substring tokens; longer variants ("logged", "lbs", "took my") are implied by their prefixes.
+_PROGRESS_LOG_TOKENS = (
+    "log",
+    "drank",
+    "water",
+    "cups",
+    "ml",
+    "ate",
+    "meal",
+    "dinner",
+    "lunch",
+    "break fast",
+    "broke my fast",
+    "fasting",
+    "weight",
+    "lb",
+    "kg",
+    "bp",
+    "blood pressure",
+    "hr",
+    "heart rate",
+    "took",
+    "supplement",
+    "vitamin",
+    "workout",
+    "zone 2",
+    "treadmill",
+    "sleep",
+    "woke up",
+)
 
 
 def _looks_like_progress_log(question: str) -> bool:
     q = (question or "").lower()
-    tokens = [
-        "log",
-        "logged",
-        "drank",
-        "water",
-        "cups",
-        "ml",
-        "ate",
-        "meal",
-        "dinner",
-        "lunch",
-        "break fast",
-        "broke my fast",
-        "fasting",
-        "weight",
-        "lb",
-        "lbs",
-        "kg",
-        "bp",
-        "blood pressure",
-        "hr",
-        "heart rate",
-        "took",
-        "took my",
-        "supplement",
-        "vitamin",
-        "workout",
-        "zone 2",
-        "treadmill",
-        "sleep",
-        "woke up",
-    ]
-    return any(t in q for t in tokens)
+    return any(t in q for t in _PROGRESS_LOG_TOKENS)
 
 
-def _chat_progress_parse_prompt(question: str) -> str:
-    body = {
+_CHAT_PROGRESS_PARSE_PROMPT_PREFIX = dumps_compact(
+    {
         "task": "Parse a free-form user coaching update into structured events for logging/memory.",
-        "input": {
-            "text": question,
-        },
         "output_schema": {
             "has_progress_update": "bool",
             "events": [
@@ -2334,7 +2715,11 @@ def _chat_progress_parse_prompt(question: str) -> str:
             "Return strict JSON only.",
         ],
     }
-    return json.dumps(body, separators=(",", ":"))
+)[:-1]
+
+
+def _chat_progress_parse_prompt(question: str) -> str:
+    return _prefixed_prompt(_CHAT_PROGRESS_PARSE_PROMPT_PREFIX, {"input": {"text": question}})
 
 
 def _extract_chat_progress_signals(
@@ -2447,6 +2832,9 @@ def _extract_chat_progress_signals(
     return parsed
 
 
+_CLAUSE_SPLIT_RE = re.compile(r"[;,]| and ")
+
+
 def _merge_chat_signals_into_daily_log(
     *,
     db: Session,
@@ -2465,13 +2853,10 @@ def _merge_chat_signals_into_daily_log(
     rollup = signals.get("rollup") if isinstance(signals.get("rollup"), dict) else {}
     signal_events = signals.get("events") if isinstance(signals.get("events"), list) else []
     today_utc = datetime.now(timezone.utc).date()
-    row = (
-        db.query(DailyLog)
-        .filter(DailyLog.user_id == user_id, DailyLog.log_date == today_utc)
-        .first()
-    )
-    if not row:
-        row = DailyLog(
+    # Concurrent chat turns may both be first for the day; the conflict-free insert lets either create the row.
+    db.execute(
+        sqlite_insert(DailyLog)
+        .values(
             user_id=user_id,
             log_date=today_utc,
             sleep_hours=0.0,
@@ -2481,8 +2866,13 @@ def _merge_chat_signals_into_daily_log(
             training_done=False,
             nutrition_on_plan=False,
         )
-        db.add(row)
-        db.flush()
+        .on_conflict_do_nothing(index_elements=["user_id", "log_date"])
+    )
+    row = (
+        db.query(DailyLog)
+        .filter(DailyLog.user_id == user_id, DailyLog.log_date == today_utc)
+        .one()
+    )
 
     if "sleep_hours" in rollup:
         row.sleep_hours = float(rollup["sleep_hours"])
@@ -2494,7 +2884,7 @@ def _merge_chat_signals_into_daily_log(
     existing_payload: dict[str, Any] = {}
     if row.checkin_payload_json:
         try:
-            loaded = json.loads(row.checkin_payload_json)
+            loaded = loads(row.checkin_payload_json)
             if isinstance(loaded, dict):
                 existing_payload = loaded
         except json.JSONDecodeError:
@@ -2547,7 +2937,7 @@ def _merge_chat_signals_into_daily_log(
         src = str(text or "").strip()
         if not src:
             return []
-        return [str(c).strip() for c in re.split(r"[;,]| and ", src) if str(c).strip()]
+        return [str(c).strip() for c in _CLAUSE_SPLIT_RE.split(src) if str(c).strip()]
 
     def _extract_fragment(text: str, include_terms: tuple[str, ...], exclude_terms: tuple[str, ...]) -> str:
         src = str(text or "").strip()
@@ -2792,7 +3182,7 @@ def _merge_chat_signals_into_daily_log(
                 payload["training_done"] = True
                 _upsert_answer("training_done", True)
 
-    row.checkin_payload_json = json.dumps(
+    row.checkin_payload_json = dumps_compact(
         {
             "payload": payload,
             "extras": extras,
@@ -2801,7 +3191,6 @@ def _merge_chat_signals_into_daily_log(
             "evidence": existing_payload.get("evidence") if isinstance(existing_payload.get("evidence"), dict) else {},
             "updated_at_local": datetime.now(timezone.utc).isoformat(),
         },
-        separators=(",", ":"),
     )
 
     existing_notes = str(row.notes or "")
@@ -2848,6 +3237,7 @@ def _merge_chat_signals_into_daily_log(
             )
 
     db.commit()
+    invalidate_coaching_context(user_id)
 
 
 def _looks_like_weekly_report_request(question: str) -> bool:
@@ -2880,7 +3270,7 @@ def _apply_interaction_style(
                 "- Sleep and recovery consistency\n"
             )
         weekly_q = "Do you want this as a rolling report stack or a one-page weekly snapshot?"
-        if all(weekly_q != item for item in response.suggested_questions):
+        if weekly_q not in response.suggested_questions:
             response.suggested_questions = [weekly_q, *response.suggested_questions][:8]
         return response
 
@@ -2924,7 +3314,7 @@ def _apply_interaction_style(
                 f"{snapshot_text}\n"
             )
         loop_q = "What is your next measurable update (weight, BP/HR, hydration, meal, workout, or sleep)?"
-        if all(loop_q != item for item in response.suggested_questions):
+        if loop_q not in response.suggested_questions:
             response.suggested_questions = [loop_q, *response.suggested_questions][:8]
         return response
 
@@ -3064,7 +3454,15 @@ def _log_runtime_gap_feedback(
     )
 
 
-def _run_agentic_pipeline(
+async def _generate_json(llm_client: LLMClient, **kwargs: Any) -> dict[str, Any]:
+    # Await the non-blocking client path when available; sync-only clients run in the threadpool.
+    agenerate_json = getattr(llm_client, "agenerate_json", None)
+    if agenerate_json is not None:
+        return await agenerate_json(**kwargs)
+    return await run_in_threadpool(llm_client.generate_json, **kwargs)
+
+
+async def _run_agentic_pipeline(
     *,
     db: Session,
     user_id: int,
@@ -3072,8 +3470,12 @@ def _run_agentic_pipeline(
     payload: CoachQuestionRequest,
     context: dict[str, Any],
     llm_client: LLMClient,
+    supplement_topic: Optional[bool] = None,
 ) -> tuple[CoachQuestionResponse, list[dict[str, Any]]]:
-    include_supplement_audit = has_supplement_topic(payload.question)
+    include_supplement_audit = (
+        has_supplement_topic(payload.question) if supplement_topic is None else supplement_topic
+    )
+    mode_value = payload.mode
     baseline = context.get("baseline") or {}
     primary_goal = str(baseline.get("primary_goal") or "").strip()
     top_goals = baseline.get("top_goals") if isinstance(baseline.get("top_goals"), list) else []
@@ -3092,15 +3494,17 @@ def _run_agentic_pipeline(
             context=context,
             question=payload.question,
         )
-        _log_runtime_gap_feedback(
-            db=db,
-            user_id=user_id,
-            user_email=user_email,
-            specialist_title=profile["title"],
-            missing_data=missing_data,
-            missing_features=missing_features,
-            question=payload.question,
-        )
+        if missing_data or missing_features:
+            await run_in_threadpool(
+                _log_runtime_gap_feedback,
+                db=db,
+                user_id=user_id,
+                user_email=user_email,
+                specialist_title=profile["title"],
+                missing_data=missing_data,
+                missing_features=missing_features,
+                question=payload.question,
+            )
         specialist_system_prompt = render_agent_system_prompt(
             agent_id=profile["id"],
             user_goals=user_goals,
@@ -3111,7 +3515,7 @@ def _run_agentic_pipeline(
             question=payload.question,
             context_hint=payload.context_hint,
             context=context,
-            mode=payload.mode.value,
+            mode=mode_value,
             agent_title=profile["title"],
             agent_instruction=specialist_system_prompt,
             web_search_enabled=payload.web_search,
@@ -3120,7 +3524,8 @@ def _run_agentic_pipeline(
         task_type = profile["task_type"]
         if payload.deep_think and task_type == "reasoning":
             task_type = "deep_think"
-        raw = llm_client.generate_json(
+        raw = await _generate_json(
+            llm_client,
             db=db,
             user_id=user_id,
             prompt=prompt,
@@ -3133,10 +3538,10 @@ def _run_agentic_pipeline(
                 "agent_title": profile["title"],
                 "task_type": task_type,
                 "answer": str(raw.get("answer", "")).strip(),
-                "rationale_bullets": _safe_list(raw.get("rationale_bullets"), min_items=0, max_items=8, fallback=[]),
+                "rationale_bullets": _safe_list(raw.get("rationale_bullets"), min_items=0, max_items=8, fallback=()),
                 "recommended_actions": raw.get("recommended_actions", []),
-                "suggested_questions": _safe_list(raw.get("suggested_questions"), min_items=0, max_items=8, fallback=[]),
-                "safety_flags": _safe_list(raw.get("safety_flags"), min_items=0, max_items=8, fallback=[]),
+                "suggested_questions": _safe_list(raw.get("suggested_questions"), min_items=0, max_items=8, fallback=()),
+                "safety_flags": _safe_list(raw.get("safety_flags"), min_items=0, max_items=8, fallback=()),
                 "missing_data": missing_data,
                 "missing_features": missing_features,
             }
@@ -3159,14 +3564,15 @@ def _run_agentic_pipeline(
         question=payload.question,
         context_hint=payload.context_hint,
         context=context,
-        mode=payload.mode.value,
+        mode=mode_value,
         agent_title="Orchestrator",
         agent_instruction=orchestrator_contract_prompt,
         web_search_enabled=payload.web_search,
         prior_agents=agent_outputs,
     )
     synthesis_task_type = "deep_think" if payload.deep_think else "reasoning"
-    synthesis_raw = llm_client.generate_json(
+    synthesis_raw = await _generate_json(
+        llm_client,
         db=db,
         user_id=user_id,
         prompt=synthesis_prompt,
@@ -3180,19 +3586,19 @@ def _run_agentic_pipeline(
             "agent_title": "Orchestrator",
             "task_type": synthesis_task_type,
             "answer": str(synthesis_raw.get("answer", "")).strip(),
-            "rationale_bullets": _safe_list(synthesis_raw.get("rationale_bullets"), min_items=0, max_items=8, fallback=[]),
+            "rationale_bullets": _safe_list(synthesis_raw.get("rationale_bullets"), min_items=0, max_items=8, fallback=()),
             "recommended_actions": synthesis_raw.get("recommended_actions", []),
-            "suggested_questions": _safe_list(synthesis_raw.get("suggested_questions"), min_items=0, max_items=8, fallback=[]),
-            "safety_flags": _safe_list(synthesis_raw.get("safety_flags"), min_items=0, max_items=8, fallback=[]),
+            "suggested_questions": _safe_list(synthesis_raw.get("suggested_questions"), min_items=0, max_items=8, fallback=()),
+            "safety_flags": _safe_list(synthesis_raw.get("safety_flags"), min_items=0, max_items=8, fallback=()),
             "missing_data": [],
             "missing_features": [],
         }
     )
-    response = _response_from_raw(synthesis_raw, payload.mode.value)
+    response = _response_from_raw(synthesis_raw, mode_value)
     return response, agent_outputs
 
 
-def request_coaching_json(
+async def request_coaching_json(
     *,
     db: Session,
     user_id: int,
@@ -3201,16 +3607,18 @@ def request_coaching_json(
     context: dict[str, Any],
     llm_client: LLMClient,
     deep_think: bool = False,
+    supplement_topic: Optional[bool] = None,
 ) -> Union[tuple[CoachQuestionResponse, list[dict[str, Any]]], dict[str, Any]]:
     # Backward-compatible hook for tests/overrides that monkeypatch this symbol.
     _ = deep_think
-    return _run_agentic_pipeline(
+    return await _run_agentic_pipeline(
         db=db,
         user_id=user_id,
         user_email=(user_email or ""),
         payload=payload,
         context=context,
         llm_client=llm_client,
+        supplement_topic=supplement_topic,
     )
 
 
@@ -3276,48 +3684,22 @@ def _build_image_prompt(
             ],
         },
     }
-    return json.dumps(body, separators=(",", ":"))
+    return dumps_compact(body)
 
 
-def _tags_from_context(payload: CoachQuestionRequest, context: dict[str, Any]) -> str:
-    tags = [payload.mode.value]
-    if payload.deep_think:
+def _tags_from_context(mode_value: str, deep_think: bool, context_hint: Optional[str], context: dict[str, Any]) -> str:
+    # At most four tags are produced, so no trailing slice is needed.
+    tags = [mode_value]
+    if deep_think:
         tags.append("deep_think")
-    if payload.context_hint:
-        tags.append(payload.context_hint.lower().replace(" ", "_"))
-    missing = context.get("missing_data", [])
-    if missing:
+    if context_hint:
+        tags.append(context_hint.lower().replace(" ", "_"))
+    if context.get("missing_data"):
         tags.append("missing_data")
-    return ",".join(tags[:5])
-
-
-def _cache_key(user_id: int, payload: CoachQuestionRequest) -> tuple[int, str, str, bool]:
-    normalized_q = " ".join(payload.question.lower().split())
-    return (user_id, normalized_q, payload.mode.value, bool(payload.deep_think))
-
-
-def _cache_get(user_id: int, payload: CoachQuestionRequest) -> Optional[CoachQuestionResponse]:
-    if CACHE_TTL_SECONDS <= 0:
-        return None
-    key = _cache_key(user_id, payload)
-    entry = _COACH_RESPONSE_CACHE.get(key)
-    if not entry:
-        return None
-    ts, response = entry
-    if (time.time() - ts) > CACHE_TTL_SECONDS:
-        _COACH_RESPONSE_CACHE.pop(key, None)
-        return None
-    return response
-
-
-def _cache_set(user_id: int, payload: CoachQuestionRequest, response: CoachQuestionResponse) -> None:
-    if CACHE_TTL_SECONDS <= 0:
-        return
-    _COACH_RESPONSE_CACHE[_cache_key(user_id, payload)] = (time.time(), response)
+    return ",".join(tags)
 
 
 def _persist_summary(
-    db: Session,
     user_id: int,
     question: str,
     answer: str,
@@ -3325,115 +3707,51 @@ def _persist_summary(
     safety_flags: list[str],
     agent_trace: Optional[list[dict[str, Any]]] = None,
 ) -> None:
-    summary = ConversationSummary(
-        user_id=user_id,
-        created_at=datetime.now(timezone.utc),
-        question=question[:512],
-        answer_summary=answer[:1024],
-        tags=tags or None,
-        safety_flags=",".join(safety_flags) if safety_flags else None,
-        agent_trace_json=(json.dumps(agent_trace, separators=(",", ":")) if agent_trace else None),
-    )
-    db.add(summary)
-    db.commit()
+    # Runs as a background task. Slicing a str that already fits returns the same object, so short
+    # questions and answers are not copied.
+    enqueue_summary(
+        {
+            "user_id": user_id,
+            "question": question[:512],
+            "answer_summary": answer[:1024],
+            "tags": tags or None,
+            "safety_flags": ",".join(safety_flags) if safety_flags else None,
+            "agent_trace_json": (dumps_compact(agent_trace) if agent_trace else None),
+        }
+    )
 
 
-@router.post("/question", response_model=CoachQuestionResponse, status_code=status.HTTP_200_OK)
-def ask_coach_question(
-    payload: CoachQuestionRequest,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    llm_client: LLMClient = Depends(get_llm_client),
-) -> CoachQuestionResponse:
-    # Capture operational progress signals from free-form chat so summaries/agents can use them.
-    _merge_chat_signals_into_daily_log(
-        db=db,
-        user_id=user.id,
-        question=payload.question,
-        llm_client=llm_client,
-    )
+def _coach_response_content(response: CoachQuestionResponse) -> dict[str, Any]:
+    # Every field is already a plain str/int/list/dict, so orjson can encode this without a model_dump pass.
+    return {
+        "answer": response.answer,
+        "rationale_bullets": response.rationale_bullets,
+        "recommended_actions": [
+            {"title": action.title, "steps": action.steps} for action in response.recommended_actions
+        ],
+        "suggested_questions": response.suggested_questions,
+        "safety_flags": response.safety_flags,
+        "disclaimer": response.disclaimer,
+        "thread_id": response.thread_id,
+        "agent_trace": response.agent_trace,
+    }
 
-    thread = get_or_create_chat_thread(
-        db=db,
-        user_id=user.id,
-        question=payload.question,
-        thread_id=payload.thread_id,
-    )
 
-    cached = _cache_get(user.id, payload)
-    if cached is not None:
-        cached.thread_id = thread.id
-        cached.agent_trace = []
-        persist_chat_turn(
-            db=db,
-            user_id=user.id,
-            thread=thread,
-            user_text=payload.question,
-            assistant_text=cached.answer,
-            mode=payload.mode.value,
-        )
-        _persist_summary(
-            db=db,
-            user_id=user.id,
-            question=payload.question,
-            answer=cached.answer,
-            tags="cached_response",
-            safety_flags=cached.safety_flags,
-        )
-        return cached
-    urgent_flags = detect_urgent_flags(payload.question)
-    if urgent_flags:
-        emergency = emergency_response()
-        response = CoachQuestionResponse(**emergency)
-        response.thread_id = thread.id
-        response.agent_trace = []
-        persist_chat_turn(
-            db=db,
-            user_id=user.id,
-            thread=thread,
-            user_text=payload.question,
-            assistant_text=response.answer,
-            mode=payload.mode.value,
-        )
-        _persist_summary(
-            db=db,
-            user_id=user.id,
-            question=payload.question,
-            answer=response.answer,
-            tags="safety,urgent",
-            safety_flags=response.safety_flags,
-        )
-        return response
+def _coach_json_response(response: CoachQuestionResponse) -> ORJSONResponse:
+    # The response is assembled from already-validated parts; skip FastAPI's re-validation pass.
+    return ORJSONResponse(_coach_response_content(response))
 
-    context = build_coaching_context(db=db, user_id=user.id)
-    if not context.get("baseline_present"):
-        response = _fallback_response(
-            answer=(
-                "I can give more precise guidance once your baseline is complete. "
-                "Please complete baseline intake first, then ask this again for personalized coaching."
-            ),
-            safety_flags=["baseline_missing"],
-        )
-        response.thread_id = thread.id
-        response.agent_trace = []
-        persist_chat_turn(
-            db=db,
-            user_id=user.id,
-            thread=thread,
-            user_text=payload.question,
-            assistant_text=response.answer,
-            mode=payload.mode.value,
-        )
-        _persist_summary(
-            db=db,
-            user_id=user.id,
-            question=payload.question,
-            answer=response.answer,
-            tags=_tags_from_context(payload, context),
-            safety_flags=response.safety_flags,
-        )
-        return response
 
+async def _generate_coach_response(
+    *,
+    payload: CoachQuestionRequest,
+    user: User,
+    db: Session,
+    context: dict[str, Any],
+    llm_client: LLMClient,
+    safety: SafetyResult,
+) -> tuple[CoachQuestionResponse, list[dict[str, Any]], bool]:
+    mode_value = payload.mode
     llm_error = False
     agent_trace: list[dict[str, Any]] = []
     try:
@@ -3445,11 +3763,14 @@ def ask_coach_question(
             context=context,
             llm_client=llm_client,
             deep_think=payload.deep_think,
+            supplement_topic=safety.supplement,
         )
+        if inspect.isawaitable(raw_or_tuple):
+            raw_or_tuple = await raw_or_tuple
         if isinstance(raw_or_tuple, tuple):
             response, agent_trace = raw_or_tuple
         elif isinstance(raw_or_tuple, dict):
-            response = _response_from_raw(raw_or_tuple, payload.mode.value)
+            response = _response_from_raw(raw_or_tuple, mode_value)
             agent_trace = []
         else:
             raise ValueError("Unsupported coaching response type")
@@ -3466,7 +3787,7 @@ def ask_coach_question(
         elif exc.status_code and exc.status_code >= 500:
             detail_flag = "llm_provider_error"
         # Always provide practical guidance even when model generation fails.
-        response = _practical_non_llm_response(payload=payload, context=context, flag=detail_flag)
+        response = _practical_non_llm_response(context=context, flag=detail_flag, is_supplement=safety.supplement)
     except Exception as exc:
         logger.exception("coach_unhandled_error user_id=%s detail=%s", user.id, str(exc))
         llm_error = True
@@ -3478,48 +3799,230 @@ def ask_coach_question(
             safety_flags=["llm_unavailable"],
         )
 
-    if has_supplement_topic(payload.question):
-        response.safety_flags = list({*response.safety_flags, "supplement_caution"})
-        response.rationale_bullets = response.rationale_bullets[:6] + [supplement_caution_text()]
+    if safety.supplement:
+        _apply_supplement_caution(response)
 
     response = _apply_daily_log_nudge(response, context, payload.question)
     response = _apply_proactive_success_guidance(response, context)
     response = _apply_interaction_style(response, context, payload.question)
 
-    if llm_error:
-        response.suggested_questions = response.suggested_questions[:8]
-    response.thread_id = thread.id
-    response.agent_trace = _public_agent_trace(agent_trace)
+    return response, agent_trace, llm_error
 
+
+def _persist_coach_turn(
+    db: Session,
+    *,
+    user_id: int,
+    thread: Optional[ChatThread],
+    payload: CoachQuestionRequest,
+    answer: str,
+) -> int:
+    # Thread insert and both messages commit in one short write transaction.
+    if thread is None:
+        thread = get_or_create_chat_thread(db=db, user_id=user_id, question=payload.question, thread_id=None)
+    thread_id = thread.id
     persist_chat_turn(
         db=db,
-        user_id=user.id,
+        user_id=user_id,
         thread=thread,
         user_text=payload.question,
-        assistant_text=response.answer,
-        mode=payload.mode.value,
+        assistant_text=answer,
+        mode=payload.mode,
     )
+    return thread_id
 
-    _persist_summary(
+
+async def _answer_coach_question(
+    payload: CoachQuestionRequest,
+    user: User,
+    db: Session,
+    llm_client: LLMClient,
+    background_tasks: BackgroundTasks,
+) -> CoachQuestionResponse:
+    mode_value = payload.mode
+    # Capture operational progress signals from free-form chat so summaries/agents can use them.
+    # The parse makes a blocking utility LLM call, so keep it off the event loop.
+    await run_in_threadpool(
+        _merge_chat_signals_into_daily_log,
         db=db,
         user_id=user.id,
         question=payload.question,
+        llm_client=llm_client,
+    )
+
+    # An existing thread is validated up front; a new one is only inserted together with the first turn,
+    # so no write is left pending (holding SQLite's lock) across the LLM awaits below.
+    thread = (
+        await run_in_threadpool(
+            get_or_create_chat_thread,
+            db=db,
+            user_id=user.id,
+            question=payload.question,
+            thread_id=payload.thread_id,
+        )
+        if payload.thread_id is not None
+        else None
+    )
+
+    safety = classify_safety(payload.question)
+    if safety.urgent_flags:
+        response = _emergency_coach_response()
+        response.agent_trace = []
+        response.thread_id = await run_in_threadpool(
+            _persist_coach_turn, db, user_id=user.id, thread=thread, payload=payload, answer=response.answer
+        )
+        background_tasks.add_task(
+            _persist_summary,
+            user_id=user.id,
+            question=payload.question,
+            answer=response.answer,
+            tags="safety,urgent",
+            safety_flags=response.safety_flags,
+        )
+        return response
+
+    context = await run_in_threadpool(get_coaching_context, db=db, user_id=user.id)
+    if not context.get("baseline_present"):
+        response = _fallback_response(
+            answer=(
+                "I can give more precise guidance once your baseline is complete. "
+                "Please complete baseline intake first, then ask this again for personalized coaching."
+            ),
+            safety_flags=["baseline_missing"],
+        )
+        response.agent_trace = []
+        response.thread_id = await run_in_threadpool(
+            _persist_coach_turn, db, user_id=user.id, thread=thread, payload=payload, answer=response.answer
+        )
+        background_tasks.add_task(
+            _persist_summary,
+            user_id=user.id,
+            question=payload.question,
+            answer=response.answer,
+            tags=_tags_from_context(mode_value, payload.deep_think, payload.context_hint, context),
+            safety_flags=response.safety_flags,
+        )
+        return response
+
+    fingerprint = context_fingerprint(context)
+    cache_key = coach_cache_key(
+        user.id, payload.question, fingerprint, mode_value, payload.deep_think, payload.context_hint, payload.web_search
+    )
+    # Supplement questions only ever reuse an exact-match answer; near-duplicates there are too risky.
+    use_similar_tier = not safety.supplement
+    cached = get_cached_response(cache_key)
+    if cached is None and use_similar_tier:
+        cached = find_similar_response(
+            user.id,
+            payload.question,
+            fingerprint,
+            mode_value,
+            payload.deep_think,
+            payload.context_hint,
+            payload.web_search,
+        )
+    if cached is None:
+        cached = await wait_for_in_flight(cache_key)
+    if cached is not None:
+        response = CoachQuestionResponse.model_validate(cached)
+        response.agent_trace = []
+        response.thread_id = await run_in_threadpool(
+            _persist_coach_turn, db, user_id=user.id, thread=thread, payload=payload, answer=response.answer
+        )
+        background_tasks.add_task(
+            _persist_summary,
+            user_id=user.id,
+            question=payload.question,
+            answer=response.answer,
+            tags="cached_response",
+            safety_flags=response.safety_flags,
+        )
+        return response
+
+    # Concurrent duplicates of this question wait on this request instead of running the pipeline again.
+    leader = claim_in_flight(cache_key)
+    cacheable: Optional[dict[str, Any]] = None
+    try:
+        response, agent_trace, llm_error = await _generate_coach_response(
+            payload=payload, user=user, db=db, context=context, llm_client=llm_client, safety=safety
+        )
+        if llm_error:
+            response.suggested_questions = response.suggested_questions[:8]
+        response.agent_trace = _public_agent_trace(agent_trace)
+
+        if not llm_error:
+            # Cache without the per-request thread and trace; a hit fills those in again.
+            cacheable = _coach_response_content(response)
+            del cacheable["thread_id"], cacheable["agent_trace"]
+            cache_response(cache_key, cacheable)
+            if use_similar_tier and not response.safety_flags:
+                remember_similar_response(
+                    user.id,
+                    payload.question,
+                    fingerprint,
+                    mode_value,
+                    payload.deep_think,
+                    cacheable,
+                    payload.context_hint,
+                    payload.web_search,
+                )
+    finally:
+        if leader:
+            release_in_flight(cache_key, cacheable)
+
+    response.thread_id = await run_in_threadpool(
+        _persist_coach_turn, db, user_id=user.id, thread=thread, payload=payload, answer=response.answer
+    )
+
+    background_tasks.add_task(
+        _persist_summary,
+        user_id=user.id,
+        question=payload.question,
         answer=response.answer,
-        tags=_tags_from_context(payload, context),
+        tags=_tags_from_context(mode_value, payload.deep_think, payload.context_hint, context),
         safety_flags=response.safety_flags,
         agent_trace=agent_trace,
     )
-    _cache_set(user.id, payload, response)
     return response
 
 
+@router.post(
+    "/question",
+    response_model=CoachQuestionResponse,
+    status_code=status.HTTP_200_OK,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": CoachQuestionRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+                }
+            },
+        }
+    },
+)
+async def ask_coach_question(
+    background_tasks: BackgroundTasks,
+    user: User = Depends(get_current_user),
+    payload: CoachQuestionRequest = Depends(_coach_question_payload),
+    db: Session = Depends(get_db),
+    llm_client: LLMClient = Depends(get_llm_client),
+) -> ORJSONResponse:
+    return _coach_json_response(
+        await _answer_coach_question(
+            payload=payload, user=user, db=db, llm_client=llm_client, background_tasks=background_tasks
+        )
+    )
+
+
 @router.post("/voice", response_model=CoachQuestionResponse, status_code=status.HTTP_200_OK)
-def ask_coach_voice(
+async def ask_coach_voice(
     payload: CoachVoiceRequest,
+    background_tasks: BackgroundTasks,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     llm_client: LLMClient = Depends(get_llm_client),
-) -> CoachQuestionResponse:
+) -> ORJSONResponse:
     # Voice path is transcript-first for MVP: no audio persistence, same coaching pipeline.
     text_payload = CoachQuestionRequest(
         question=payload.transcript,
@@ -3529,11 +4032,16 @@ def ask_coach_voice(
         thread_id=payload.thread_id,
         web_search=payload.web_search,
     )
-    return ask_coach_question(payload=text_payload, user=user, db=db, llm_client=llm_client)
+    return _coach_json_response(
+        await _answer_coach_question(
+            payload=text_payload, user=user, db=db, llm_client=llm_client, background_tasks=background_tasks
+        )
+    )
 
 
 @router.post("/image", response_model=CoachQuestionResponse, status_code=status.HTTP_200_OK)
 def ask_coach_image(
+    background_tasks: BackgroundTasks,
     image: UploadFile = File(...),
     question: str = Form(""),
     mode: CoachMode = Form(CoachMode.quick),
@@ -3544,17 +4052,21 @@ def ask_coach_image(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     llm_client: LLMClient = Depends(get_llm_client),
-) -> CoachQuestionResponse:
+) -> ORJSONResponse:
     if not image.content_type or not image.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Only image uploads are supported.")
-    image_bytes = image.file.read()
+    too_large = HTTPException(
+        status_code=400,
+        detail=f"Image too large. Max size is {COACH_IMAGE_MAX_BYTES // (1024 * 1024)}MB.",
+    )
+    if (image.size or 0) > COACH_IMAGE_MAX_BYTES:
+        raise too_large
+    # Read one byte past the cap so an oversize upload without a known size is not loaded in full.
+    image_bytes = image.file.read(COACH_IMAGE_MAX_BYTES + 1)
     if not image_bytes:
         raise HTTPException(status_code=400, detail="Uploaded image is empty.")
     if len(image_bytes) > COACH_IMAGE_MAX_BYTES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Image too large. Max size is {COACH_IMAGE_MAX_BYTES // (1024 * 1024)}MB.",
-        )
+        raise too_large
 
     prompt_text = (question or "").strip() or "Please analyze this image and provide personalized coaching guidance."
     payload = CoachQuestionRequest(
@@ -3565,6 +4077,7 @@ def ask_coach_image(
         thread_id=thread_id,
         web_search=web_search,
     )
+    mode_value = payload.mode
 
     thread = get_or_create_chat_thread(
         db=db,
@@ -3573,13 +4086,12 @@ def ask_coach_image(
         thread_id=payload.thread_id,
     )
 
-    urgent_flags = detect_urgent_flags(payload.question)
-    if urgent_flags:
-        emergency = emergency_response()
-        response = CoachQuestionResponse(**emergency)
+    safety = classify_safety(payload.question)
+    if safety.urgent_flags:
+        response = _emergency_coach_response()
         response.thread_id = thread.id
-        _persist_summary(
-            db=db,
+        background_tasks.add_task(
+            _persist_summary,
             user_id=user.id,
             question=f"[image] {payload.question}",
             answer=response.answer,
@@ -3592,11 +4104,11 @@ def ask_coach_image(
             thread=thread,
             user_text=f"[image] {payload.question}",
             assistant_text=response.answer,
-            mode=payload.mode.value,
+            mode=mode_value,
         )
-        return response
+        return _coach_json_response(response)
 
-    context = build_coaching_context(db=db, user_id=user.id)
+    context = get_coaching_context(db=db, user_id=user.id)
     if not context.get("baseline_present"):
         response = _fallback_response(
             answer=(
@@ -3606,8 +4118,8 @@ def ask_coach_image(
             safety_flags=["baseline_missing"],
         )
         response.thread_id = thread.id
-        _persist_summary(
-            db=db,
+        background_tasks.add_task(
+            _persist_summary,
             user_id=user.id,
             question=f"[image] {payload.question}",
             answer=response.answer,
@@ -3620,9 +4132,9 @@ def ask_coach_image(
             thread=thread,
             user_text=f"[image] {payload.question}",
             assistant_text=response.answer,
-            mode=payload.mode.value,
+            mode=mode_value,
         )
-        return response
+        return _coach_json_response(response)
 
     llm_error = False
     try:
@@ -3634,7 +4146,7 @@ def ask_coach_image(
                 question=payload.question,
                 context_hint=payload.context_hint,
                 context=context,
-                mode=payload.mode.value,
+                mode=mode_value,
                 web_search_enabled=payload.web_search,
             ),
             image_bytes=image_bytes,
@@ -3642,7 +4154,7 @@ def ask_coach_image(
             task_type=task_type,
             allow_web_search=payload.web_search,
         )
-        response = _response_from_raw(raw, payload.mode.value)
+        response = _response_from_raw(raw, mode_value)
     except LLMRequestError as exc:
         logger.exception("coach_llm_image_request_error user_id=%s detail=%s", user.id, str(exc))
         llm_error = True
@@ -3655,7 +4167,7 @@ def ask_coach_image(
             detail_flag = "llm_rate_limited"
         elif exc.status_code and exc.status_code >= 500:
             detail_flag = "llm_provider_error"
-        response = _practical_non_llm_response(payload=payload, context=context, flag=detail_flag)
+        response = _practical_non_llm_response(context=context, flag=detail_flag, is_supplement=safety.supplement)
     except Exception as exc:
         logger.exception("coach_image_unhandled_error user_id=%s detail=%s", user.id, str(exc))
         llm_error = True
@@ -3667,9 +4179,8 @@ def ask_coach_image(
             safety_flags=["llm_unavailable"],
         )
 
-    if has_supplement_topic(payload.question):
-        response.safety_flags = list({*response.safety_flags, "supplement_caution"})
-        response.rationale_bullets = response.rationale_bullets[:6] + [supplement_caution_text()]
+    if safety.supplement:
+        _apply_supplement_caution(response)
 
     response = _apply_daily_log_nudge(response, context, payload.question)
     response = _apply_proactive_success_guidance(response, context)
@@ -3685,15 +4196,15 @@ def ask_coach_image(
         thread=thread,
         user_text=f"[image] {payload.question}",
         assistant_text=response.answer,
-        mode=payload.mode.value,
+        mode=mode_value,
     )
 
-    _persist_summary(
-        db=db,
+    background_tasks.add_task(
+        _persist_summary,
         user_id=user.id,
         question=f"[image:{image.filename or 'upload'}] {payload.question}",
         answer=response.answer,
-        tags="image," + _tags_from_context(payload, context),
+        tags="image," + _tags_from_context(mode_value, payload.deep_think, payload.context_hint, context),
         safety_flags=response.safety_flags,
     )
-    return response
+    return _coach_json_response(response)
@@ -7,6 +7,8 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
+from app.core.context_builder import invalidate_coaching_context
+from app.core.json_codec import dumps_compact, loads
 from app.db.models import DailyLog, User
 from app.db.session import get_db
 
@@ -45,7 +47,7 @@ def _to_item(row: DailyLog) -> DailyLogItem:
     parsed_checkin_payload: Optional[dict[str, Any]] = None
     if row.checkin_payload_json:
         try:
-            loaded = json.loads(row.checkin_payload_json)
+            loaded = loads(row.checkin_payload_json)
             if isinstance(loaded, dict):
                 parsed_checkin_payload = loaded
         except json.JSONDecodeError:
@@ -108,8 +110,9 @@ def upsert_daily_log(
     if payload.notes is not None:
         row.notes = payload.notes
     if payload.checkin_payload_json is not None:
-        row.checkin_payload_json = json.dumps(payload.checkin_payload_json, separators=(",", ":"))
+        row.checkin_payload_json = dumps_compact(payload.checkin_payload_json)
     db.commit()
+    invalidate_coaching_context(user.id)
     db.refresh(row)
     return _to_item(row)
 
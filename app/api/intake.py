@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field, model_validator
 from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
+from app.core.context_builder import invalidate_coaching_context
 from app.db.models import Baseline, IntakeConversationSession, User, UserAIConfig
 from app.db.session import get_db
 from app.services.llm import LLMClient, get_llm_client
@@ -451,69 +452,87 @@ def _question_for_step(step: str, answers: dict[str, Any]) -> str:
     return prompts.get(step, "Please share the next detail.")
 
 
+_GOAL_TIMELINE_RE = re.compile(
+    r"(?:(?:time\s*line|timeline)\s*[:\-]?\s*)?((?:\d+\s*(?:to|-)\s*\d+\s*(?:weeks?|months?))|(?:\d+\s*(?:weeks?|months?|years?))|long[\s-]?term)"
+)
+_GOAL_CHALLENGE_RE = re.compile(r"(?:challenge|barrier)\s*(?:is|=|:)?\s*([^,.]+)")
+_GOAL_TIMELINE_CLAUSE_RE = re.compile(r"(?:time\s*line|timeline)\s*[:\-]?\s*[^,.;]+", re.IGNORECASE)
+_GOAL_CHALLENGE_CLAUSE_RE = re.compile(r"(?:challenge|barrier)\s*(?:is|=|:)?\s*[^,.;]+", re.IGNORECASE)
+_MULTI_SPACE_RE = re.compile(r"\s{2,}")
+
+
 def _extract_goal_batch_values(raw: str) -> dict[str, str]:
     text = raw.strip()
     lower = text.lower()
     out: dict[str, str] = {}
 
-    timeline_match = re.search(
-        r"(?:(?:time\s*line|timeline)\s*[:\-]?\s*)?((?:\d+\s*(?:to|-)\s*\d+\s*(?:weeks?|months?))|(?:\d+\s*(?:weeks?|months?|years?))|long[\s-]?term)",
-        lower,
-    )
+    timeline_match = _GOAL_TIMELINE_RE.search(lower)
     if timeline_match:
         out["timeline"] = timeline_match.group(1).strip()
 
-    challenge_match = re.search(r"(?:challenge|barrier)\s*(?:is|=|:)?\s*([^,.]+)", lower)
+    challenge_match = _GOAL_CHALLENGE_RE.search(lower)
     if challenge_match:
         out["biggest_challenge"] = challenge_match.group(1).strip()
     elif any(k in lower for k in ["craving", "schedule", "sleep", "stress", "consisten"]):
         # If explicit challenge label is missing, store compact phrase as challenge context.
         out["biggest_challenge"] = text[:160]
 
-    cleaned = re.sub(r"(?:time\s*line|timeline)\s*[:\-]?\s*[^,.;]+", "", text, flags=re.IGNORECASE)
-    cleaned = re.sub(r"(?:challenge|barrier)\s*(?:is|=|:)?\s*[^,.;]+", "", cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r"\s{2,}", " ", cleaned).strip(" ,.;")
+    cleaned = _GOAL_TIMELINE_CLAUSE_RE.sub("", text)
+    cleaned = _GOAL_CHALLENGE_CLAUSE_RE.sub("", cleaned)
+    cleaned = _MULTI_SPACE_RE.sub(" ", cleaned).strip(" ,.;")
     if cleaned:
         out["target_outcome"] = cleaned[:2000]
     return out
 
 
+_BP_RE = re.compile(r"(\d{2,3})\s*/\s*(\d{2,3})")
+_AGE_RE = re.compile(r"\b(\d{2,3})\s*(?:y|yr|yrs|year|years)\b")
+_SEX_AT_BIRTH_PATTERNS = (
+    (re.compile(r"\bmale\b"), "male"),
+    (re.compile(r"\bfemale\b"), "female"),
+    (re.compile(r"\bintersex\b"), "intersex"),
+)
+_WEIGHT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(lb|lbs|pound|pounds|kg|kgs)\b")
+_WAIST_LABELED_RE = re.compile(r"\bwaist\b[^0-9]*(\d+(?:\.\d+)?)\s*(in|inch|inches|cm)\b")
+_INCH_VALUE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(in|inch|inches)\b")
+_FEET_INCHES_RE = re.compile(r"(\d)\s*(?:ft|')\s*(\d{1,2})\s*(?:in|\"|inches)?")
+_HEIGHT_RE = re.compile(r"(?:height\s*)?(\d+(?:\.\d+)?)\s*(cm|in|inch|inches)\b")
+
+
 def _extract_basics_batch_values(raw: str) -> dict[str, Any]:
     text = raw.strip()
     lower = text.lower()
     out: dict[str, Any] = {}
 
     # Blood pressure can fill both fields in one pass.
-    bp = re.search(r"(\d{2,3})\s*/\s*(\d{2,3})", text)
+    bp = _BP_RE.search(text)
     if bp:
         out["systolic_bp"] = int(bp.group(1))
         out["diastolic_bp"] = int(bp.group(2))
 
     # Age heuristic
-    age = re.search(r"\b(\d{2,3})\s*(?:y|yr|yrs|year|years)\b", lower)
+    age = _AGE_RE.search(lower)
     if age:
         out["age_years"] = int(age.group(1))
 
     # Sex heuristic
-    if re.search(r"\bmale\b", lower):
-        out["sex_at_birth"] = "male"
-    elif re.search(r"\bfemale\b", lower):
-        out["sex_at_birth"] = "female"
-    elif re.search(r"\bintersex\b", lower):
-        out["sex_at_birth"] = "intersex"
+    for pattern, sex_at_birth in _SEX_AT_BIRTH_PATTERNS:
+        if pattern.search(lower):
+            out["sex_at_birth"] = sex_at_birth
+            break
 
     # Weight heuristic
-    w = re.search(r"(\d+(?:\.\d+)?)\s*(lb|lbs|pound|pounds|kg|kgs)\b", lower)
+    w = _WEIGHT_RE.search(lower)
     if w:
         out["weight"] = _parse_weight_kg(f"{w.group(1)} {w.group(2)}")
 
     # Waist heuristic
     # Waist heuristic: prioritize explicit "waist" label, otherwise use a plausible adult waist range.
-    waist_labeled = re.search(r"\bwaist\b[^0-9]*(\d+(?:\.\d+)?)\s*(in|inch|inches|cm)\b", lower)
+    waist_labeled = _WAIST_LABELED_RE.search(lower)
     if waist_labeled:
         out["waist"] = _parse_waist_cm(f"{waist_labeled.group(1)} {waist_labeled.group(2)}")
     else:
-        inch_candidates = re.findall(r"(\d+(?:\.\d+)?)\s*(in|inch|inches)\b", lower)
+        inch_candidates = _INCH_VALUE_RE.findall(lower)
         for num, unit in inch_candidates:
             try:
                 val = float(num)
@@ -525,11 +544,11 @@ def _extract_basics_batch_values(raw: str) -> dict[str, Any]:
                 break
 
     # Height heuristic
-    ftin = re.search(r"(\d)\s*(?:ft|')\s*(\d{1,2})\s*(?:in|\"|inches)?", lower)
+    ftin = _FEET_INCHES_RE.search(lower)
     if ftin:
         out["height_text"] = f"{ftin.group(1)} ft {ftin.group(2)} in"
     else:
-        h = re.search(r"(?:height\s*)?(\d+(?:\.\d+)?)\s*(cm|in|inch|inches)\b", lower)
+        h = _HEIGHT_RE.search(lower)
         if h:
             out["height_text"] = f"{h.group(1)} {h.group(2)}"
 
@@ -540,6 +559,9 @@ def _extract_basics_batch_values(raw: str) -> dict[str, Any]:
     return out
 
 
+_MG_DOSE_RE = re.compile(r"\b\d+(?:\.\d+)?\s*mg\b")
+
+
 def _extract_health_batch_values(raw: str) -> dict[str, str]:
     text = raw.strip()
     lower = text.lower()
@@ -570,7 +592,7 @@ def _extract_health_batch_values(raw: str) -> dict[str, str]:
         "levothyroxine",
     ]
     has_medication = any(term in lower for term in medication_terms) or bool(
-        re.search(r"\b\d+(?:\.\d+)?\s*mg\b", lower)
+        _MG_DOSE_RE.search(lower)
     )
     if has_medication:
         out["medication_details"] = text[:2000]
@@ -599,6 +621,9 @@ def _extract_health_batch_values(raw: str) -> dict[str, str]:
     return out
 
 
+_FASTING_STYLE_RE = re.compile(r"\b(12:12|14:10|16:8|18:6|20:4)\b")
+
+
 def _extract_fasting_batch_values(raw: str) -> dict[str, str]:
     text = raw.strip()
     lower = text.lower()
@@ -612,7 +637,7 @@ def _extract_fasting_batch_values(raw: str) -> dict[str, str]:
     elif any(term in lower for term in ["unsure", "not sure", "maybe"]):
         out["fasting_interest"] = "unsure"
 
-    style = re.search(r"\b(12:12|14:10|16:8|18:6|20:4)\b", lower)
+    style = _FASTING_STYLE_RE.search(lower)
     if style:
         out["fasting_style"] = style.group(1)
     elif "flex" in lower:
@@ -797,8 +822,13 @@ def _normalize_answers_for_baseline(answers: dict[str, Any]) -> dict[str, Any]:
     return normalized
 
 
+_NUMBER_RE = re.compile(r"(-?\d+(?:\.\d+)?)")
+_INCH_UNIT_RE = re.compile(r"\b(in|inch|inches)\b")
+_SLEEP_HOURS_MINUTES_RE = re.compile(r"(\d+)\s*h(?:ours?)?\s*(\d+)?\s*m?")
+
+
 def _extract_number(text: str) -> float:
-    match = re.search(r"(-?\d+(?:\.\d+)?)", text)
+    match = _NUMBER_RE.search(text)
     if not match:
         raise ValueError("Please include a number.")
     return float(match.group(1))
@@ -815,14 +845,14 @@ def _parse_weight_kg(text: str) -> float:
 def _parse_waist_cm(text: str) -> float:
     val = _extract_number(text)
     lower = text.lower()
-    if re.search(r"\b(in|inch|inches)\b", lower):
+    if _INCH_UNIT_RE.search(lower):
         return round(val * 2.54, 2)
     return round(val, 2)
 
 
 def _parse_sleep_hours(text: str) -> float:
     lower = text.lower().strip()
-    hm = re.search(r"(\d+)\s*h(?:ours?)?\s*(\d+)?\s*m?", lower)
+    hm = _SLEEP_HOURS_MINUTES_RE.search(lower)
     if hm:
         hours = int(hm.group(1))
         mins = int(hm.group(2)) if hm.group(2) else 0
@@ -844,7 +874,7 @@ def _parse_activity_level(text: str) -> str:
 
 
 def _parse_bp(text: str) -> Any:
-    slash = re.search(r"(\d{2,3})\s*/\s*(\d{2,3})", text)
+    slash = _BP_RE.search(text)
     if slash:
         return {"systolic": int(slash.group(1)), "diastolic": int(slash.group(2))}
     return int(_extract_number(text))
@@ -1089,6 +1119,7 @@ def _upsert_baseline_record(db: Session, user_id: int, payload: BaselineRequest)
     record.recovery_practices = payload.recovery_practices
     record.medication_details = payload.medication_details
     db.commit()
+    invalidate_coaching_context(user_id)
     db.refresh(record)
     return record
 
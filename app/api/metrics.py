@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
+from app.core.context_builder import invalidate_coaching_context
 from app.db.models import Metric, User
 from app.db.session import get_db
 
@@ -93,6 +94,7 @@ def create_metric(
     )
     db.add(record)
     db.commit()
+    invalidate_coaching_context(user.id)
     db.refresh(record)
     return MetricItem(
         id=record.id,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 
@@ -225,6 +226,8 @@ AGENT_CONTRACTS: dict[str, AgentContract] = {
 }
 
 
+# Pure in its string arguments, and the same specialist/goals/hint triple repeats across a user's turns.
+@lru_cache(maxsize=1024)
 def render_agent_system_prompt(
     *,
     agent_id: str,
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Optional
+
+from app.core.cache import TTLCache
+from app.core.json_codec import dumps_compact
+
+COACH_CACHE_TTL_SECONDS = int(os.getenv("COACH_CACHE_TTL_SECONDS", "3600"))
+COACH_CACHE_MAXSIZE = int(os.getenv("COACH_CACHE_MAXSIZE", "10000"))
+
+# Context sections that change the coaching answer. recent_conversations is left out on purpose:
+# every answered question appends to it, which would make repeat questions never hit.
+_FINGERPRINT_KEYS = ("baseline", "metrics_7d_summary", "daily_log_summary", "structured_memory", "latest_scores")
+
+_COACH_RESPONSE_CACHE = TTLCache(maxsize=COACH_CACHE_MAXSIZE, ttl=max(COACH_CACHE_TTL_SECONDS, 1))
+
+
+def context_fingerprint(context: dict[str, Any]) -> str:
+    snapshot = {key: context.get(key) for key in _FINGERPRINT_KEYS}
+    return hashlib.blake2b(dumps_compact(snapshot).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def coach_cache_key(
+    user_id: int,
+    question: str,
+    fingerprint: str,
+    mode: str,
+    deep_think: bool,
+    context_hint: Optional[str] = None,
+    web_search: bool = False,
+) -> str:
+    # web_search changes both the prompt and the provider tools, so online and offline answers never share a key.
+    normalized_q = " ".join(question.lower().split())
+    raw = dumps_compact(
+        [user_id, normalized_q, fingerprint, mode, bool(deep_think), _normalize_hint(context_hint), bool(web_search)]
+    )
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Exact-key answers still being generated. Concurrent duplicates (double-clicks, retries) wait on the
+# first request instead of running the pipeline again; a failed leader resolves to None.
+_IN_FLIGHT: "dict[str, asyncio.Future[Optional[dict[str, Any]]]]" = {}
+
+
+def claim_in_flight(key: str) -> bool:
+    if COACH_CACHE_TTL_SECONDS <= 0 or key in _IN_FLIGHT:
+        return False
+    _IN_FLIGHT[key] = asyncio.get_running_loop().create_future()
+    return True
+
+
+async def wait_for_in_flight(key: str) -> Optional[dict[str, Any]]:
+    pending = _IN_FLIGHT.get(key)
+    if pending is None:
+        return None
+    return await asyncio.shield(pending)
+
+
+def release_in_flight(key: str, response: Optional[dict[str, Any]]) -> None:
+    pending = _IN_FLIGHT.pop(key, None)
+    if pending is not None and not pending.done():
+        pending.set_result(response)
+
+
+def get_cached_response(key: str) -> Optional[dict[str, Any]]:
+    if COACH_CACHE_TTL_SECONDS <= 0:
+        return None
+    return _COACH_RESPONSE_CACHE.get(key)
+
+
+def cache_response(key: str, response: dict[str, Any]) -> None:
+    if COACH_CACHE_TTL_SECONDS <= 0:
+        return
+    _COACH_RESPONSE_CACHE.set(key, response)
+
+
+# Second tier: near-duplicate questions (same user, context, mode, hint, web search) reuse a prior answer. Similarity
+# is cosine over word unigrams + bigrams, so reordered or lightly reworded questions match while
+# "is X better than Y" and "is Y better than X" stay distinct. Lexical overlap cannot tell 128/84 from
+# 178/84 or "eat more" from "eat less", so a hit also needs identical numbers and negation/direction
+# words. Scopes are keyed on the context fingerprint, so a changed baseline or new logs miss on their own.
+COACH_SIMILAR_MIN_SCORE = float(os.getenv("COACH_SIMILAR_MIN_SCORE", "0.92"))
+COACH_SIMILAR_TTL_SECONDS = int(os.getenv("COACH_SIMILAR_TTL_SECONDS", str(COACH_CACHE_TTL_SECONDS)))
+_SIMILAR_ENTRIES_PER_SCOPE = 32
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_POLARITY_WORDS = frozenset(
+    {
+        "not", "no", "never", "without", "don", "doesn", "isn", "shouldn", "cannot", "stop", "avoid", "skip",
+        "more", "less", "fewer", "increase", "decrease", "raise", "lower", "reduce", "higher", "high", "low",
+        "up", "down", "above", "below", "over", "under", "max", "maximum", "min", "minimum", "before", "after",
+    }
+)
+
+_SIMILAR_RESPONSE_INDEX = TTLCache(maxsize=COACH_CACHE_MAXSIZE, ttl=max(COACH_SIMILAR_TTL_SECONDS, 1))
+
+
+def _normalize_hint(context_hint: Optional[str]) -> str:
+    return " ".join((context_hint or "").lower().split())
+
+
+def _question_vector(question: str) -> tuple[Counter, float, tuple[frozenset, frozenset]]:
+    lowered = question.lower()
+    words = _WORD_RE.findall(lowered)
+    terms = Counter(words)
+    terms.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    # Any difference in these makes two otherwise similar questions ask for different advice.
+    guard = (frozenset(_NUMBER_RE.findall(lowered)), _POLARITY_WORDS.intersection(words))
+    return terms, math.sqrt(sum(count * count for count in terms.values())), guard
+
+
+def _similar_scope(
+    user_id: int, fingerprint: str, mode: str, deep_think: bool, context_hint: Optional[str], web_search: bool
+) -> tuple:
+    return (user_id, fingerprint, mode, bool(deep_think), _normalize_hint(context_hint), bool(web_search))
+
+
+def find_similar_response(
+    user_id: int,
+    question: str,
+    fingerprint: str,
+    mode: str,
+    deep_think: bool,
+    context_hint: Optional[str] = None,
+    web_search: bool = False,
+) -> Optional[dict[str, Any]]:
+    if COACH_CACHE_TTL_SECONDS <= 0:
+        return None
+    scope = _similar_scope(user_id, fingerprint, mode, deep_think, context_hint, web_search)
+    entries = _SIMILAR_RESPONSE_INDEX.get(scope)
+    if not entries:
+        return None
+    terms, norm, guard = _question_vector(question)
+    if not norm:
+        return None
+    best_score = 0.0
+    best_response = None
+    for entry_terms, entry_norm, entry_guard, response in entries:
+        if entry_guard != guard:
+            continue
+        shared = terms.keys() & entry_terms.keys()
+        score = sum(terms[t] * entry_terms[t] for t in shared) / (norm * entry_norm)
+        if score > best_score:
+            best_score, best_response = score, response
+    return best_response if best_score >= COACH_SIMILAR_MIN_SCORE else None
+
+
+def remember_similar_response(
+    user_id: int,
+    question: str,
+    fingerprint: str,
+    mode: str,
+    deep_think: bool,
+    response: dict[str, Any],
+    context_hint: Optional[str] = None,
+    web_search: bool = False,
+) -> None:
+    if COACH_CACHE_TTL_SECONDS <= 0:
+        return
+    terms, norm, guard = _question_vector(question)
+    if not norm:
+        return
+    scope = _similar_scope(user_id, fingerprint, mode, deep_think, context_hint, web_search)
+    entries = _SIMILAR_RESPONSE_INDEX.get(scope) or ()
+    # Tuples are replaced, never mutated, so concurrent readers always see a consistent list.
+    _SIMILAR_RESPONSE_INDEX.set(scope, ((terms, norm, guard, response),) + entries[: _SIMILAR_ENTRIES_PER_SCOPE - 1])
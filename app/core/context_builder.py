@@ -1,10 +1,12 @@
 import json
-import json
+import os
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.json_codec import loads
 from app.db.models import Baseline, CompositeScore, ConversationSummary, DailyLog, DomainScore, Metric
 
 CONTEXT_METRIC_TYPES = [
@@ -20,6 +22,12 @@ CONTEXT_METRIC_TYPES = [
 ]
 
 
+# Coaching context is rebuilt from six queries; reuse it across back-to-back requests. Every write to a
+# table it reads calls invalidate_coaching_context, and the short TTL bounds drift of the 7-day window.
+COACHING_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("COACHING_CONTEXT_CACHE_TTL_SECONDS", "60"))
+_CONTEXT_CACHE = TTLCache(maxsize=5000, ttl=max(COACHING_CONTEXT_CACHE_TTL_SECONDS, 1))
+
+
 def _avg(values: list[float]) -> Optional[float]:
     if not values:
         return None
@@ -87,7 +95,7 @@ def build_coaching_context(db: Session, user_id: int) -> dict[str, Any]:
         top_goals: list[str] = []
         if baseline.top_goals_json:
             try:
-                parsed = json.loads(baseline.top_goals_json)
+                parsed = loads(baseline.top_goals_json)
                 if isinstance(parsed, list):
                     top_goals = [str(item).strip() for item in parsed if str(item).strip()][:5]
             except json.JSONDecodeError:
@@ -147,7 +155,7 @@ def build_coaching_context(db: Session, user_id: int) -> dict[str, Any]:
         if not row.checkin_payload_json:
             continue
         try:
-            parsed_payload = json.loads(row.checkin_payload_json)
+            parsed_payload = loads(row.checkin_payload_json)
         except json.JSONDecodeError:
             continue
         if not isinstance(parsed_payload, dict):
@@ -184,3 +192,18 @@ def build_coaching_context(db: Session, user_id: int) -> dict[str, Any]:
         "missing_data": missing_data,
         "recent_conversations": recent_conversations,
     }
+
+
+def get_coaching_context(db: Session, user_id: int) -> dict[str, Any]:
+    """Cached build_coaching_context; callers must treat the returned dict as read-only."""
+    if COACHING_CONTEXT_CACHE_TTL_SECONDS <= 0:
+        return build_coaching_context(db, user_id)
+    context = _CONTEXT_CACHE.get(user_id)
+    if context is None:
+        context = build_coaching_context(db, user_id)
+        _CONTEXT_CACHE.set(user_id, context)
+    return context
+
+
+def invalidate_coaching_context(user_id: int) -> None:
+    _CONTEXT_CACHE.pop(user_id)
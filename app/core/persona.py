@@ -1,6 +1,7 @@
+_DEFAULT_VOICE_PREFIX = "Here is a practical next move. "
+_VOICE_PREFIXES = {"deep": "Here is a structured game plan. "}
+
+
 def apply_longevity_alchemist_voice(answer: str, mode: str) -> str:
-    if mode == "deep":
-        prefix = "Here is a structured game plan. "
-    else:
-        prefix = "Here is a practical next move. "
-    return f"{prefix}{answer.strip()}"
+    # A single concatenation; memoizing would hash and compare the whole answer for no saving.
+    return _VOICE_PREFIXES.get(mode, _DEFAULT_VOICE_PREFIX) + answer.strip()
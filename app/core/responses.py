@@ -0,0 +1,13 @@
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def model_json_bytes(model: BaseModel) -> bytes:
+    # pydantic-core encodes straight to JSON bytes with the class's prebuilt serializer; no intermediate dict.
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def model_json_response(model: BaseModel) -> Response:
+    # Returning the model itself would make FastAPI re-validate it against response_model and then
+    # serialize it a second time.
+    return Response(content=model_json_bytes(model), media_type="application/json")
@@ -1,3 +1,6 @@
+import re
+from typing import NamedTuple
+
 URGENT_SYMPTOM_PATTERNS = [
     "chest pain",
     "pressure in chest",
@@ -21,17 +24,40 @@ SUPPLEMENT_PATTERNS = [
 ]
 
 
+_URGENT_ALTERNATION = "|".join(map(re.escape, URGENT_SYMPTOM_PATTERNS))
+_SUPPLEMENT_ALTERNATION = "|".join(map(re.escape, SUPPLEMENT_PATTERNS))
+_URGENT_RE = re.compile(_URGENT_ALTERNATION)
+_SUPPLEMENT_RE = re.compile(_SUPPLEMENT_ALTERNATION)
+# One alternation over both keyword sets; the named group says which set a match came from.
+_SAFETY_RE = re.compile(f"(?P<urgent>{_URGENT_ALTERNATION})|(?P<supplement>{_SUPPLEMENT_ALTERNATION})")
+
+
+class SafetyResult(NamedTuple):
+    urgent_flags: list[str]
+    supplement: bool
+
+
+def classify_safety(question: str) -> SafetyResult:
+    """Run the urgent-symptom and supplement checks in a single scan of the lowercased question."""
+    urgent = supplement = False
+    for match in _SAFETY_RE.finditer(question.lower()):
+        if match.lastgroup == "urgent":
+            urgent = True
+        else:
+            supplement = True
+        if urgent and supplement:
+            break
+    return SafetyResult(urgent_flags=["urgent_symptom_language"] if urgent else [], supplement=supplement)
+
+
 def detect_urgent_flags(question: str) -> list[str]:
-    lowered = question.lower()
-    flags = [pattern for pattern in URGENT_SYMPTOM_PATTERNS if pattern in lowered]
-    if flags:
+    if _URGENT_RE.search(question.lower()):
         return ["urgent_symptom_language"]
     return []
 
 
 def has_supplement_topic(question: str) -> bool:
-    lowered = question.lower()
-    return any(token in lowered for token in SUPPLEMENT_PATTERNS)
+    return _SUPPLEMENT_RE.search(question.lower()) is not None
 
 
 def emergency_response() -> dict:
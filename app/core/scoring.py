@@ -4,6 +4,7 @@ from typing import Iterable, Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.context_builder import invalidate_coaching_context
 from app.db.models import CompositeScore, DomainScore, Metric
 
 
@@ -155,6 +156,7 @@ def ensure_fresh_scores(db: Session, user_id: int, freshness_hours: int = 24) ->
         domain = compute_domain_scores(db, user_id=user_id)
         composite = compute_composite_score(db, domain_score=domain)
         db.commit()
+        invalidate_coaching_context(user_id)
         db.refresh(domain)
         db.refresh(composite)
 
@@ -4,13 +4,24 @@ import os
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-# pbkdf2_sha256 is broadly compatible across Python versions and remains secure
-# for password hashing in this MVP.
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# argon2id tuned for ~50 ms verifies; pbkdf2_sha256 hashes from earlier releases
+# still verify and are upgraded to argon2id on the next successful login.
+pwd_context = CryptContext(
+    schemes=["argon2", "pbkdf2_sha256"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+    argon2__digest_size=32,
+    argon2__salt_size=16,
+)
 
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
 ALGORITHM = "HS256"
@@ -25,11 +36,29 @@ def _build_fernet() -> Fernet:
 
 fernet = _build_fernet()
 
+# API keys are sealed with AES-256-GCM (OpenSSL EVP, AES-NI where available).
+# Fernet tokens written by earlier releases remain readable.
+_AESGCM_PREFIX = "v2:"
+_AESGCM_NONCE_BYTES = 12
+
+
+def _build_aesgcm() -> AESGCM:
+    key = hashlib.sha256(f"api-key-aesgcm:{SECRET_KEY}".encode("utf-8")).digest()
+    return AESGCM(key)
+
+
+aesgcm = _build_aesgcm()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash when the stored one is legacy."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -42,19 +71,33 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def decode_access_token(token: str) -> str:
+def decode_access_token_claims(token: str) -> tuple[str, int]:
+    """Return the verified (subject, exp) pair for a bearer token."""
     payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     subject = payload.get("sub")
     if not subject:
         raise JWTError("Missing subject")
-    return subject
+    return subject, int(payload.get("exp") or 0)
+
+
+def decode_access_token(token: str) -> str:
+    return decode_access_token_claims(token)[0]
 
 
 def encrypt_api_key(api_key: str) -> str:
-    return fernet.encrypt(api_key.encode("utf-8")).decode("utf-8")
+    nonce = os.urandom(_AESGCM_NONCE_BYTES)
+    sealed = aesgcm.encrypt(nonce, api_key.encode("utf-8"), None)
+    return _AESGCM_PREFIX + base64.urlsafe_b64encode(nonce + sealed).decode("ascii")
 
 
 def decrypt_api_key(encrypted_api_key: str) -> str:
+    if encrypted_api_key.startswith(_AESGCM_PREFIX):
+        try:
+            blob = base64.urlsafe_b64decode(encrypted_api_key[len(_AESGCM_PREFIX):])
+            nonce, sealed = blob[:_AESGCM_NONCE_BYTES], blob[_AESGCM_NONCE_BYTES:]
+            return aesgcm.decrypt(nonce, sealed, None).decode("utf-8")
+        except (InvalidTag, ValueError) as exc:
+            raise ValueError("Invalid encrypted key") from exc
     try:
         return fernet.decrypt(encrypted_api_key.encode("utf-8")).decode("utf-8")
     except InvalidToken as exc:
@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Date, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func, text
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column, relationship
 
 Base = declarative_base()
@@ -138,6 +138,7 @@ class Metric(Base):
 
 class DomainScore(Base):
     __tablename__ = "domain_scores"
+    __table_args__ = (Index("ix_domain_scores_user_computed", "user_id", "computed_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
@@ -153,6 +154,7 @@ class DomainScore(Base):
 
 class CompositeScore(Base):
     __tablename__ = "composite_scores"
+    __table_args__ = (Index("ix_composite_scores_user_computed", "user_id", "computed_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
@@ -168,7 +170,9 @@ class ConversationSummary(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False, index=True
+    )
     question: Mapped[str] = mapped_column(String(512), nullable=False)
     answer_summary: Mapped[str] = mapped_column(String(1024), nullable=False)
     tags: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
@@ -275,6 +279,7 @@ class ChatThread(Base):
     __tablename__ = "chat_threads"
     __table_args__ = (
         Index("ix_chat_threads_user_updated", "user_id", "updated_at"),
+        Index("ix_chat_threads_user_last_message", "user_id", text("last_message_at DESC"), text("id DESC")),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -283,6 +288,7 @@ class ChatThread(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     last_message_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    message_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     user: Mapped[User] = relationship("User", back_populates="chat_threads")
     messages: Mapped[list["ChatMessage"]] = relationship(
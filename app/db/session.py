@@ -108,6 +108,32 @@ def create_tables() -> None:
         if "checkin_payload_json" not in daily_log_columns:
             conn.execute(text("ALTER TABLE daily_logs ADD COLUMN checkin_payload_json TEXT"))
 
+        chat_thread_columns = {row[1] for row in conn.execute(text("PRAGMA table_info(chat_threads)")).fetchall()}
+        if "message_count" not in chat_thread_columns:
+            conn.execute(text("ALTER TABLE chat_threads ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0"))
+            conn.execute(
+                text(
+                    "UPDATE chat_threads SET message_count = "
+                    "(SELECT COUNT(*) FROM chat_messages WHERE chat_messages.thread_id = chat_threads.id)"
+                )
+            )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_chat_threads_user_last_message "
+                "ON chat_threads (user_id, last_message_at DESC, id DESC)"
+            )
+        )
+        # Latest-score lookups filter by user and order by computed_at on every coaching request.
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_domain_scores_user_computed ON domain_scores (user_id, computed_at)")
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_composite_scores_user_computed "
+                "ON composite_scores (user_id, computed_at)"
+            )
+        )
+
 
 def get_db():
     db: Session = SessionLocal()
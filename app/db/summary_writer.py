@@ -0,0 +1,52 @@
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert
+
+from app.core.context_builder import invalidate_coaching_context
+from app.db.models import ConversationSummary
+from app.db.session import SessionLocal
+
+SUMMARY_FLUSH_MAX_ROWS = 500
+
+_PENDING: "queue.SimpleQueue[dict[str, Any]]" = queue.SimpleQueue()
+_FLUSH_LOCK = threading.Lock()
+
+
+def _drain(max_rows: int) -> list[dict[str, Any]]:
+    batch: list[dict[str, Any]] = []
+    while len(batch) < max_rows:
+        try:
+            batch.append(_PENDING.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def flush_summaries() -> None:
+    while batch := _drain(SUMMARY_FLUSH_MAX_ROWS):
+        # One timestamp per group commit; rows are queued only milliseconds before they are flushed.
+        stmt = insert(ConversationSummary).values(created_at=datetime.now(timezone.utc))
+        with SessionLocal() as db:
+            db.execute(stmt, batch)
+            db.commit()
+        for user_id in {row["user_id"] for row in batch}:
+            invalidate_coaching_context(user_id)
+
+
+def enqueue_summary(row: dict[str, Any]) -> None:
+    """Queue a conversation_summaries row and group-commit it with any rows queued concurrently.
+
+    Whichever caller holds the flush lock writes every pending row in one INSERT + COMMIT; callers
+    that find the lock taken return immediately, since the holder re-checks the queue after releasing.
+    """
+    _PENDING.put(row)
+    while not _PENDING.empty():
+        if not _FLUSH_LOCK.acquire(blocking=False):
+            return
+        try:
+            flush_summaries()
+        finally:
+            _FLUSH_LOCK.release()
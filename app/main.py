@@ -1,9 +1,9 @@
 from pathlib import Path
 
 from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 
-from app.api.auth import router as auth_router
+from app.api.auth import close_model_list_client, router as auth_router
 from app.api.coach import router as coach_router
 from app.api.dashboard import router as dashboard_router
 from app.api.intake import router as intake_router
@@ -13,8 +13,9 @@ from app.api.summary import router as summary_router
 from app.api.feedback import router as feedback_router
 from app.api.chat_history import router as chat_router
 from app.db.session import create_tables
+from app.services.llm import close_llm_http_client
 
-app = FastAPI(title="The Longevity Alchemist")
+app = FastAPI(title="The Longevity Alchemist", default_response_class=ORJSONResponse)
 ONBOARDING_PAGE = Path(__file__).resolve().parent / "static" / "onboarding.html"
 APP_PAGE = Path(__file__).resolve().parent / "static" / "app.html"
 
@@ -24,6 +25,12 @@ def on_startup() -> None:
     create_tables()
 
 
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await close_model_list_client()
+    await close_llm_http_client()
+
+
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
@@ -1,15 +1,19 @@
+import asyncio
 import json
 import os
 import time
 import base64
 from datetime import datetime, timezone
+from functools import partial
 from typing import Any, Optional, Protocol, Tuple
 
 import httpx
 from sqlalchemy.orm import Session
 
+from app.core.json_codec import loads
 from app.core.security import decrypt_api_key
 from app.db.models import ModelUsageStat, UserAIConfig
+from app.services import llm_batcher
 
 LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
 LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "10"))
@@ -54,7 +58,7 @@ class LLMRequestError(RuntimeError):
 
 def parse_llm_json(raw_text: str) -> dict[str, Any]:
     try:
-        parsed = json.loads(raw_text)
+        parsed = loads(raw_text)
         if isinstance(parsed, dict):
             return parsed
     except json.JSONDecodeError:
@@ -64,7 +68,7 @@ def parse_llm_json(raw_text: str) -> dict[str, Any]:
     end = raw_text.rfind("}")
     if start != -1 and end != -1 and end > start:
         try:
-            parsed = json.loads(raw_text[start : end + 1])
+            parsed = loads(raw_text[start : end + 1])
             if isinstance(parsed, dict):
                 return parsed
         except json.JSONDecodeError:
@@ -127,9 +131,7 @@ def select_model_for_task(
     return reasoning_model
 
 
-def _openai_request_v1_chat(
-    model: str, api_key: str, prompt: str, max_output_tokens: int, system_instruction: str = DEFAULT_JSON_SYSTEM_PROMPT
-) -> Tuple[str, dict[str, int]]:
+def _openai_chat_payload(model: str, prompt: str, max_output_tokens: int, system_instruction: str) -> dict[str, Any]:
     payload = {
         "model": model,
         "response_format": {"type": "json_object"},
@@ -145,14 +147,10 @@ def _openai_request_v1_chat(
     # GPT-5 family may consume all tokens on reasoning unless explicitly lowered.
     if model.startswith("gpt-5"):
         payload["reasoning_effort"] = "low"
-    response = httpx.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-        json=payload,
-        timeout=_http_timeout(),
-    )
-    response.raise_for_status()
-    data = response.json()
+    return payload
+
+
+def _parse_openai_chat(data: Any) -> Tuple[str, dict[str, int]]:
     usage = data.get("usage", {}) if isinstance(data, dict) else {}
     usage_tokens = {
         "prompt_tokens": int(usage.get("prompt_tokens", 0) or 0),
@@ -165,14 +163,22 @@ def _openai_request_v1_chat(
     return text, usage_tokens
 
 
-def _openai_request_v1_responses(
-    model: str,
-    api_key: str,
-    prompt: str,
-    max_output_tokens: int,
-    allow_web_search: bool = False,
-    system_instruction: str = DEFAULT_JSON_SYSTEM_PROMPT,
+def _openai_request_v1_chat(
+    model: str, api_key: str, prompt: str, max_output_tokens: int, system_instruction: str = DEFAULT_JSON_SYSTEM_PROMPT
 ) -> Tuple[str, dict[str, int]]:
+    response = httpx.post(
+        "https://api.openai.com/v1/chat/completions",
+        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+        json=_openai_chat_payload(model, prompt, max_output_tokens, system_instruction),
+        timeout=_http_timeout(),
+    )
+    response.raise_for_status()
+    return _parse_openai_chat(loads(response.content))
+
+
+def _openai_responses_payload(
+    model: str, prompt: str, max_output_tokens: int, allow_web_search: bool, system_instruction: str
+) -> dict[str, Any]:
     payload = {
         "model": model,
         "input": [
@@ -197,14 +203,10 @@ def _openai_request_v1_responses(
         payload["text"] = {"verbosity": "low"}
     if allow_web_search:
         payload["tools"] = [{"type": "web_search_preview"}]
-    response = httpx.post(
-        "https://api.openai.com/v1/responses",
-        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-        json=payload,
-        timeout=_http_timeout(),
-    )
-    response.raise_for_status()
-    data = response.json()
+    return payload
+
+
+def _parse_openai_responses(data: dict[str, Any]) -> Tuple[str, dict[str, int]]:
     text_out = _extract_openai_output_text(data)
     if not text_out:
         raise ValueError("OpenAI responses API returned no text output")
@@ -220,6 +222,24 @@ def _openai_request_v1_responses(
     return text_out, usage_tokens
 
 
+def _openai_request_v1_responses(
+    model: str,
+    api_key: str,
+    prompt: str,
+    max_output_tokens: int,
+    allow_web_search: bool = False,
+    system_instruction: str = DEFAULT_JSON_SYSTEM_PROMPT,
+) -> Tuple[str, dict[str, int]]:
+    response = httpx.post(
+        "https://api.openai.com/v1/responses",
+        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+        json=_openai_responses_payload(model, prompt, max_output_tokens, allow_web_search, system_instruction),
+        timeout=_http_timeout(),
+    )
+    response.raise_for_status()
+    return _parse_openai_responses(loads(response.content))
+
+
 def _extract_openai_output_text(data: dict[str, Any]) -> str:
     text_out = ""
     if isinstance(data.get("output_text"), str) and data.get("output_text"):
@@ -288,7 +308,7 @@ def _openai_request_v1_responses_with_image(
         timeout=_http_timeout(),
     )
     response.raise_for_status()
-    data = response.json()
+    data = loads(response.content)
     text_out = _extract_openai_output_text(data)
     if not text_out:
         raise ValueError("OpenAI responses API returned no text output for image request")
@@ -409,19 +429,18 @@ def _openai_request(
     raise LLMRequestError(provider="openai", model=model, message=f"OpenAI request failed: {last_error}")
 
 
-def _gemini_request(
-    model: str, api_key: str, prompt: str, max_output_tokens: int
-) -> Tuple[str, dict[str, int]]:
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
-    response = httpx.post(
-        url,
-        headers={"Content-Type": "application/json"},
-        json={
-            "generationConfig": {"responseMimeType": "application/json", "temperature": 0.3, "maxOutputTokens": max_output_tokens},
-            "contents": [{"parts": [{"text": prompt}]}],
-        },
-        timeout=_http_timeout(),
-    )
+def _gemini_url(model: str, api_key: str) -> str:
+    return f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
+
+
+def _gemini_payload(prompt: str, max_output_tokens: int) -> dict[str, Any]:
+    return {
+        "generationConfig": {"responseMimeType": "application/json", "temperature": 0.3, "maxOutputTokens": max_output_tokens},
+        "contents": [{"parts": [{"text": prompt}]}],
+    }
+
+
+def _parse_gemini(model: str, response: httpx.Response) -> Tuple[str, dict[str, int]]:
     try:
         response.raise_for_status()
     except httpx.HTTPStatusError as exc:
@@ -435,7 +454,7 @@ def _gemini_request(
             status_code=status,
             message=f"Gemini request failed (status={status}): {detail or 'no response body'}",
         ) from exc
-    data = response.json()
+    data = loads(response.content)
     usage = data.get("usageMetadata", {}) if isinstance(data, dict) else {}
     prompt_tokens = int(usage.get("promptTokenCount", 0) or 0)
     completion_tokens = int(usage.get("candidatesTokenCount", 0) or 0)
@@ -448,6 +467,190 @@ def _gemini_request(
     return data["candidates"][0]["content"]["parts"][0]["text"], usage_tokens
 
 
+def _gemini_request(
+    model: str, api_key: str, prompt: str, max_output_tokens: int
+) -> Tuple[str, dict[str, int]]:
+    response = httpx.post(
+        _gemini_url(model, api_key),
+        headers={"Content-Type": "application/json"},
+        json=_gemini_payload(prompt, max_output_tokens),
+        timeout=_http_timeout(),
+    )
+    return _parse_gemini(model, response)
+
+
+_ASYNC_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _async_http_client() -> httpx.AsyncClient:
+    # One pooled client per process keeps provider TLS connections warm across coach requests.
+    global _ASYNC_HTTP_CLIENT
+    if _ASYNC_HTTP_CLIENT is None or _ASYNC_HTTP_CLIENT.is_closed:
+        _ASYNC_HTTP_CLIENT = httpx.AsyncClient(
+            timeout=_http_timeout(), limits=httpx.Limits(max_keepalive_connections=32)
+        )
+    return _ASYNC_HTTP_CLIENT
+
+
+async def close_llm_http_client() -> None:
+    global _ASYNC_HTTP_CLIENT
+    if _ASYNC_HTTP_CLIENT is not None:
+        await _ASYNC_HTTP_CLIENT.aclose()
+        _ASYNC_HTTP_CLIENT = None
+
+
+async def _openai_post_async(url: str, api_key: str, payload: dict[str, Any]) -> Any:
+    response = await _async_http_client().post(
+        url,
+        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+        json=payload,
+    )
+    response.raise_for_status()
+    return loads(response.content)
+
+
+async def _openai_request_v1_chat_async(
+    model: str, api_key: str, prompt: str, max_output_tokens: int, system_instruction: str = DEFAULT_JSON_SYSTEM_PROMPT
+) -> Tuple[str, dict[str, int]]:
+    data = await _openai_post_async(
+        "https://api.openai.com/v1/chat/completions",
+        api_key,
+        _openai_chat_payload(model, prompt, max_output_tokens, system_instruction),
+    )
+    return _parse_openai_chat(data)
+
+
+async def _openai_request_v1_responses_async(
+    model: str,
+    api_key: str,
+    prompt: str,
+    max_output_tokens: int,
+    allow_web_search: bool = False,
+    system_instruction: str = DEFAULT_JSON_SYSTEM_PROMPT,
+) -> Tuple[str, dict[str, int]]:
+    data = await _openai_post_async(
+        "https://api.openai.com/v1/responses",
+        api_key,
+        _openai_responses_payload(model, prompt, max_output_tokens, allow_web_search, system_instruction),
+    )
+    return _parse_openai_responses(data)
+
+
+async def _openai_request_async(
+    model: str,
+    api_key: str,
+    prompt: str,
+    max_output_tokens: int,
+    allow_web_search: bool = False,
+    system_instruction: str = DEFAULT_JSON_SYSTEM_PROMPT,
+) -> Tuple[str, dict[str, int]]:
+    # Mirrors _openai_request's endpoint fallback and retry policy without blocking the event loop.
+    attempts = max(1, LLM_RETRY_COUNT + 1)
+    last_error = "unknown error"
+    prefer_responses = model.startswith("gpt-5") or allow_web_search
+    for idx in range(attempts):
+        try:
+            if prefer_responses:
+                raw, usage_tokens = await _openai_request_v1_responses_async(
+                    model,
+                    api_key,
+                    prompt,
+                    max_output_tokens,
+                    allow_web_search=allow_web_search,
+                    system_instruction=system_instruction,
+                )
+            else:
+                raw, usage_tokens = await _openai_request_v1_chat_async(
+                    model, api_key, prompt, max_output_tokens, system_instruction=system_instruction
+                )
+                if not raw.strip():
+                    raw, usage_tokens = await _openai_request_v1_responses_async(
+                        model,
+                        api_key,
+                        prompt,
+                        max_output_tokens,
+                        allow_web_search=allow_web_search,
+                        system_instruction=system_instruction,
+                    )
+            return raw, usage_tokens
+        except ValueError as exc:
+            try:
+                boosted_tokens = min(max_output_tokens * 2, 1800)
+                return await _openai_request_v1_responses_async(
+                    model,
+                    api_key,
+                    prompt,
+                    boosted_tokens,
+                    allow_web_search=allow_web_search,
+                    system_instruction=system_instruction,
+                )
+            except Exception as fallback_exc:
+                last_error = str(fallback_exc)[:220]
+                if idx < attempts - 1:
+                    await asyncio.sleep(LLM_RETRY_BACKOFF_SECONDS * (idx + 1))
+                    continue
+                raise LLMRequestError(
+                    provider="openai",
+                    model=model,
+                    message=f"OpenAI request failed: {str(exc)[:220]}",
+                ) from fallback_exc
+        except httpx.ReadTimeout as exc:
+            last_error = "read timeout"
+            if idx < attempts - 1:
+                await asyncio.sleep(LLM_RETRY_BACKOFF_SECONDS * (idx + 1))
+                continue
+            raise LLMRequestError(
+                provider="openai",
+                model=model,
+                message="OpenAI request timed out while waiting for response.",
+            ) from exc
+        except httpx.HTTPStatusError as exc:
+            status = exc.response.status_code if exc.response else None
+            detail = ""
+            if exc.response is not None:
+                detail = (exc.response.text or "").strip()[:220]
+            if status in {400, 404}:
+                try:
+                    return await _openai_request_v1_responses_async(
+                        model,
+                        api_key,
+                        prompt,
+                        max_output_tokens,
+                        allow_web_search=allow_web_search,
+                        system_instruction=system_instruction,
+                    )
+                except Exception as fallback_exc:
+                    last_error = str(fallback_exc)[:220]
+            raise LLMRequestError(
+                provider="openai",
+                model=model,
+                status_code=status,
+                message=f"OpenAI request failed (status={status}): {detail or 'no response body'}",
+            ) from exc
+        except Exception as exc:
+            last_error = str(exc)[:220]
+            if idx < attempts - 1:
+                await asyncio.sleep(LLM_RETRY_BACKOFF_SECONDS * (idx + 1))
+                continue
+            raise LLMRequestError(
+                provider="openai",
+                model=model,
+                message=f"OpenAI request failed: {last_error}",
+            ) from exc
+    raise LLMRequestError(provider="openai", model=model, message=f"OpenAI request failed: {last_error}")
+
+
+async def _gemini_request_async(
+    model: str, api_key: str, prompt: str, max_output_tokens: int
+) -> Tuple[str, dict[str, int]]:
+    response = await _async_http_client().post(
+        _gemini_url(model, api_key),
+        headers={"Content-Type": "application/json"},
+        json=_gemini_payload(prompt, max_output_tokens),
+    )
+    return _parse_gemini(model, response)
+
+
 def _gemini_request_with_image(
     model: str, api_key: str, prompt: str, image_bytes: bytes, image_mime_type: str, max_output_tokens: int
 ) -> Tuple[str, dict[str, int]]:
@@ -480,7 +683,7 @@ def _gemini_request_with_image(
             status_code=status,
             message=f"Gemini image request failed (status={status}): {detail or 'no response body'}",
         ) from exc
-    data = response.json()
+    data = loads(response.content)
     usage = data.get("usageMetadata", {}) if isinstance(data, dict) else {}
     prompt_tokens = int(usage.get("promptTokenCount", 0) or 0)
     completion_tokens = int(usage.get("candidatesTokenCount", 0) or 0)
@@ -540,6 +743,25 @@ def _record_usage(
     row.last_used_at = now
 
 
+def _finish_json(
+    db: Session, user_id: int, provider: str, model: str, raw: str, usage_tokens: dict[str, int]
+) -> dict[str, Any]:
+    _record_usage(db, user_id, provider, model, usage_tokens)
+    db.commit()
+    try:
+        return parse_llm_json(raw)
+    except ValueError:
+        # Recover from non-JSON model output instead of failing the entire request path.
+        text = str(raw).strip()
+        return {
+            "answer": text or "Model returned an empty response.",
+            "rationale_bullets": [],
+            "recommended_actions": [],
+            "suggested_questions": [],
+            "safety_flags": [],
+        }
+
+
 class LLMClient(Protocol):
     def generate_json(
         self,
@@ -593,20 +815,44 @@ class RealLLMClient:
             raw, usage_tokens = _gemini_request(model, api_key, prompt, max_output_tokens)
         else:
             raise ValueError("Unsupported AI provider")
-        _record_usage(db, user_id, provider, model, usage_tokens)
-        db.commit()
-        try:
-            return parse_llm_json(raw)
-        except ValueError:
-            # Recover from non-JSON model output instead of failing the entire request path.
-            text = str(raw).strip()
-            return {
-                "answer": text or "Model returned an empty response.",
-                "rationale_bullets": [],
-                "recommended_actions": [],
-                "suggested_questions": [],
-                "safety_flags": [],
-            }
+        return _finish_json(db, user_id, provider, model, raw, usage_tokens)
+
+    async def agenerate_json(
+        self,
+        db: Session,
+        user_id: int,
+        prompt: str,
+        task_type: str = "reasoning",
+        allow_web_search: bool = False,
+        system_instruction: str = DEFAULT_JSON_SYSTEM_PROMPT,
+    ) -> dict[str, Any]:
+        # Session work (config read, usage commit) runs in a worker thread so a SQLite lock wait never
+        # stalls the event loop; only the provider round-trip is awaited on it.
+        provider, reasoning_model, deep_thinker_model, utility_model, api_key = await asyncio.to_thread(
+            _resolve_model_config, db, user_id
+        )
+        model = select_model_for_task(reasoning_model, deep_thinker_model, utility_model, task_type)
+        max_output_tokens = _max_output_tokens(task_type)
+        if provider == "openai":
+            call = partial(
+                _openai_request_async,
+                model,
+                api_key,
+                prompt,
+                max_output_tokens,
+                allow_web_search=allow_web_search,
+                system_instruction=system_instruction,
+            )
+        elif provider == "gemini":
+            call = partial(_gemini_request_async, model, api_key, prompt, max_output_tokens)
+        else:
+            raise ValueError("Unsupported AI provider")
+        # Identical concurrent prompts on the same key/model share one provider round-trip.
+        key = llm_batcher.request_key(
+            provider, model, api_key, max_output_tokens, allow_web_search, system_instruction, prompt
+        )
+        raw, usage_tokens = await llm_batcher.submit(key, call)
+        return await asyncio.to_thread(_finish_json, db, user_id, provider, model, raw, usage_tokens)
 
     def generate_json_from_image(
         self,
@@ -0,0 +1,57 @@
+import asyncio
+import hashlib
+import os
+from typing import Awaitable, Callable, Tuple
+
+LLM_COALESCE_ENABLED = os.getenv("LLM_COALESCE_ENABLED", "true").strip().lower() not in {"0", "false", "no"}
+
+LLMResult = Tuple[str, dict[str, int]]
+
+_IN_FLIGHT: dict[bytes, "asyncio.Future[LLMResult]"] = {}
+
+
+def request_key(*parts: object) -> bytes:
+    # Length-prefixed parts fed straight into blake2b; no JSON copy of the (large) prompt is built.
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        data = str(part).encode("utf-8")
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.digest()
+
+
+async def submit(key: bytes, call: Callable[[], Awaitable[LLMResult]]) -> LLMResult:
+    """Run ``call`` once for every concurrent submission sharing ``key``.
+
+    The first caller issues the provider request; callers arriving while it is in flight await the
+    same future and get the raw text with empty usage, so tokens are only counted once.
+    """
+    if not LLM_COALESCE_ENABLED:
+        return await call()
+    pending = _IN_FLIGHT.get(key)
+    if pending is not None:
+        try:
+            raw, _usage = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            # The leading request was cancelled by its own client; issue ours instead.
+            return await submit(key, call)
+        return raw, {}
+    future: "asyncio.Future[LLMResult]" = asyncio.get_running_loop().create_future()
+    _IN_FLIGHT[key] = future
+    try:
+        result = await call()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        # Mark the exception retrieved so an unshared failure does not log "never retrieved".
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _IN_FLIGHT.pop(key, None)
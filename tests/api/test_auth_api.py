@@ -0,0 +1,30 @@
+import asyncio
+from uuid import uuid4
+
+import httpx
+
+
+def test_concurrent_signups_with_ai_config_do_not_lock_database(app) -> None:
+    async def run() -> list[int]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/auth/signup",
+                        json={
+                            "email": f"concurrent_{uuid4().hex[:10]}@test.com",
+                            "password": "StrongPass123",
+                            "ai_config": {
+                                "ai_provider": "openai",
+                                "ai_model": "gpt-4.1-mini",
+                                "ai_api_key": "sk-test-12345678",
+                            },
+                        },
+                    )
+                    for _ in range(8)
+                )
+            )
+        return [response.status_code for response in responses]
+
+    assert asyncio.run(run()) == [201] * 8
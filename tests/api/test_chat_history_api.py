@@ -65,3 +65,33 @@ def test_chat_thread_create_endpoint(client, auth_token) -> None:
     listing = client.get("/chat/threads", headers=headers)
     assert listing.status_code == 200
     assert any(item["thread_id"] == body["thread_id"] for item in listing.json()["items"])
+
+
+def test_chat_thread_messages_keyset_pagination(client, auth_token, override_llm) -> None:
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    baseline = client.post("/intake/baseline", headers=headers, json=_baseline_payload())
+    assert baseline.status_code == 200
+    override_llm(FakeScenario.OK_LUNCH_PLAN)
+
+    q1 = client.post("/coach/question", headers=headers, json={"question": "How do I improve energy this week?"})
+    thread_id = q1.json()["thread_id"]
+    client.post(
+        "/coach/question",
+        headers=headers,
+        json={"question": "Add a simple meal template.", "thread_id": thread_id},
+    )
+
+    first = client.get(f"/chat/threads/{thread_id}/messages", headers=headers, params={"limit": 3})
+    assert first.status_code == 200
+    first_body = first.json()
+    assert len(first_body["messages"]) == 3
+    assert first_body["next_after_id"] == first_body["messages"][-1]["id"]
+
+    second = client.get(
+        f"/chat/threads/{thread_id}/messages",
+        headers=headers,
+        params={"limit": 3, "after_id": first_body["next_after_id"]},
+    )
+    second_body = second.json()
+    assert [row["role"] for row in second_body["messages"]] == ["assistant"]
+    assert second_body["next_after_id"] is None
@@ -1,7 +1,13 @@
+import asyncio
+import json
 from datetime import date
 
-from conftest import FakeScenario
+import httpx
+
+from conftest import FakeLLMClient, FakeScenario
+from app.api import coach as coach_api
 from app.db.models import ConversationSummary, FeedbackEntry
+from app.services.llm import _finish_json, get_llm_client
 
 
 def _baseline_payload() -> dict:
@@ -116,6 +122,53 @@ def test_coach_persists_agent_trace(client, auth_token, override_llm, db_session
     assert "nutritionist" in row.agent_trace_json
 
 
+def test_coach_repeat_question_served_from_cache(client, auth_token, override_llm, db_session) -> None:
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    baseline = client.post("/intake/baseline", headers=headers, json=_baseline_payload())
+    assert baseline.status_code == 200
+    override_llm(FakeScenario.OK_LUNCH_PLAN)
+
+    first = client.post("/coach/question", headers=headers, json={"question": "What should I eat for lunch today?"})
+    assert first.status_code == 200
+    override_llm(FakeScenario.TIMEOUT)
+    second = client.post("/coach/question", headers=headers, json={"question": "  what should I eat for LUNCH today? "})
+    assert second.status_code == 200
+    assert second.json()["answer"] == first.json()["answer"]
+    assert second.json()["agent_trace"] == []
+
+    row = db_session.query(ConversationSummary).order_by(ConversationSummary.id.desc()).first()
+    assert row is not None
+    assert row.tags == "cached_response"
+
+
+class _AsyncFakeLLMClient(FakeLLMClient):
+    async def agenerate_json(self, db, user_id, prompt, task_type="reasoning", allow_web_search=False, system_instruction=""):
+        # Mirror the real async client: await the provider, then record usage through the session.
+        await asyncio.sleep(0.05)
+        raw = json.dumps(self.generate_json(db, user_id, prompt, task_type, allow_web_search, system_instruction))
+        return await asyncio.to_thread(_finish_json, db, user_id, "openai", "gpt-4.1-mini", raw, {"total_tokens": 10})
+
+
+def test_concurrent_async_coach_questions_do_not_lock_database(app, client, auth_token, fixture_dir) -> None:
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    baseline = client.post("/intake/baseline", headers=headers, json=_baseline_payload())
+    assert baseline.status_code == 200
+    app.dependency_overrides[get_llm_client] = lambda: _AsyncFakeLLMClient(FakeScenario.OK_LUNCH_PLAN, fixture_dir)
+
+    async def run() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(
+                async_client.post("/coach/question", headers=headers, json={"question": "What should I eat for lunch?"}),
+                async_client.post("/coach/question", headers=headers, json={"question": "How do I sleep better tonight?"}),
+            )
+
+    responses = asyncio.run(run())
+    assert [response.status_code for response in responses] == [200, 200]
+    thread_ids = {response.json()["thread_id"] for response in responses}
+    assert len(thread_ids) == 2 and None not in thread_ids
+
+
 def test_daily_checkin_plan_is_specialist_and_time_aligned(client, auth_token) -> None:
     headers = {"Authorization": f"Bearer {auth_token}"}
     baseline = client.post("/intake/baseline", headers=headers, json=_baseline_payload())
@@ -138,6 +191,42 @@ def test_daily_checkin_plan_is_specialist_and_time_aligned(client, auth_token) -
     assert "on-plan" not in nutrition_q.lower()
 
 
+def test_daily_checkin_plan_streams_fallback_then_final_as_ndjson(client, auth_token) -> None:
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    baseline = client.post("/intake/baseline", headers=headers, json=_baseline_payload())
+    assert baseline.status_code == 200
+
+    response = client.post(
+        "/coach/daily-checkin-plan",
+        headers={**headers, "Accept": "application/x-ndjson"},
+        json={"local_hour": 8, "timezone_offset_minutes": -300, "generate_with_ai": False},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [line["stage"] for line in lines] == ["fallback", "final"]
+    assert lines[0]["plan"]["time_bucket"] == "morning"
+    assert lines[1]["plan"]["questions"] == lines[0]["plan"]["questions"]
+
+
+def test_daily_checkin_plan_stream_ends_with_error_line_on_failure(monkeypatch, client, auth_token) -> None:
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    def failing_stages(**_kwargs):
+        raise RuntimeError("context unavailable")
+        yield
+
+    monkeypatch.setattr(coach_api, "_daily_checkin_plan_stages", failing_stages)
+    response = client.post(
+        "/coach/daily-checkin-plan",
+        headers={**headers, "Accept": "application/x-ndjson"},
+        json={"local_hour": 8, "timezone_offset_minutes": -300, "generate_with_ai": False},
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert lines == [{"stage": "error", "detail": "Check-in plan failed. Please retry."}]
+
+
 def test_daily_checkin_plan_skips_already_captured_weight_signal(client, auth_token) -> None:
     headers = {"Authorization": f"Bearer {auth_token}"}
     baseline = client.post("/intake/baseline", headers=headers, json=_baseline_payload())
@@ -376,6 +465,33 @@ def test_proactive_card_uses_notes_chat_progress_for_food_details(client, auth_t
     assert "chicken pizza" in markdown
 
 
+def test_proactive_card_inputs_refresh_after_daily_log_write(client, auth_token, override_llm) -> None:
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    baseline = client.post("/intake/baseline", headers=headers, json=_baseline_payload())
+    assert baseline.status_code == 200
+    override_llm(FakeScenario.TIMEOUT)
+    first = client.post("/coach/proactive-card", headers=headers, json={"card_type": "daily_summary"})
+    assert first.status_code == 200
+    assert "chicken pizza" not in first.json()["markdown"].lower()
+
+    upsert = client.put(
+        f"/daily-log/{date.today().isoformat()}",
+        headers=headers,
+        json={
+            "sleep_hours": 7.0,
+            "energy": 6,
+            "mood": 6,
+            "stress": 4,
+            "nutrition_on_plan": False,
+            "notes": "chat_progress: two pieces of chicken pizza for lunch",
+        },
+    )
+    assert upsert.status_code == 200
+    second = client.post("/coach/proactive-card", headers=headers, json={"card_type": "daily_summary"})
+    assert second.status_code == 200
+    assert "chicken pizza" in second.json()["markdown"].lower()
+
+
 def test_proactive_card_rejects_invalid_card_type(client, auth_token) -> None:
     headers = {"Authorization": f"Bearer {auth_token}"}
     response = client.post(
@@ -2,6 +2,8 @@ import json
 from datetime import date, datetime, timezone
 from uuid import uuid4
 
+from passlib.hash import pbkdf2_sha256
+
 from app.api import intake as intake_api
 from app.db.models import (
     Baseline,
@@ -14,6 +16,7 @@ from app.db.models import (
     IntakeConversationSession,
     Metric,
     ModelUsageStat,
+    User,
 )
 
 
@@ -88,6 +91,22 @@ def test_change_password_flow(client) -> None:
     assert login_new.status_code == 200
 
 
+def test_login_upgrades_legacy_pbkdf2_hash(client, db_session) -> None:
+    email = f"legacy_{uuid4().hex[:8]}@test.com"
+    password = "StrongPass123"
+    user = User(email=email, password_hash=pbkdf2_sha256.hash(password))
+    db_session.add(user)
+    db_session.commit()
+
+    login = client.post("/auth/login", data={"username": email, "password": password})
+    assert login.status_code == 200
+
+    db_session.refresh(user)
+    assert user.password_hash.startswith("$argon2id$")
+    login_again = client.post("/auth/login", data={"username": email, "password": password})
+    assert login_again.status_code == 200
+
+
 def test_model_usage_endpoint_returns_rows(client, auth_token) -> None:
     headers = {"Authorization": f"Bearer {auth_token}"}
     usage = client.get("/auth/model-usage", headers=headers)
@@ -0,0 +1,84 @@
+import asyncio
+
+from app.core.coach_cache import (
+    claim_in_flight,
+    coach_cache_key,
+    find_similar_response,
+    release_in_flight,
+    remember_similar_response,
+    wait_for_in_flight,
+)
+
+
+def test_similar_question_reuses_cached_response() -> None:
+    response = {"answer": "Start with 200 mg magnesium glycinate in the evening."}
+    remember_similar_response(9001, "What is the best magnesium dose?", "fp", "quick", False, response)
+
+    assert find_similar_response(9001, "what is the best magnesium dose", "fp", "quick", False) == response
+    assert find_similar_response(9001, "What is the best zinc dose?", "fp", "quick", False) is None
+    assert find_similar_response(9001, "What is the best magnesium dose?", "other-fp", "quick", False) is None
+    assert find_similar_response(9002, "What is the best magnesium dose?", "fp", "quick", False) is None
+
+
+def test_similar_question_respects_word_order() -> None:
+    response = {"answer": "Prefer walking."}
+    remember_similar_response(9003, "is walking better than running", "fp", "quick", False, response)
+
+    assert find_similar_response(9003, "is running better than walking", "fp", "quick", False) is None
+
+
+def test_similar_question_is_scoped_by_context_hint() -> None:
+    response = {"answer": "Walk after dinner."}
+    remember_similar_response(9004, "How do I lower my glucose?", "fp", "quick", False, response, "Nutrition")
+
+    assert find_similar_response(9004, "how do I lower my glucose", "fp", "quick", False, " nutrition ") == response
+    assert find_similar_response(9004, "How do I lower my glucose?", "fp", "quick", False, "sleep") is None
+    assert find_similar_response(9004, "How do I lower my glucose?", "fp", "quick", False) is None
+
+
+def test_similar_question_is_scoped_by_web_search() -> None:
+    response = {"answer": "Current guidance favours 3-5 g daily."}
+    remember_similar_response(9006, "How much creatine should I take?", "fp", "quick", False, response, None, True)
+
+    assert find_similar_response(9006, "how much creatine should i take", "fp", "quick", False, None, True) == response
+    assert find_similar_response(9006, "How much creatine should I take?", "fp", "quick", False, None, False) is None
+
+
+def test_similar_question_rejects_mismatched_numbers() -> None:
+    question = "My blood pressure this morning was {} on lisinopril, should I change anything about my routine today?"
+    response = {"answer": "Keep your routine and recheck tonight."}
+    remember_similar_response(9007, question.format("128/84"), "fp", "quick", False, response)
+
+    assert find_similar_response(9007, question.format("128/84"), "fp", "quick", False) == response
+    assert find_similar_response(9007, question.format("178/84"), "fp", "quick", False) is None
+
+
+def test_similar_question_rejects_mismatched_direction_words() -> None:
+    response = {"answer": "Add a palm of protein to each meal."}
+    remember_similar_response(9008, "Should I eat more protein at dinner this week?", "fp", "quick", False, response)
+
+    assert find_similar_response(9008, "Should I eat less protein at dinner this week?", "fp", "quick", False) is None
+    assert find_similar_response(9008, "Should I not eat more protein at dinner this week?", "fp", "quick", False) is None
+
+
+def test_in_flight_duplicates_wait_for_first_response() -> None:
+    async def run() -> tuple[bool, bool, object]:
+        key = "in-flight-key"
+        first = claim_in_flight(key)
+        second = claim_in_flight(key)
+        waiter = asyncio.create_task(wait_for_in_flight(key))
+        await asyncio.sleep(0)
+        release_in_flight(key, {"answer": "shared"})
+        return first, second, await waiter
+
+    first, second, shared = asyncio.run(run())
+    assert (first, second) == (True, False)
+    assert shared == {"answer": "shared"}
+
+
+def test_cache_key_separates_web_search_answers() -> None:
+    offline = coach_cache_key(9005, "Is creatine safe?", "fp", "quick", False, None, False)
+    online = coach_cache_key(9005, "Is creatine safe?", "fp", "quick", False, None, True)
+
+    assert offline != online
+    assert coach_cache_key(9005, "is creatine  safe?", "fp", "quick", False, None, True) == online
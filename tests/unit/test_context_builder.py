@@ -1,4 +1,4 @@
-from app.core.context_builder import build_coaching_context
+from app.core.context_builder import build_coaching_context, get_coaching_context, invalidate_coaching_context
 
 
 def test_context_builder_baseline_missing(create_user, seed_metrics, seed_scores, db_session) -> None:
@@ -23,3 +23,15 @@ def test_context_builder_summarizes_metrics(create_user, seed_baseline, seed_met
     assert "avg_7d" in sleep_summary
     assert "latest" in sleep_summary
     assert "rows" not in context
+
+
+def test_coaching_context_cache_reused_until_invalidated(create_user, seed_baseline, db_session) -> None:
+    user = create_user(with_ai_config=False)
+
+    first = get_coaching_context(db_session, user.id)
+    assert first["baseline_present"] is False
+    seed_baseline(user.id)
+    assert get_coaching_context(db_session, user.id) is first
+
+    invalidate_coaching_context(user.id)
+    assert get_coaching_context(db_session, user.id)["baseline_present"] is True
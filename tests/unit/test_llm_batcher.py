@@ -0,0 +1,27 @@
+import asyncio
+
+from app.services import llm_batcher
+
+
+def test_submit_shares_one_call_across_concurrent_identical_requests():
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "raw", {"total_tokens": 10}
+
+    async def run():
+        key = llm_batcher.request_key("openai", "gpt-4o-mini", "same prompt")
+        return await asyncio.gather(*(llm_batcher.submit(key, call) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert calls == 1
+    assert results[0] == ("raw", {"total_tokens": 10})
+    assert results[1:] == [("raw", {}), ("raw", {})]
+    assert llm_batcher._IN_FLIGHT == {}
+
+
+def test_request_key_separates_distinct_prompts():
+    assert llm_batcher.request_key("openai", "m", "a") != llm_batcher.request_key("openai", "m", "b")
@@ -1,6 +1,18 @@
-from app.core.safety import detect_urgent_flags
+from app.core.safety import classify_safety, detect_urgent_flags
 
 
 def test_detect_urgent_flags_chest_pain() -> None:
     flags = detect_urgent_flags("I have chest pain and feel faint.")
     assert "urgent_symptom_language" in flags
+
+
+def test_classify_safety_reports_both_checks() -> None:
+    result = classify_safety("Chest pain after adding creatine to my stack")
+    assert result.urgent_flags == ["urgent_symptom_language"]
+    assert result.supplement is True
+
+    result = classify_safety("How should I time my omega-3?")
+    assert result.urgent_flags == []
+    assert result.supplement is True
+
+    assert classify_safety("What should I eat for lunch?") == ([], False)
@@ -0,0 +1,21 @@
+import pytest
+
+from app.core.security import decrypt_api_key, encrypt_api_key, fernet
+
+
+def test_api_key_roundtrip_uses_aesgcm() -> None:
+    sealed = encrypt_api_key("sk-test-12345678")
+    assert sealed.startswith("v2:")
+    assert sealed != encrypt_api_key("sk-test-12345678")
+    assert decrypt_api_key(sealed) == "sk-test-12345678"
+
+
+def test_legacy_fernet_api_key_still_decrypts() -> None:
+    legacy = fernet.encrypt(b"sk-legacy-1234").decode("utf-8")
+    assert decrypt_api_key(legacy) == "sk-legacy-1234"
+
+
+def test_tampered_api_key_is_rejected() -> None:
+    sealed = encrypt_api_key("sk-test-12345678")
+    with pytest.raises(ValueError):
+        decrypt_api_key(sealed[:-4] + "AAAA")